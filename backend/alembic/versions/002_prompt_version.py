@@ -0,0 +1,24 @@
+"""Record the prompt template version on generated theses and business profiles.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("thesis_versions", sa.Column("prompt_version", sa.String(64), nullable=True))
+    op.add_column("business_profiles", sa.Column("prompt_version", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("business_profiles", "prompt_version")
+    op.drop_column("thesis_versions", "prompt_version")
@@ -1,94 +1,119 @@
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import DBSession
+from app.dependencies import LLM, DBSession, Edgar
 from app.models.business_profile import BusinessProfile
 from app.schemas.business_profile import BusinessProfileRead
 from app.services.company_service import CompanyService
-from app.services.edgar_service import EdgarService
+from app.services.edgar_service import MAX_FULL_FILING_TEXT_CHARS, EdgarService
+from app.services.filing_sections import get_filing_context
+from app.services.filing_store import FilingStore
 from app.services.llm_service import LLMService
+from app.services.parse_executor import parse_html
+from app.services.single_flight import autogeneration
 
 router = APIRouter(prefix="/companies/{company_id}/business-profile", tags=["business-profiles"])
 
 
 @router.get("", response_model=BusinessProfileRead)
-async def get_business_profile(db: DBSession, company_id: UUID):
+async def get_business_profile(db: DBSession, llm: LLM, edgar: Edgar, company_id: UUID):
     """Get the latest business profile. Auto-generates if missing."""
+    profile = await _latest_profile(db, company_id)
+
+    # Auto-generate if no profile exists; concurrent requests share one generation
+    if not profile:
+        profile = await autogeneration.run(
+            f"business_profile:{company_id}",
+            existing=lambda: _latest_profile(db, company_id),
+            produce=lambda: _generate_initial_profile(db, llm, edgar, company_id),
+        )
+
+    return profile
+
+
+async def _latest_profile(db: AsyncSession, company_id: UUID) -> BusinessProfile | None:
     result = await db.execute(
         select(BusinessProfile)
         .where(BusinessProfile.company_id == company_id)
         .order_by(BusinessProfile.version.desc())
         .limit(1)
     )
-    profile = result.scalar_one_or_none()
-    
-    # Auto-generate if no profile exists
-    if not profile:
-        from app.services.company_service import CompanyService
-        from app.services.edgar_service import EdgarService
-        from app.services.llm_service import LLMService
-        
-        company_svc = CompanyService(db)
-        company = await company_svc.get_by_id(company_id)
-        if not company:
-            raise HTTPException(status_code=404, detail="Company not found")
-
-        # Try to get filing text from EDGAR
-        filing_text = ""
-        if company.cik:
-            edgar = EdgarService()
-            try:
-                filings = await edgar.get_recent_filings(company.cik, "10-K")
-                if not filings:
-                    filings = await edgar.get_recent_filings(company.cik, "10-Q")
-                if filings:
-                    content = await edgar.download_filing(filings[0]["primary_document_url"])
-                    filing_text = edgar.parse_filing_html(content)
-            except Exception:
-                filing_text = ""
-
-        if not filing_text:
-            filing_text = (
-                f"{company.name} ({company.ticker}) is a {company.industry} company "
-                f"in the {company.sector} sector, listed on {company.exchange}."
-            )
-
-        company_data = {
-            "name": company.name,
-            "ticker": company.ticker,
-            "exchange": company.exchange,
-            "sector": company.sector,
-            "industry": company.industry,
-        }
-
-        llm = LLMService()
+    return result.scalar_one_or_none()
+
+
+async def _generate_initial_profile(
+    db: AsyncSession, llm: LLMService, edgar: EdgarService, company_id: UUID
+) -> BusinessProfile:
+    """Generate a company's first business profile from its latest EDGAR filing."""
+    company_svc = CompanyService(db)
+    company = await company_svc.get_by_id(company_id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    # Try to get filing text from EDGAR
+    filing_text = ""
+    if company.cik:
         try:
-            result = await llm.generate_business_profile(company_data, filing_text)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"LLM generation failed: {e}")
-
-        next_version = 1
-        profile = BusinessProfile(
-            company_id=company_id,
-            version=next_version,
-            description=result["description"],
-            business_model=result["business_model"],
-            competitive_position=result["competitive_position"],
-            key_products=result["key_products"],
-            geographic_mix=result["geographic_mix"],
-            moat_assessment=result["moat_assessment"],
-            moat_sources=result["moat_sources"],
+            filings = await edgar.get_recent_filings(company.cik, "10-K")
+            if not filings:
+                filings = await edgar.get_recent_filings(company.cik, "10-Q")
+            if filings:
+                content = await FilingStore(edgar, db=db).get_filing(filings[0])
+                text = await parse_html(content, MAX_FULL_FILING_TEXT_CHARS)
+                filing_text = await get_filing_context(
+                    text, filings[0]["form_type"], "profile", filings[0]["accession_number"]
+                )
+        except Exception:
+            filing_text = ""
+
+    if not filing_text:
+        filing_text = (
+            f"{company.name} ({company.ticker}) is a {company.industry} company "
+            f"in the {company.sector} sector, listed on {company.exchange}."
         )
-        db.add(profile)
-        await db.commit()
-    
+
+    company_data = {
+        "name": company.name,
+        "ticker": company.ticker,
+        "exchange": company.exchange,
+        "sector": company.sector,
+        "industry": company.industry,
+    }
+
+    try:
+        result = await llm.generate_business_profile(company_data, filing_text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"LLM generation failed: {e}")
+
+    next_version = 1
+    profile = BusinessProfile(
+        company_id=company_id,
+        version=next_version,
+        description=result["description"],
+        business_model=result["business_model"],
+        competitive_position=result["competitive_position"],
+        key_products=result["key_products"],
+        geographic_mix=result["geographic_mix"],
+        moat_assessment=result["moat_assessment"],
+        moat_sources=result["moat_sources"],
+        prompt_version=result.get("prompt_version"),
+    )
+    db.add(profile)
+    await db.commit()
     return profile
 
 
 @router.post("/generate", response_model=BusinessProfileRead)
-async def generate_business_profile(db: DBSession, company_id: UUID):
+async def generate_business_profile(
+    db: DBSession,
+    llm: LLM,
+    edgar: Edgar,
+    company_id: UUID,
+    fresh: bool = Query(False, description="Bypass the LLM response cache"),
+):
     """Generate a business profile using LLM + EDGAR filings."""
     company_svc = CompanyService(db)
     company = await company_svc.get_by_id(company_id)
@@ -98,14 +123,16 @@ async def generate_business_profile(db: DBSession, company_id: UUID):
     # Try to get filing text from EDGAR
     filing_text = ""
     if company.cik:
-        edgar = EdgarService()
         try:
             filings = await edgar.get_recent_filings(company.cik, "10-K")
             if not filings:
                 filings = await edgar.get_recent_filings(company.cik, "10-Q")
             if filings:
-                content = await edgar.download_filing(filings[0]["primary_document_url"])
-                filing_text = edgar.parse_filing_html(content)
+                content = await FilingStore(edgar, db=db).get_filing(filings[0])
+                text = await parse_html(content, MAX_FULL_FILING_TEXT_CHARS)
+                filing_text = await get_filing_context(
+                    text, filings[0]["form_type"], "profile", filings[0]["accession_number"]
+                )
         except Exception:
             filing_text = ""
 
@@ -124,9 +151,8 @@ async def generate_business_profile(db: DBSession, company_id: UUID):
         "industry": company.industry,
     }
 
-    llm = LLMService()
     try:
-        result = await llm.generate_business_profile(company_data, filing_text)
+        result = await llm.generate_business_profile(company_data, filing_text, use_cache=not fresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM generation failed: {e}")
 
@@ -150,6 +176,7 @@ async def generate_business_profile(db: DBSession, company_id: UUID):
         geographic_mix=result["geographic_mix"],
         moat_assessment=result["moat_assessment"],
         moat_sources=result["moat_sources"],
+        prompt_version=result.get("prompt_version"),
     )
     db.add(profile)
     await db.commit()
@@ -5,18 +5,17 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import func, select
 
-from app.dependencies import DBSession
+from app.dependencies import LLM, BulkLLM, DBSession, MarketSentiment
 from app.models.company import Company
 from app.models.financial_snapshot import FinancialSnapshot
 from app.models.thesis_version import ThesisVersion
 from app.schemas.company import CompanyList, CompanyRead
-from app.schemas.financial_snapshot import StockQuoteRead
+from app.schemas.financial_snapshot import CompanyQuoteList, CompanyQuoteRead, StockQuoteRead
 from app.services.company_service import CompanyService
 from app.services.financial_data_service import FinancialDataService
 from app.services.financial_ingestion_service import FinancialIngestionService
-from app.services.financial_service import FinancialService
-from app.services.llm_service import LLMService
-from app.services.market_sentiment_service import MarketSentimentService
+from app.services.quote_cache import quote_cache
+from app.services.rate_limiter import QuotaExhaustedError
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +68,48 @@ async def get_dashboard_stats(db: DBSession):
     )
 
 
+MAX_PRICE_IDS = 100
+
+
+@router.get("/prices", response_model=CompanyQuoteList)
+async def get_stock_prices(
+    db: DBSession,
+    ids: str = Query(..., description="Comma-separated company IDs (max 100)"),
+):
+    """Fetch live prices for many companies at once (watchlists, table views).
+
+    Quotes come from the shared quote cache; every miss in the request is
+    fetched with a single batched upstream call. Companies without a price
+    are listed in ``missing``.
+    """
+    try:
+        parsed = [UUID(part.strip()) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated UUIDs")
+    company_ids = list(dict.fromkeys(parsed))
+    if not company_ids:
+        raise HTTPException(status_code=422, detail="ids must not be empty")
+    if len(company_ids) > MAX_PRICE_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_PRICE_IDS} ids per request")
+
+    result = await db.execute(select(Company).where(Company.id.in_(company_ids)))
+    tickers = {
+        company.id: FinancialDataService.resolve_fmp_ticker(company.ticker, company.exchange)
+        for company in result.scalars()
+    }
+    quotes = await quote_cache.get_many(list(tickers.values()))
+
+    items, missing = [], []
+    for company_id in company_ids:
+        ticker = tickers.get(company_id)
+        quote = quotes.get(ticker) if ticker else None
+        if quote:
+            items.append(CompanyQuoteRead(company_id=company_id, symbol=ticker, **quote))
+        else:
+            missing.append(company_id)
+    return CompanyQuoteList(items=items, missing=missing)
+
+
 @router.get("", response_model=CompanyList)
 async def list_companies(
     db: DBSession,
@@ -122,9 +163,8 @@ async def get_stock_price(db: DBSession, company_id: UUID):
     company = await service.get_by_id(company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
-    fds = FinancialDataService()
-    ticker = fds.resolve_fmp_ticker(company.ticker, company.exchange)
-    quote = await fds.get_quote(ticker)
+    ticker = FinancialDataService.resolve_fmp_ticker(company.ticker, company.exchange)
+    quote = await quote_cache.get(ticker)
     if not quote:
         raise HTTPException(status_code=404, detail="Price unavailable")
     return StockQuoteRead(symbol=ticker, **quote)
@@ -145,7 +185,9 @@ class IngestResult(BaseModel):
 
 
 @router.post("/{company_id}/ingest", response_model=IngestResult)
-async def ingest_company(db: DBSession, company_id: UUID):
+async def ingest_company(
+    db: DBSession, llm: LLM, sentiment: MarketSentiment, company_id: UUID
+):
     """Run the full ingestion pipeline for a single company synchronously.
 
     Steps: ingest financials -> generate business profile -> generate thesis.
@@ -173,8 +215,6 @@ async def ingest_company(db: DBSession, company_id: UUID):
     # Step 2: Generate thesis (requires snapshot)
     if snapshot:
         try:
-            llm = LLMService()
-            fin_service = FinancialService(db)
             company_data = {
                 "name": company.name,
                 "ticker": company.ticker,
@@ -193,8 +233,8 @@ async def ingest_company(db: DBSession, company_id: UUID):
                 "cash_and_equivalents": str(snapshot.cash_and_equivalents) if snapshot.cash_and_equivalents else "N/A",
                 "debt_to_equity": str(snapshot.debt_to_equity) if snapshot.debt_to_equity else "N/A",
             }
-            resolved_ticker = FinancialDataService().resolve_fmp_ticker(company.ticker, company.exchange)
-            market_context = await MarketSentimentService().get_market_context(resolved_ticker)
+            resolved_ticker = FinancialDataService.resolve_fmp_ticker(company.ticker, company.exchange)
+            market_context = await sentiment.get_market_context(resolved_ticker)
             thesis_result = await llm.generate_thesis(company_data, snapshot_data, {}, market_context=market_context)
             steps_completed.append("thesis")
         except Exception as e:
@@ -213,12 +253,30 @@ class BulkResult(BaseModel):
 
 
 @router.post("/bulk-ingest", response_model=BulkResult)
-async def bulk_ingest(db: DBSession):
+async def bulk_ingest(
+    db: DBSession,
+    llm: BulkLLM,
+    mode: str = Query("per_company", pattern="^(per_company|frames)$"),
+    year: int | None = Query(None, ge=2009),
+    quarter: int | None = Query(None, ge=1, le=4),
+):
     """Ingest financials for all active companies (no Celery needed).
     
-    This is a synchronous operation - may take 30-60 seconds for 40 companies.
-    Each company: fetch FMP data → create snapshot → generate thesis.
+    mode=per_company (default): synchronous loop, may take 30-60 seconds for
+    40 companies. Each company: fetch financial data → create snapshot →
+    generate thesis.
+
+    mode=frames: snapshots only, for every SEC company at once from XBRL
+    frames (one request per concept, one bulk insert). Defaults to the latest
+    complete calendar quarter; override with year/quarter.
     """
+    if mode == "frames":
+        inserted, missing = await FinancialIngestionService(db).bulk_ingest_frames(year, quarter)
+        return BulkResult(
+            dispatched=inserted,
+            errors=[f"{ticker}: no XBRL frame data" for ticker in missing],
+        )
+
     result = await db.execute(
         select(Company).where(Company.is_active.is_(True))
     )
@@ -228,8 +286,6 @@ async def bulk_ingest(db: DBSession):
     errors: list[str] = []
     
     ingestion = FinancialIngestionService(db)
-    llm = LLMService()
-    fin_service = FinancialService(db)
 
     for company in companies:
         try:
@@ -287,10 +343,17 @@ async def bulk_ingest(db: DBSession):
                 thesis_integrity_score=Decimal(str(result_data["thesis_integrity_score"])) if result_data.get("thesis_integrity_score") else None,
                 integrity_rationale=result_data.get("integrity_rationale"),
                 llm_model_used="llama-3.3-70b-versatile",
+                prompt_version=result_data.get("prompt_version"),
             )
             db.add(thesis)
             await db.commit()
             dispatched += 1
+        except QuotaExhaustedError as e:
+            # Every remaining company would fail the same way; stop here
+            logger.warning("Bulk ingest stopped at %s: %s", company.ticker, e)
+            errors.append(f"{company.ticker}: {e} (stopped, remaining companies skipped)")
+            await db.rollback()
+            break
         except Exception as e:
             logger.exception("Failed to ingest %s", company.ticker)
             errors.append(f"{company.ticker}: {e}")
@@ -300,7 +363,7 @@ async def bulk_ingest(db: DBSession):
 
 
 @router.post("/bulk-generate", response_model=BulkResult)
-async def bulk_generate_theses(db: DBSession):
+async def bulk_generate_theses(db: DBSession, llm: BulkLLM):
     """Generate theses for all companies that have financials but no thesis."""
     # Find companies with snapshots but no thesis
     companies_with_financials = (
@@ -321,7 +384,6 @@ async def bulk_generate_theses(db: DBSession):
 
     dispatched = 0
     errors: list[str] = []
-    llm = LLMService()
 
     for company in companies:
         try:
@@ -375,6 +437,7 @@ async def bulk_generate_theses(db: DBSession):
                 thesis_integrity_score=Decimal(str(result_data["thesis_integrity_score"])) if result_data.get("thesis_integrity_score") else None,
                 integrity_rationale=result_data.get("integrity_rationale"),
                 llm_model_used="llama-3.3-70b-versatile",
+                prompt_version=result_data.get("prompt_version"),
             )
             db.add(thesis)
             await db.commit()
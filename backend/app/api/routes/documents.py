@@ -4,12 +4,10 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import func, select
 
-from app.dependencies import DBSession
+from app.dependencies import DBSession, Edgar, Sedar
 from app.models.document import Document
 from app.schemas.document import DocumentList, DocumentRead
 from app.services.company_service import CompanyService
-from app.services.edgar_service import EdgarService
-from app.services.sedar_service import SedarService
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +52,7 @@ async def get_document(db: DBSession, company_id: UUID, document_id: UUID):
 
 
 @router.post("/ingest", response_model=DocumentList)
-async def ingest_documents(db: DBSession, company_id: UUID):
+async def ingest_documents(db: DBSession, edgar: Edgar, sedar: Sedar, company_id: UUID):
     """Ingest recent filings from EDGAR (US) or SEDAR+ (Canada) for a company."""
     from sqlalchemy import func
 
@@ -67,10 +65,9 @@ async def ingest_documents(db: DBSession, company_id: UUID):
 
     # Ingest from EDGAR if US company
     if company.cik:
-        edgar = EdgarService()
         try:
-            for filing_type in ["10-K", "10-Q"]:
-                filings = await edgar.get_recent_filings(company.cik, filing_type)
+            by_form = await edgar.get_recent_filings_by_form(company.cik, ("10-K", "10-Q"))
+            for filings in by_form.values():
                 for filing in filings:
                     # Check if document already exists
                     existing = await db.execute(
@@ -96,7 +93,6 @@ async def ingest_documents(db: DBSession, company_id: UUID):
 
     # Ingest from SEDAR+ if Canadian company (TSX)
     if company.exchange == "TSX":
-        sedar = SedarService()
         try:
             filings = await sedar.get_recent_filings(company.name)
             for filing in filings:
@@ -3,6 +3,7 @@ import logging
 from fastapi import APIRouter, status
 
 from app.database import engine
+from app.services.rate_limiter import alpha_vantage_quota
 
 logger = logging.getLogger(__name__)
 
@@ -31,3 +32,9 @@ async def readiness_check():
         result["status"] = "degraded"
     
     return result
+
+
+@router.get("/health/quotas")
+async def quota_status():
+    """Remaining third-party API call budgets (shared across all processes)."""
+    return {"alpha_vantage": await alpha_vantage_quota.remaining()}
@@ -4,13 +4,14 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import func, select
 
-from app.dependencies import DBSession
+from app.dependencies import LLM, DBSession, Edgar, Sedar
 from app.models.quarterly_update import QuarterlyUpdate
 from app.schemas.quarterly_update import QuarterlyUpdateList, QuarterlyUpdateRead
 from app.services.company_service import CompanyService
-from app.services.edgar_service import EdgarService
-from app.services.llm_service import LLMService
-from app.services.sedar_service import SedarService
+from app.services.edgar_service import MAX_FULL_FILING_TEXT_CHARS
+from app.services.filing_sections import get_filing_context
+from app.services.filing_store import FilingStore
+from app.services.parse_executor import parse_html
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,14 @@ async def get_quarterly_update(db: DBSession, company_id: UUID, update_id: UUID)
 
 
 @router.post("/generate", response_model=QuarterlyUpdateRead)
-async def generate_quarterly_update(db: DBSession, company_id: UUID):
+async def generate_quarterly_update(
+    db: DBSession,
+    llm: LLM,
+    edgar: Edgar,
+    sedar: Sedar,
+    company_id: UUID,
+    fresh: bool = Query(False, description="Bypass the LLM response cache"),
+):
     """Generate a quarterly update using LLM based on latest filing and financials."""
     from sqlalchemy import func
 
@@ -118,20 +126,21 @@ async def generate_quarterly_update(db: DBSession, company_id: UUID):
     source = "edgar"
 
     if company.cik:
-        edgar = EdgarService()
         try:
             filings = await edgar.get_recent_filings(company.cik, "10-Q")
             if not filings:
                 filings = await edgar.get_recent_filings(company.cik, "10-K")
                 filing_type = "10-K"
             if filings:
-                content = await edgar.download_filing(filings[0]["primary_document_url"])
-                filing_text = edgar.parse_filing_html(content)
+                content = await FilingStore(edgar, db=db).get_filing(filings[0])
+                text = await parse_html(content, MAX_FULL_FILING_TEXT_CHARS)
+                filing_text = await get_filing_context(
+                    text, filings[0]["form_type"], "quarterly", filings[0]["accession_number"]
+                )
         except Exception as e:
             logger.warning("Failed to retrieve EDGAR filing for %s: %s", company.ticker, e)
 
     if not filing_text and company.exchange == "TSX":
-        sedar = SedarService()
         try:
             filings = await sedar.get_recent_filings(company.name, "10-Q")
             filing_type = "MD&A"
@@ -173,9 +182,10 @@ async def generate_quarterly_update(db: DBSession, company_id: UUID):
         }
 
     # Generate quarterly summary via LLM
-    llm = LLMService()
     try:
-        result = await llm.generate_quarterly_summary(filing_text, prior_snapshot)
+        result = await llm.generate_quarterly_summary(
+            filing_text, prior_snapshot, use_cache=not fresh
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM generation failed: {e}")
 
@@ -1,17 +1,28 @@
+import json
+import logging
+from collections.abc import AsyncIterator
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.dependencies import DBSession
+from app.database import async_session_factory
+from app.dependencies import LLM, DBSession, MarketSentiment
+from app.models.financial_snapshot import FinancialSnapshot
+from app.models.thesis_version import ThesisVersion
 from app.schemas.thesis_version import ThesisVersionList, ThesisVersionRead
 from app.services.company_service import CompanyService
 from app.services.financial_data_service import FinancialDataService
 from app.services.financial_service import FinancialService
 from app.services.llm_service import LLMService
 from app.services.market_sentiment_service import MarketSentimentService
+from app.services.single_flight import autogeneration
 from app.services.thesis_service import ThesisService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/companies/{company_id}/thesis", tags=["thesis"])
 
 
@@ -28,75 +39,82 @@ async def list_thesis_versions(
 
 
 @router.get("/latest", response_model=ThesisVersionRead)
-async def get_latest_thesis(db: DBSession, company_id: UUID):
+async def get_latest_thesis(
+    db: DBSession, llm: LLM, sentiment: MarketSentiment, company_id: UUID
+):
     """Get latest thesis. Auto-generates if missing."""
     service = ThesisService(db)
     thesis = await service.get_latest(company_id)
-    
-    # Auto-generate if no thesis exists
+
+    # Auto-generate if no thesis exists; concurrent requests share one generation
     if not thesis:
-        from app.services.company_service import CompanyService
-        from app.services.financial_service import FinancialService
-        from app.services.llm_service import LLMService
-        
-        company_svc = CompanyService(db)
-        company = await company_svc.get_by_id(company_id)
-        if not company:
-            raise HTTPException(status_code=404, detail="Company not found")
-        
-        fin_svc = FinancialService(db)
-        snapshot = await fin_svc.get_latest(company_id)
-        
-        if not snapshot:
-            # Auto-ingest financials first
-            from app.services.financial_ingestion_service import FinancialIngestionService
-            ingestion = FinancialIngestionService(db)
-            try:
-                snapshot = await ingestion.ingest_latest_financials(company_id)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Could not ingest financials: {e}")
-        
-        # Generate thesis
-        llm = LLMService()
-        company_data = {
-            "name": company.name,
-            "ticker": company.ticker,
-            "sector": company.sector,
-            "industry": company.industry,
-        }
-        snapshot_data = {
-            "revenue": str(snapshot.revenue) if snapshot.revenue else "N/A",
-            "net_income": str(snapshot.net_income) if snapshot.net_income else "N/A",
-            "ebitda": str(snapshot.ebitda) if snapshot.ebitda else "N/A",
-            "eps_diluted": str(snapshot.eps_diluted) if snapshot.eps_diluted else "N/A",
-            "gross_margin": str(snapshot.gross_margin) if snapshot.gross_margin else "N/A",
-            "operating_margin": str(snapshot.operating_margin) if snapshot.operating_margin else "N/A",
-            "free_cash_flow": str(snapshot.free_cash_flow) if snapshot.free_cash_flow else "N/A",
-            "total_debt": str(snapshot.total_debt) if snapshot.total_debt else "N/A",
-            "cash_and_equivalents": str(snapshot.cash_and_equivalents) if snapshot.cash_and_equivalents else "N/A",
-            "debt_to_equity": str(snapshot.debt_to_equity) if snapshot.debt_to_equity else "N/A",
-        }
+        thesis = await autogeneration.run(
+            f"thesis:{company_id}",
+            existing=lambda: service.get_latest(company_id),
+            produce=lambda: _generate_initial_thesis(db, llm, sentiment, company_id),
+        )
+
+    return thesis
 
-        # Fetch live market sentiment to ground the thesis in real analyst views
-        fds = FinancialDataService()
-        resolved_ticker = fds.resolve_fmp_ticker(company.ticker, company.exchange)
-        market_context = await MarketSentimentService().get_market_context(resolved_ticker)
 
+async def _generate_initial_thesis(
+    db: AsyncSession, llm: LLMService, sentiment: MarketSentimentService, company_id: UUID
+) -> ThesisVersion:
+    """Ingest financials if needed and generate a company's first thesis."""
+    company_svc = CompanyService(db)
+    company = await company_svc.get_by_id(company_id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    fin_svc = FinancialService(db)
+    snapshot = await fin_svc.get_latest(company_id)
+
+    if not snapshot:
+        # Auto-ingest financials first
+        from app.services.financial_ingestion_service import FinancialIngestionService
+        ingestion = FinancialIngestionService(db)
         try:
-            result = await llm.generate_thesis(company_data, snapshot_data, {}, market_context=market_context)
-            result["llm_model_used"] = settings.LLM_MODEL
-            
-            thesis_svc = ThesisService(db)
-            thesis = await thesis_svc.create_version(
-                company_id=company_id,
-                snapshot_id=snapshot.id,
-                thesis_data=result,
-                prior_version=None,
-            )
+            snapshot = await ingestion.ingest_latest_financials(company_id)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Thesis generation failed: {e}")
-    
-    return thesis
+            raise HTTPException(status_code=400, detail=f"Could not ingest financials: {e}")
+
+    # Generate thesis
+    company_data = {
+        "name": company.name,
+        "ticker": company.ticker,
+        "sector": company.sector,
+        "industry": company.industry,
+    }
+    snapshot_data = {
+        "revenue": str(snapshot.revenue) if snapshot.revenue else "N/A",
+        "net_income": str(snapshot.net_income) if snapshot.net_income else "N/A",
+        "ebitda": str(snapshot.ebitda) if snapshot.ebitda else "N/A",
+        "eps_diluted": str(snapshot.eps_diluted) if snapshot.eps_diluted else "N/A",
+        "gross_margin": str(snapshot.gross_margin) if snapshot.gross_margin else "N/A",
+        "operating_margin": str(snapshot.operating_margin) if snapshot.operating_margin else "N/A",
+        "free_cash_flow": str(snapshot.free_cash_flow) if snapshot.free_cash_flow else "N/A",
+        "total_debt": str(snapshot.total_debt) if snapshot.total_debt else "N/A",
+        "cash_and_equivalents": str(snapshot.cash_and_equivalents) if snapshot.cash_and_equivalents else "N/A",
+        "debt_to_equity": str(snapshot.debt_to_equity) if snapshot.debt_to_equity else "N/A",
+    }
+
+    # Fetch live market sentiment to ground the thesis in real analyst views
+    resolved_ticker = FinancialDataService.resolve_fmp_ticker(company.ticker, company.exchange)
+    market_context = await sentiment.get_market_context(resolved_ticker)
+
+    try:
+        result = await llm.generate_thesis(company_data, snapshot_data, {}, market_context=market_context)
+        result["llm_model_used"] = settings.LLM_MODEL
+
+        thesis_svc = ThesisService(db)
+        return await thesis_svc.create_version(
+            company_id=company_id,
+            snapshot_id=snapshot.id,
+            thesis_data=result,
+            prior_version=None,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Thesis generation failed: {e}")
 
 
 @router.get("/{version_id}", response_model=ThesisVersionRead)
@@ -108,9 +126,14 @@ async def get_thesis_version(db: DBSession, company_id: UUID, version_id: UUID):
     return thesis
 
 
-@router.post("/generate", response_model=ThesisVersionRead)
-async def generate_thesis(db: DBSession, company_id: UUID):
-    """Generate a new thesis version using the LLM."""
+async def _generation_inputs(
+    db: AsyncSession, sentiment: MarketSentimentService, company_id: UUID
+) -> tuple[FinancialSnapshot, ThesisVersion | None, dict]:
+    """Load what a new thesis version is generated from.
+
+    Returns the latest snapshot, the prior thesis (for drift tracking) and the
+    keyword arguments for ``LLMService.generate_thesis`` / ``stream_thesis``.
+    """
     company_svc = CompanyService(db)
     company = await company_svc.get_by_id(company_id)
     if not company:
@@ -181,20 +204,37 @@ async def generate_thesis(db: DBSession, company_id: UUID):
         }
 
     # Fetch live market sentiment to ground the thesis in real analyst views
-    fds = FinancialDataService()
-    resolved_ticker = fds.resolve_fmp_ticker(company.ticker, company.exchange)
-    market_context = await MarketSentimentService().get_market_context(resolved_ticker)
+    resolved_ticker = FinancialDataService.resolve_fmp_ticker(company.ticker, company.exchange)
+    market_context = await sentiment.get_market_context(resolved_ticker)
+
+    return snapshot, prior_thesis, {
+        "company_data": company_data,
+        "financial_snapshot": snapshot_data,
+        "business_profile": profile_data,
+        "prior_thesis": prior_thesis_data,
+        "market_context": market_context,
+    }
+
+
+@router.post("/generate", response_model=ThesisVersionRead)
+async def generate_thesis(
+    db: DBSession,
+    llm: LLM,
+    sentiment: MarketSentiment,
+    company_id: UUID,
+    fresh: bool = Query(False, description="Bypass the LLM response cache"),
+):
+    """Generate a new thesis version using the LLM."""
+    snapshot, prior_thesis, inputs = await _generation_inputs(db, sentiment, company_id)
 
-    llm = LLMService()
     try:
-        result = await llm.generate_thesis(
-            company_data, snapshot_data, profile_data, prior_thesis_data, market_context=market_context
-        )
+        result = await llm.generate_thesis(**inputs, use_cache=not fresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM generation failed: {e}")
 
     result["llm_model_used"] = settings.LLM_MODEL
 
+    thesis_svc = ThesisService(db)
     thesis = await thesis_svc.create_version(
         company_id=company_id,
         snapshot_id=snapshot.id,
@@ -202,3 +242,61 @@ async def generate_thesis(db: DBSession, company_id: UUID):
         prior_version=prior_thesis,
     )
     return thesis
+
+
+@router.post("/generate/stream")
+async def stream_thesis(
+    db: DBSession,
+    llm: LLM,
+    sentiment: MarketSentiment,
+    company_id: UUID,
+    fresh: bool = Query(False, description="Bypass the LLM response cache"),
+):
+    """Generate a new thesis version, streaming it as Server-Sent Events.
+
+    Emits a ``field`` event (``{"field": ..., "value": ...}``) for each thesis
+    field as the LLM completes it, then a ``thesis`` event with the persisted
+    version, or an ``error`` event if generation fails. Missing company data
+    is still reported as a plain HTTP error before the stream starts.
+    """
+    snapshot, prior_thesis, inputs = await _generation_inputs(db, sentiment, company_id)
+    return StreamingResponse(
+        _thesis_events(llm, company_id, snapshot.id, prior_thesis, inputs, use_cache=not fresh),
+        media_type="text/event-stream",
+        # Stop proxies (nginx, Railway's edge) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _thesis_events(
+    llm: LLMService,
+    company_id: UUID,
+    snapshot_id: UUID,
+    prior_thesis: ThesisVersion | None,
+    inputs: dict,
+    use_cache: bool,
+) -> AsyncIterator[str]:
+    try:
+        async for field, value in llm.stream_thesis(**inputs, use_cache=use_cache):
+            if field is not None:
+                yield _sse("field", {"field": field, "value": value})
+                continue
+
+            value["llm_model_used"] = settings.LLM_MODEL
+            # Own session: the request's session may be closed once the response has started
+            async with async_session_factory() as db:
+                thesis = await ThesisService(db).create_version(
+                    company_id=company_id,
+                    snapshot_id=snapshot_id,
+                    thesis_data=value,
+                    prior_version=prior_thesis,
+                )
+                payload = ThesisVersionRead.model_validate(thesis).model_dump(mode="json")
+            yield _sse("thesis", payload)
+    except Exception as e:
+        logger.exception("Streaming thesis generation failed for %s", company_id)
+        yield _sse("error", {"detail": f"Thesis generation failed: {e}"})
@@ -41,10 +41,52 @@ class Settings(BaseSettings):
 
     GROQ_API_KEY: str = ""
     LLM_MODEL: str = "llama-3.3-70b-versatile"
+    # Groq budgets shared by every API process and Celery worker (defaults are
+    # the free tier for llama-3.3-70b-versatile), and concurrent calls per process
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 12000
+    LLM_MAX_CONCURRENCY: int = 4
+    # Completion tokens reserved per call before the real usage is known
+    LLM_EXPECTED_COMPLETION_TOKENS: int = 1500
+    # Responses are cached by a hash of the full request (model, prompts,
+    # temperature), so identical requests (retries, re-run bulk jobs) cost no tokens
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    # GET endpoints that auto-generate a missing thesis / business profile run
+    # one generation per company at a time; other replicas wait on a Redis
+    # lease (released on completion, expires after this long if the holder dies)
+    AUTOGEN_LEASE_SECONDS: int = 180
+    AUTOGEN_POLL_SECONDS: float = 1.0
 
     # Alpha Vantage API key (free) - for financial data
     # Get at: https://www.alphavantage.co/support/#api-key
     ALPHA_VANTAGE_API_KEY: str = ""
+    # Call budgets shared by every API process and Celery worker (free tier:
+    # 5/min, 25/day); callers queue for the minute budget, fail past the daily one
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = 5
+    ALPHA_VANTAGE_CALLS_PER_DAY: int = 25
+    # Raw statement payloads are cached this long; statements only change when
+    # a 10-Q/10-K is filed, so a day keeps them fresh within the filing week
+    ALPHA_VANTAGE_STATEMENT_CACHE_TTL_SECONDS: int = 24 * 3600
+    # Quote cache: fresh for QUOTE_TTL_SECONDS during market hours, until the
+    # next open (capped) after close; expired quotes are served for up to
+    # QUOTE_STALE_SECONDS while a background refresh runs
+    QUOTE_TTL_SECONDS: int = 60
+    QUOTE_TTL_CLOSED_MAX_SECONDS: int = 72 * 3600
+    QUOTE_STALE_SECONDS: int = 300
+    QUOTE_STALE_WHILE_REVALIDATE: bool = True
+    # List endpoints price misses with REALTIME_BULK_QUOTES (premium). Tickers it
+    # cannot price fall back to single GLOBAL_QUOTE calls, at most this many per
+    # batch; the rest are served stale or reported missing. A key without bulk
+    # access is remembered for BULK_QUOTES_UNSUPPORTED_TTL_SECONDS.
+    QUOTE_BULK_FALLBACK_MAX_TICKERS: int = 5
+    BULK_QUOTES_UNSUPPORTED_TTL_SECONDS: int = 24 * 3600
+    # Market context (analyst overview + news) cache; tickers Alpha Vantage has
+    # no coverage for are remembered for MARKET_CONTEXT_NEGATIVE_TTL_SECONDS
+    MARKET_OVERVIEW_CACHE_TTL_SECONDS: int = 24 * 3600
+    MARKET_NEWS_CACHE_TTL_SECONDS: int = 3600
+    MARKET_CONTEXT_NEGATIVE_TTL_SECONDS: int = 6 * 3600
 
     # Yahoo Finance (free, no API key needed) - fallback
     FINANCIAL_DATA_API_KEY: str = ""  # FMP key (legacy, not working)
@@ -55,9 +97,28 @@ class Settings(BaseSettings):
     S3_REGION: str = "us-east-1"
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. a MinIO / moto server for local development
+    # Max concurrent S3 calls; further callers wait for a free slot
+    S3_MAX_CONCURRENCY: int = 8
+    # "s3", or "filesystem" to store objects under STORAGE_FILESYSTEM_ROOT instead
+    STORAGE_BACKEND: str = "s3"
+    STORAGE_FILESYSTEM_ROOT: str = "/tmp/thesis-engine-storage"
 
     # SEC EDGAR (required for US companies)
     EDGAR_USER_AGENT: str = "ThesisEngine admin@example.com"
+    # SEC fair-access policy: max 10 requests/second per client (shared across
+    # all API replicas and Celery workers through Redis when enabled)
+    EDGAR_MAX_REQUESTS_PER_SECOND: float = 10.0
+    EDGAR_RATE_LIMIT_SHARED: bool = True
+    # How new filings are found: "feed" (latest-filings Atom feed), "daily_index"
+    # (daily form index), or "submissions" (per-company polling, slowest)
+    EDGAR_DISCOVERY_MODE: str = "feed"
+    FILING_CHECK_INTERVAL_MINUTES: int = 60
+
+    # Outbound HTTP connection pools (shared per provider, see services/http_clients.py)
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    HTTP2_ENABLED: bool = True
 
     # Parsed from env: JSON array or comma-separated string
     # Set CORS_ORIGINS="*" to allow all origins (dev), or
@@ -75,6 +136,18 @@ class Settings(BaseSettings):
             self.API_KEYS = [k.strip() for k in raw.split(",") if k.strip()]
         return self
 
+    # Local on-disk cache root (EDGAR submissions, filings, ...)
+    LOCAL_CACHE_DIR: str = "/tmp/thesis-engine-cache"
+    # Characters of filing text sent to the LLM, assembled from the relevant
+    # 10-K/10-Q sections (Business, Risk Factors, MD&A) rather than the head
+    FILING_CONTEXT_CHARS: int = 24_000
+    # Size cap for the local filing store (least-recently-used filings are evicted)
+    FILING_STORE_MAX_BYTES: int = 2 * 1024**3
+    # Process pool for CPU-bound filing parsing (0 = one worker per CPU core)
+    PARSE_POOL_SIZE: int = 0
+    # Max parse jobs running or queued in the pool; further callers wait
+    PARSE_MAX_PENDING: int = 16
+
     # Logging
     LOG_FORMAT: str = "json"  # "json" for production, "text" for dev
     LOG_LEVEL: str = "INFO"
@@ -4,5 +4,40 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.services.container import services
+from app.services.edgar_service import EdgarService
+from app.services.llm_service import LLMService
+from app.services.market_sentiment_service import MarketSentimentService
+from app.services.rate_limiter import Priority
+from app.services.sedar_service import SedarService
 
 DBSession = Annotated[AsyncSession, Depends(get_session)]
+
+
+# Async so they resolve on the event loop (the Groq client is loop-bound)
+async def get_llm_service() -> LLMService:
+    return services.llm()
+
+
+async def get_bulk_llm_service() -> LLMService:
+    return services.llm(Priority.BACKGROUND)
+
+
+async def get_market_sentiment_service() -> MarketSentimentService:
+    return services.market_sentiment()
+
+
+async def get_edgar_service() -> EdgarService:
+    return services.edgar()
+
+
+async def get_sedar_service() -> SedarService:
+    return services.sedar()
+
+
+LLM = Annotated[LLMService, Depends(get_llm_service)]
+# Bulk endpoints queue behind interactive generations for the shared Groq budget
+BulkLLM = Annotated[LLMService, Depends(get_bulk_llm_service)]
+MarketSentiment = Annotated[MarketSentimentService, Depends(get_market_sentiment_service)]
+Edgar = Annotated[EdgarService, Depends(get_edgar_service)]
+Sedar = Annotated[SedarService, Depends(get_sedar_service)]
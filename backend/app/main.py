@@ -2,6 +2,7 @@ import json
 import logging
 import sys
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,6 +13,12 @@ from slowapi.util import get_remote_address
 
 from app.api.routes import business_profiles, companies, documents, financials, health, quarterly_updates, thesis
 from app.config import settings
+from app.services.container import services
+from app.services.filing_store import flush_pending_uploads
+from app.services.http_clients import http_clients
+from app.services.parse_executor import shutdown_parse_executor
+from app.services.prompt_registry import prompts
+from app.services.redis_client import close_redis
 
 
 # ---- Structured Logging ----
@@ -49,6 +56,19 @@ logger = logging.getLogger(__name__)
 limiter = Limiter(key_func=get_remote_address)
 
 
+# ---- Lifespan ----
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prompts.load()  # fail fast on a broken prompt file
+    yield
+    await flush_pending_uploads()
+    await services.aclose()
+    await http_clients.aclose()
+    await close_redis()
+    shutdown_parse_executor()
+
+
 # ---- App ----
 
 app = FastAPI(
@@ -58,6 +78,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     timeout=300,
+    lifespan=lifespan,
 )
 
 app.state.limiter = limiter
@@ -22,5 +22,6 @@ class BusinessProfile(Base, TimestampMixin):
     geographic_mix: Mapped[str] = mapped_column(Text, nullable=False)  # JSON object as text
     moat_assessment: Mapped[str] = mapped_column(String(50), nullable=False)
     moat_sources: Mapped[str] = mapped_column(Text, nullable=False)  # JSON array as text
+    prompt_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     company = relationship("Company", back_populates="business_profiles")
@@ -48,6 +48,7 @@ class ThesisVersion(Base, TimestampMixin):
     )  # strengthened, weakened, unchanged
 
     llm_model_used: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     company = relationship("Company", back_populates="thesis_versions")
     snapshot = relationship("FinancialSnapshot")
@@ -17,4 +17,5 @@ class BusinessProfileRead(BaseModel):
     geographic_mix: str
     moat_assessment: str
     moat_sources: str
+    prompt_version: str | None = None
     created_at: datetime
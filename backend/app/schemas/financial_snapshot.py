@@ -67,3 +67,12 @@ class StockQuoteRead(BaseModel):
     change_pct: float
     prev_close: float
     latest_trading_day: str
+
+
+class CompanyQuoteRead(StockQuoteRead):
+    company_id: UUID
+
+
+class CompanyQuoteList(BaseModel):
+    items: list[CompanyQuoteRead]
+    missing: list[UUID]
@@ -32,6 +32,7 @@ class ThesisVersionRead(BaseModel):
     conviction_direction: str | None = None
 
     llm_model_used: str
+    prompt_version: str | None = None
     created_at: datetime
 
 
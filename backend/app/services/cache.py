@@ -0,0 +1,135 @@
+"""Small Redis-backed JSON cache shared by every API process and Celery worker.
+
+Caching is an optimization only: when Redis is unreachable every lookup is a
+miss and writes are dropped, and Redis is not retried for a short while so a
+dead server does not add a timeout to every call.
+"""
+
+import json
+import logging
+import time
+from typing import Any
+
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop talking to Redis after an error before trying again
+_REDIS_RETRY_SECONDS = 30.0
+
+
+class JsonCache:
+    """JSON values under ``{prefix}:{key}`` with a default TTL."""
+
+    def __init__(self, prefix: str, ttl_seconds: int):
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._disabled_until = 0.0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _fail(self, action: str, key: str, error: Exception) -> None:
+        logger.warning("Cache %s failed for %s: %s", action, self._key(key), error)
+        self._disabled_until = time.monotonic() + _REDIS_RETRY_SECONDS
+
+    async def get(self, key: str) -> Any | None:
+        """Return the cached value, or None on a miss (or if Redis is down)."""
+        if not self._available():
+            return None
+        try:
+            raw = await get_redis().get(self._key(key))
+        except Exception as e:
+            self._fail("read", key, e)
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Return the cached values for ``keys`` (misses are omitted), in one round trip."""
+        if not keys or not self._available():
+            return {}
+        try:
+            raws = await get_redis().mget([self._key(key) for key in keys])
+        except Exception as e:
+            self._fail("read", keys[0], e)
+            return {}
+        values = {}
+        for key, raw in zip(keys, raws):
+            if raw is None:
+                continue
+            try:
+                values[key] = json.loads(raw)
+            except ValueError:
+                continue
+        return values
+
+    async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
+        """Store a JSON-serializable value (best effort)."""
+        if not self._available():
+            return
+        try:
+            await get_redis().set(
+                self._key(key), json.dumps(value), ex=ttl_seconds or self.ttl_seconds
+            )
+        except Exception as e:
+            self._fail("write", key, e)
+
+    async def delete(self, key: str) -> None:
+        if not self._available():
+            return
+        try:
+            await get_redis().delete(self._key(key))
+        except Exception as e:
+            self._fail("delete", key, e)
+
+
+class BoundedJsonCache(JsonCache):
+    """JsonCache holding at most ``max_entries`` keys; the oldest writes are evicted first.
+
+    Keys are tracked in a sorted set scored by expiry time, which also lets
+    expired keys be dropped from the index as new ones are written.
+    """
+
+    def __init__(self, prefix: str, ttl_seconds: int, max_entries: int):
+        super().__init__(prefix, ttl_seconds)
+        self.max_entries = max_entries
+        self._index = f"{prefix}:__index__"
+
+    async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
+        if not self._available():
+            return
+        ttl = ttl_seconds or self.ttl_seconds
+        now = time.time()
+        try:
+            redis = get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._key(key), json.dumps(value), ex=ttl)
+                pipe.zadd(self._index, {key: now + ttl})
+                pipe.zremrangebyscore(self._index, "-inf", now)
+                pipe.zcard(self._index)
+                *_, size = await pipe.execute()
+            if size > self.max_entries:
+                evicted = await redis.zpopmin(self._index, size - self.max_entries)
+                if evicted:
+                    await redis.delete(*(
+                        self._key(k.decode() if isinstance(k, bytes) else k) for k, _ in evicted
+                    ))
+        except Exception as e:
+            self._fail("write", key, e)
+
+    async def delete(self, key: str) -> None:
+        await super().delete(key)
+        if not self._available():
+            return
+        try:
+            await get_redis().zrem(self._index, key)
+        except Exception as e:
+            self._fail("delete", key, e)
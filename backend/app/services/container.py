@@ -0,0 +1,90 @@
+"""Application-scoped service container.
+
+Provider services (Alpha Vantage, EDGAR, SEDAR+, Groq) keep no per-request
+state, so one instance of each is shared by every request handler and Celery
+task in a process instead of being rebuilt per call. Their HTTP pools, rate
+limiters and caches are already process-wide; sharing the service objects
+also keeps the Groq client (and its connection pool) alive between requests.
+
+Route handlers receive services through the dependencies in
+``app.dependencies``; Celery tasks use ``services`` directly.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import TypeVar
+
+from app.services.edgar_service import EdgarService
+from app.services.financial_data_service import FinancialDataService
+from app.services.llm_service import LLMService
+from app.services.market_sentiment_service import MarketSentimentService
+from app.services.rate_limiter import Priority
+from app.services.sedar_service import SedarService
+from app.services.xbrl_financials_service import XbrlFinancialsService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ServiceContainer:
+    """Lazily built singletons, one per service (and priority, where it applies)."""
+
+    def __init__(self):
+        self._instances: dict[tuple, object] = {}
+        # The Groq SDK owns an httpx pool bound to the loop that first used it
+        self._llm: dict[Priority, tuple[LLMService, asyncio.AbstractEventLoop | None]] = {}
+
+    def _get(self, key: tuple, factory: Callable[[], T]) -> T:
+        instance = self._instances.get(key)
+        if instance is None:
+            instance = self._instances[key] = factory()
+        return instance
+
+    def financial_data(self, priority: Priority = Priority.INTERACTIVE) -> FinancialDataService:
+        return self._get(("financial_data", priority), lambda: FinancialDataService(priority))
+
+    def edgar(self, priority: Priority = Priority.INTERACTIVE) -> EdgarService:
+        return self._get(("edgar", priority), lambda: EdgarService(priority))
+
+    def sedar(self) -> SedarService:
+        return self._get(("sedar",), SedarService)
+
+    def xbrl(self, priority: Priority = Priority.INTERACTIVE) -> XbrlFinancialsService:
+        return self._get(("xbrl", priority), lambda: XbrlFinancialsService(self.edgar(priority)))
+
+    def market_sentiment(self) -> MarketSentimentService:
+        return self._get(
+            ("market_sentiment",), lambda: MarketSentimentService(self.financial_data())
+        )
+
+    def llm(self, priority: Priority = Priority.INTERACTIVE) -> LLMService:
+        loop = _running_loop()
+        llm, owner = self._llm.get(priority, (None, None))
+        if llm is None or (owner is not None and loop is not None and owner is not loop):
+            llm, owner = LLMService(priority), loop
+        self._llm[priority] = (llm, owner or loop)
+        return llm
+
+    async def aclose(self) -> None:
+        """Close clients owned by the current event loop (FastAPI shutdown / worker exit)."""
+        loop = _running_loop()
+        for priority, (llm, owner) in list(self._llm.items()):
+            if owner not in (loop, None):
+                continue
+            try:
+                await llm.client.close()
+            except Exception as e:
+                logger.warning("Failed to close Groq client: %s", e)
+            del self._llm[priority]
+
+
+services = ServiceContainer()
@@ -1,100 +1,331 @@
 """SEC EDGAR filing retrieval service."""
 
+import asyncio
+import json
 import logging
+import os
 import re
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
 
 import httpx
 
 from app.config import settings
+from app.services.filing_parser import html_to_text
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import Priority, edgar_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions"
+EDGAR_XBRL_URL = "https://data.sec.gov/api/xbrl"
 EDGAR_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+EDGAR_DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index"
+EDGAR_CURRENT_FEED_URL = "https://www.sec.gov/cgi-bin/browse-edgar"
+ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+# Parsed submissions are reused in-process for this long before revalidating
+SUBMISSIONS_MEMO_SECONDS = 60.0
+# Submissions documents run to hundreds of KB; keep only the most recent few
+SUBMISSIONS_MEMO_MAX_ENTRIES = 64
 MAX_FILING_TEXT_CHARS = 80_000
+# Upper bound when the whole document is parsed for section extraction
+MAX_FULL_FILING_TEXT_CHARS = 3_000_000
+
+# CIK -> (memoized at, parsed submissions), least recently used first
+_submissions_memo: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def _memoize_submissions(cik_padded: str, data: dict) -> None:
+    """Memoize a submissions document, dropping expired and least recently used entries."""
+    now = time.monotonic()
+    _submissions_memo[cik_padded] = (now, data)
+    _submissions_memo.move_to_end(cik_padded)
+    for key, (memoized_at, _) in list(_submissions_memo.items()):
+        if now - memoized_at >= SUBMISSIONS_MEMO_SECONDS:
+            del _submissions_memo[key]
+    while len(_submissions_memo) > SUBMISSIONS_MEMO_MAX_ENTRIES:
+        _submissions_memo.popitem(last=False)
+
+
+def _submissions_cache_path(cik_padded: str) -> Path:
+    return Path(settings.LOCAL_CACHE_DIR) / "edgar" / "submissions" / f"CIK{cik_padded}.json"
+
+
+def _read_cache_file(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache_file(path: Path, entry: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(entry))
+    os.replace(tmp, path)
 
 
 class EdgarService:
-    """Downloads and parses SEC EDGAR filings (10-Q, 10-K)."""
+    """Downloads and parses SEC EDGAR filings (10-Q, 10-K).
+
+    Every request goes through the process-wide EDGAR rate limiter. Use
+    ``Priority.BACKGROUND`` for batch/beat work so interactive API requests
+    are served first.
+    """
 
-    def __init__(self):
+    def __init__(self, priority: Priority = Priority.INTERACTIVE):
         self.user_agent = settings.EDGAR_USER_AGENT
+        self.priority = priority
 
     def _client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(
-            timeout=30.0,
-            headers={"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"},
-        )
+        return http_clients.get("edgar")
 
-    async def get_recent_filings(self, cik: str, filing_type: str = "10-Q") -> list[dict]:
-        """Fetch list of recent filings for a company from EDGAR."""
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        await edgar_rate_limiter.acquire(self.priority)
+        return await self._client().get(url, **kwargs)
+
+    async def _get_json_revalidated(self, url: str, path: Path) -> dict:
+        """GET a JSON document, revalidating a disk copy with ETag/Last-Modified."""
+        cached = await asyncio.to_thread(_read_cache_file, path)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = await self._get(url, headers=headers)
+        if resp.status_code == 304 and cached:
+            return cached["body"]
+        resp.raise_for_status()
+        data = resp.json()
+        entry = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "body": data,
+        }
+        try:
+            await asyncio.to_thread(_write_cache_file, path, entry)
+        except OSError as e:
+            logger.warning("Failed to cache %s: %s", url, e)
+        return data
+
+    async def get_submissions(self, cik: str) -> dict:
+        """Fetch a company's EDGAR submissions JSON, revalidating a local cache.
+
+        The body is cached on disk with its ETag/Last-Modified validators, so
+        refreshes are conditional GETs that usually come back 304. Parsed
+        documents are also memoized briefly so back-to-back lookups for the
+        same CIK cost no request at all.
+        """
         cik_padded = cik.lstrip("0").zfill(10)
+        memo = _submissions_memo.get(cik_padded)
+        if memo and time.monotonic() - memo[0] < SUBMISSIONS_MEMO_SECONDS:
+            _submissions_memo.move_to_end(cik_padded)
+            return memo[1]
+
         url = f"{EDGAR_SUBMISSIONS_URL}/CIK{cik_padded}.json"
+        data = await self._get_json_revalidated(url, _submissions_cache_path(cik_padded))
+        _memoize_submissions(cik_padded, data)
+        return data
 
-        async with self._client() as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+    async def get_company_facts(self, cik: str) -> dict:
+        """Fetch a company's XBRL companyfacts JSON (every reported us-gaap fact).
+
+        Cached on disk and revalidated like the submissions document.
+        """
+        cik_padded = cik.lstrip("0").zfill(10)
+        url = f"{EDGAR_XBRL_URL}/companyfacts/CIK{cik_padded}.json"
+        path = Path(settings.LOCAL_CACHE_DIR) / "edgar" / "companyfacts" / f"CIK{cik_padded}.json"
+        return await self._get_json_revalidated(url, path)
 
+    async def get_frame(self, concept: str, unit: str, period: str) -> list[dict]:
+        """Fetch one XBRL frame: a single us-gaap concept for every filer in a period.
+
+        Args:
+            concept: us-gaap concept name (e.g. "Revenues")
+            unit: Unit of measure as used by the frames API (e.g. "USD", "USD-per-shares")
+            period: Calendar period, e.g. "CY2024Q4" (duration) or "CY2024Q4I" (instant)
+
+        Returns:
+            Frame rows (``cik``, ``end``, ``val``, ``accn``, ...); empty when
+            no filer reported the concept for that period.
+        """
+        url = f"{EDGAR_XBRL_URL}/frames/us-gaap/{concept}/{unit}/{period}.json"
+        resp = await self._get(url)
+        if resp.status_code == 404:
+            return []
+        resp.raise_for_status()
+        return resp.json().get("data", [])
+
+    async def get_recent_filings_by_form(
+        self, cik: str, form_types: tuple[str, ...] = ("10-Q", "10-K"), limit: int = 5
+    ) -> dict[str, list[dict]]:
+        """Fetch recent filings for several form types from one submissions document."""
+        data = await self.get_submissions(cik)
+        return self.filings_from_submissions(data, cik, form_types, limit)
+
+    @staticmethod
+    def filings_from_submissions(
+        data: dict, cik: str, form_types: tuple[str, ...], limit: int = 5
+    ) -> dict[str, list[dict]]:
+        """Pick the most recent filings of each form type out of a submissions document."""
         recent = data.get("filings", {}).get("recent", {})
         forms = recent.get("form", [])
         accession_numbers = recent.get("accessionNumber", [])
         filing_dates = recent.get("filingDate", [])
         primary_docs = recent.get("primaryDocument", [])
 
-        filings = []
+        filings: dict[str, list[dict]] = {form_type: [] for form_type in form_types}
+        cik_num = cik.lstrip("0")
         for i, form in enumerate(forms):
-            if form != filing_type:
+            if form not in filings or len(filings[form]) >= limit:
                 continue
             accession = accession_numbers[i]
             accession_no_dash = accession.replace("-", "")
-            cik_num = cik.lstrip("0")
             doc_url = (
                 f"{EDGAR_ARCHIVES_URL}/{cik_num}/{accession_no_dash}/{primary_docs[i]}"
             )
-            filings.append({
+            filings[form].append({
                 "accession_number": accession,
                 "filing_date": filing_dates[i],
                 "form_type": form,
                 "primary_document_url": doc_url,
             })
-            if len(filings) >= 5:
+
+        return filings
+
+    async def get_recent_filings(self, cik: str, filing_type: str = "10-Q") -> list[dict]:
+        """Fetch list of recent filings for a company from EDGAR."""
+        filings = await self.get_recent_filings_by_form(cik, (filing_type,))
+        return filings[filing_type]
+
+    async def get_current_filings(
+        self, form_type: str, since: datetime | None = None, max_pages: int = 5
+    ) -> list[dict]:
+        """Fetch filings of one form type from EDGAR's latest-filings Atom feed.
+
+        One request returns up to 100 filings across all filers. Pages are
+        followed until entries older than ``since`` appear or ``max_pages``
+        is reached.
+
+        Returns:
+            List of {"cik", "accession_number", "form_type", "filing_date"}
+            dicts, CIK without leading zeros.
+        """
+        filings = []
+        for page in range(max_pages):
+            resp = await self._get(
+                EDGAR_CURRENT_FEED_URL,
+                params={
+                    "action": "getcurrent",
+                    "type": form_type,
+                    "owner": "include",
+                    "start": page * 100,
+                    "count": 100,
+                    "output": "atom",
+                },
+            )
+            resp.raise_for_status()
+            entries = self.parse_current_feed(resp.content)
+            reached_since = False
+            for entry in entries:
+                if since and entry["updated"] and entry["updated"] < since:
+                    reached_since = True
+                    break
+                if entry["form_type"] == form_type:
+                    filings.append(entry)
+            if reached_since or len(entries) < 100:
                 break
+        return filings
+
+    @staticmethod
+    def parse_current_feed(content: bytes) -> list[dict]:
+        """Parse the EDGAR "getcurrent" Atom feed into filing dicts."""
+        root = ET.fromstring(content)
+        entries = []
+        for entry in root.findall("atom:entry", ATOM_NS):
+            title = entry.findtext("atom:title", "", ATOM_NS)
+            entry_id = entry.findtext("atom:id", "", ATOM_NS)
+            summary = entry.findtext("atom:summary", "", ATOM_NS)
+            updated_raw = entry.findtext("atom:updated", "", ATOM_NS)
+            category = entry.find("atom:category", ATOM_NS)
 
+            cik_match = re.search(r"\((\d{10})\)", title)
+            accession_match = re.search(r"accession-number=([\d-]+)", entry_id)
+            if not cik_match or not accession_match:
+                continue
+            date_match = re.search(r"Filed:\s*(?:</b>)?\s*(\d{4}-\d{2}-\d{2})", summary)
+            try:
+                updated = datetime.fromisoformat(updated_raw)
+            except ValueError:
+                updated = None
+
+            entries.append({
+                "cik": cik_match.group(1).lstrip("0"),
+                "accession_number": accession_match.group(1),
+                "form_type": category.get("term") if category is not None else title.split(" - ")[0],
+                "filing_date": date_match.group(1) if date_match else updated_raw[:10],
+                "updated": updated,
+            })
+        return entries
+
+    async def get_daily_index_filings(
+        self, day: date, form_types: tuple[str, ...] = ("10-Q", "10-K")
+    ) -> list[dict]:
+        """Fetch one day's EDGAR form index and return filings of the given types.
+
+        The index lists every filing accepted that day in a single request.
+        Returns an empty list if the index is not published yet (weekends,
+        holidays, or before the nightly build).
+        """
+        quarter = (day.month - 1) // 3 + 1
+        url = f"{EDGAR_DAILY_INDEX_URL}/{day.year}/QTR{quarter}/form.{day:%Y%m%d}.idx"
+        resp = await self._get(url)
+        if resp.status_code in (403, 404):
+            return []
+        resp.raise_for_status()
+        return self.parse_daily_index(resp.text, form_types)
+
+    @staticmethod
+    def parse_daily_index(text: str, form_types: tuple[str, ...]) -> list[dict]:
+        """Parse a fixed-width EDGAR form.YYYYMMDD.idx file."""
+        filings = []
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) < 5 or parts[0] not in form_types:
+                continue
+            file_name, date_filed, cik = parts[-1], parts[-2], parts[-3]
+            accession_match = re.search(r"(\d{10}-\d{2}-\d{6})\.txt$", file_name)
+            if not accession_match or not cik.isdigit():
+                continue
+            filing_date = (
+                f"{date_filed[:4]}-{date_filed[4:6]}-{date_filed[6:8]}"
+                if len(date_filed) == 8 else date_filed
+            )
+            filings.append({
+                "cik": cik.lstrip("0"),
+                "accession_number": accession_match.group(1),
+                "form_type": parts[0],
+                "filing_date": filing_date,
+            })
         return filings
 
     async def download_filing(self, url: str) -> bytes:
         """Download a filing document by its full URL."""
-        async with self._client() as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            return resp.content
+        resp = await self._get(url)
+        resp.raise_for_status()
+        return resp.content
 
-    def parse_filing_html(self, content: bytes) -> str:
+    def parse_filing_html(self, content: bytes, max_chars: int = MAX_FILING_TEXT_CHARS) -> str:
         """Extract text content from an EDGAR HTML filing.
 
-        Uses regex-based tag stripping for lightweight parsing.
-        Falls back gracefully if beautifulsoup4 is available.
+        Streams the document through ``filing_parser.html_to_text``, so memory
+        stays bounded and parsing stops once ``max_chars`` is reached.
+        Pass ``max_chars=MAX_FULL_FILING_TEXT_CHARS`` when the text feeds
+        section extraction, so later Items are not cut off.
         """
-        try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(content, "lxml")
-            # Remove script and style elements
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-            text = soup.get_text(separator="\n")
-        except ImportError:
-            # Fallback: simple regex tag stripping
-            text_str = content.decode("utf-8", errors="replace")
-            text = re.sub(r"<[^>]+>", " ", text_str)
-
-        # Clean up whitespace
-        lines = [line.strip() for line in text.splitlines()]
-        text = "\n".join(line for line in lines if line)
-
-        # Truncate to fit LLM context
-        if len(text) > MAX_FILING_TEXT_CHARS:
-            text = text[:MAX_FILING_TEXT_CHARS]
-
-        return text
+        return html_to_text(content, max_chars)
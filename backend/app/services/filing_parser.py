@@ -0,0 +1,246 @@
+"""Streaming HTML-to-text conversion for SEC / SEDAR+ filings.
+
+Inline-XBRL 10-Ks can be tens of megabytes. Building a full DOM for them
+costs hundreds of MB and seconds of CPU, so filings are instead fed in
+chunks to an event-driven parser (lxml's target parser, or the standard
+library's HTMLParser when lxml is unavailable) that only keeps the text it
+will emit. Hidden content (``ix:header``, ``display:none``), scripts and
+number-dominated tables are dropped, and parsing stops as soon as the
+character budget is reached.
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+FEED_CHUNK_BYTES = 64 * 1024
+
+# Elements whose whole subtree is discarded
+SKIPPED_TAGS = frozenset({"script", "style", "head", "noscript", "template", "ix:header"})
+
+# Elements that end a line of text
+BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "br", "caption", "center", "dd", "div", "dl",
+    "dt", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "ol", "p", "pre", "section", "table", "tbody", "tfoot", "thead", "tr", "ul",
+})
+CELL_TAGS = frozenset({"td", "th"})
+VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "wbr"}
+)
+
+# A table is treated as numeric noise when at least this share of its
+# non-empty cells contain only figures
+NUMERIC_TABLE_RATIO = 0.5
+_NUMERIC_CELL_RE = re.compile(r"^[\s$€£¥%().,\-–—0-9]*[0-9][\s$€£¥%().,\-–—0-9]*$")
+_HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+
+
+class _BudgetReached(Exception):
+    pass
+
+
+class _Table:
+    __slots__ = ("lines", "cells", "numeric_cells", "cell")
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.cells = 0
+        self.numeric_cells = 0
+        self.cell: list[str] = []
+
+
+class _TextCollector:
+    """Parser target that accumulates visible text up to ``max_chars``.
+
+    Implements the lxml target interface (``start``/``end``/``data``/``close``)
+    and is driven the same way by the stdlib fallback.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.size = 0
+        self.done = False
+        self._lines: list[str] = []
+        self._line: list[str] = []
+        self._stack: list[str] = []
+        self._skip_depth: int | None = None
+        self._tables: list[_Table] = []
+
+    # -- parser target interface ------------------------------------------
+
+    def start(self, tag, attrib) -> None:
+        tag = tag.lower() if isinstance(tag, str) else ""
+        self._stack.append(tag)
+        if self._skip_depth is not None:
+            return
+        style = attrib.get("style") or ""
+        if tag in SKIPPED_TAGS or (style and _HIDDEN_STYLE_RE.search(style)):
+            self._skip_depth = len(self._stack)
+            return
+        if tag == "table":
+            self._break_line()
+            self._tables.append(_Table())
+
+    def end(self, tag) -> None:
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag not in self._stack:
+            return
+        while self._stack:
+            closed = self._stack.pop()
+            self._close_element(closed, len(self._stack) + 1)
+            if closed == tag:
+                break
+
+    def data(self, text: str) -> None:
+        if self._skip_depth is not None or self.done:
+            return
+        if self._tables:
+            self._tables[-1].cell.append(text)
+        else:
+            self._line.append(text)
+
+    def close(self) -> str:
+        try:
+            while self._stack and not self.done:
+                self._close_element(self._stack.pop(), len(self._stack) + 1)
+            if not self.done:
+                self._break_line()
+        except _BudgetReached:
+            pass
+        return "\n".join(self._lines)[: self.max_chars]
+
+    # -- internals ---------------------------------------------------------
+
+    def _close_element(self, tag: str, depth: int) -> None:
+        if self._skip_depth is not None:
+            if depth == self._skip_depth:
+                self._skip_depth = None
+            return
+        if tag in CELL_TAGS and self._tables:
+            self._end_cell(self._tables[-1])
+        elif tag == "tr" and self._tables:
+            table = self._tables[-1]
+            self._end_cell(table)
+            table.lines.append("\x00")
+        elif tag == "table" and self._tables:
+            self._end_table(self._tables.pop())
+        elif tag in BLOCK_TAGS:
+            if self._tables:
+                self._tables[-1].cell.append("\n")
+            else:
+                self._break_line()
+
+    def _end_cell(self, table: _Table) -> None:
+        text = _clean("".join(table.cell))
+        table.cell = []
+        if not text:
+            return
+        table.cells += 1
+        if _NUMERIC_CELL_RE.match(text):
+            table.numeric_cells += 1
+        table.lines.append(text)
+
+    def _end_table(self, table: _Table) -> None:
+        self._end_cell(table)
+        if table.cells and table.numeric_cells / table.cells >= NUMERIC_TABLE_RATIO:
+            return
+        rows = " ".join(table.lines).split("\x00")
+        text = "\n".join(row.strip() for row in rows if row.strip())
+        if self._tables:
+            # Nested layout table: hand the text to the enclosing one
+            self._tables[-1].cell.append(text + "\n")
+            return
+        for line in text.splitlines():
+            self._emit(line)
+
+    def _break_line(self) -> None:
+        if self._line:
+            text = "".join(self._line)
+            self._line = []
+            for line in text.splitlines():
+                self._emit(line)
+
+    def _emit(self, line: str) -> None:
+        line = _clean(line)
+        if not line:
+            return
+        self._lines.append(line)
+        self.size += len(line) + 1
+        if self.size >= self.max_chars:
+            self.done = True
+            raise _BudgetReached
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class _StdlibAdapter(HTMLParser):
+    """Drives a ``_TextCollector`` from the standard library's HTMLParser."""
+
+    def __init__(self, target: _TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+        if tag in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def _feed_lxml(content: bytes, target: _TextCollector) -> None:
+    from lxml import etree
+
+    parser = etree.HTMLParser(target=target, recover=True, remove_comments=True, remove_pis=True)
+    for offset in range(0, len(content), FEED_CHUNK_BYTES):
+        parser.feed(content[offset : offset + FEED_CHUNK_BYTES])
+        if target.done:
+            return
+    try:
+        parser.close()
+    except etree.LxmlError:
+        pass  # empty or unrecoverable tail; keep what was collected
+
+
+def _feed_stdlib(content: bytes, target: _TextCollector) -> None:
+    parser = _StdlibAdapter(target)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for offset in range(0, len(content), FEED_CHUNK_BYTES):
+        parser.feed(decoder.decode(content[offset : offset + FEED_CHUNK_BYTES]))
+        if target.done:
+            return
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+
+
+def html_to_text(content: bytes, max_chars: int) -> str:
+    """Convert filing HTML to plain text, one block element per line.
+
+    Args:
+        content: Raw HTML bytes
+        max_chars: Character budget; parsing stops once it is reached
+
+    Returns:
+        Extracted text, at most ``max_chars`` long
+    """
+    target = _TextCollector(max_chars)
+    try:
+        try:
+            _feed_lxml(content, target)
+        except ImportError:
+            _feed_stdlib(content, target)
+    except _BudgetReached:
+        pass
+    return target.close()
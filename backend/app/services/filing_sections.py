@@ -0,0 +1,154 @@
+"""Section-aware extraction of 10-K / 10-Q filing text for LLM prompts.
+
+The head of a filing is mostly cover page, table of contents and
+forward-looking-statement boilerplate. Instead of truncating, this module
+locates the "Item N." sections and builds a prompt context from the ones that
+matter for each use, within a character budget.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PART_RE = re.compile(r"^[ \t]*PART[ \t]+(IV|III|II|I)\b", re.IGNORECASE | re.MULTILINE)
+_ITEM_RE = re.compile(
+    r"^[ \t]*(?:PART[ \t]+(?:IV|III|II|I)[ \t]*[,.\-–—]?[ \t]*)?ITEM[ \t\xa0]+(\d{1,2}[A-C]?)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+SECTION_TITLES = {
+    "1": "Item 1. Business",
+    "1A": "Item 1A. Risk Factors",
+    "7": "Item 7. Management's Discussion and Analysis",
+    "7A": "Item 7A. Quantitative and Qualitative Disclosures About Market Risk",
+    "I-2": "Part I, Item 2. Management's Discussion and Analysis",
+    "I-3": "Part I, Item 3. Quantitative and Qualitative Disclosures About Market Risk",
+    "II-1A": "Part II, Item 1A. Risk Factors",
+}
+
+# (section key, share of the budget) per form type and prompt purpose
+CONTEXT_PLANS: dict[tuple[str, str], list[tuple[str, float]]] = {
+    ("10-K", "profile"): [("1", 0.55), ("7", 0.30), ("1A", 0.15)],
+    ("10-K", "quarterly"): [("7", 0.70), ("1A", 0.15), ("7A", 0.15)],
+    ("10-Q", "profile"): [("I-2", 0.80), ("II-1A", 0.20)],
+    ("10-Q", "quarterly"): [("I-2", 0.75), ("II-1A", 0.15), ("I-3", 0.10)],
+}
+
+
+def extract_sections(text: str, form_type: str) -> dict[str, str]:
+    """Split filing text into its "Item" sections.
+
+    10-Q item numbers repeat across parts, so their keys are prefixed with
+    the part ("I-2", "II-1A"). When a heading appears several times (table of
+    contents, cross-references), the occurrence with the longest body wins.
+    """
+    quarterly = form_type.startswith("10-Q")
+    # (position, 0 = part / 1 = item, value): on a "PART II - ITEM 1A" line
+    # the part marker sorts first so the item is attributed to it
+    markers: list[tuple[int, int, str]] = []
+    for m in _PART_RE.finditer(text):
+        markers.append((m.start(), 0, m.group(1).upper()))
+    for m in _ITEM_RE.finditer(text):
+        markers.append((m.start(), 1, m.group(1).upper()))
+    markers.sort()
+
+    headings: list[tuple[int, str]] = []
+    part = "I"
+    for pos, kind, value in markers:
+        if kind == 0:
+            part = value
+            continue
+        headings.append((pos, f"{part}-{value}" if quarterly else value))
+
+    sections: dict[str, str] = {}
+    for i, (pos, key) in enumerate(headings):
+        end = headings[i + 1][0] if i + 1 < len(headings) else len(text)
+        body = text[pos:end].strip()
+        if len(body) > len(sections.get(key, "")):
+            sections[key] = body
+    return sections
+
+
+def build_prompt_context(
+    sections: dict[str, str], text: str, form_type: str, purpose: str, budget: int
+) -> str:
+    """Assemble a budgeted prompt context from the sections relevant to ``purpose``.
+
+    Budget left unused by a short section is handed to the following ones.
+    Falls back to the head of the filing when no planned section was found.
+    """
+    base_form = "10-Q" if form_type.startswith("10-Q") else "10-K"
+    plan = [
+        (key, share)
+        for key, share in CONTEXT_PLANS.get((base_form, purpose), [])
+        if sections.get(key)
+    ]
+    if not plan:
+        return text[:budget]
+
+    total_share = sum(share for _, share in plan)
+    parts: list[str] = []
+    remaining = budget
+    carry = 0
+    for key, share in plan:
+        allowance = min(remaining, int(budget * share / total_share) + carry)
+        header = f"=== {SECTION_TITLES.get(key, 'Item ' + key)} ===\n"
+        body = sections[key][: max(allowance - len(header), 0)]
+        if not body:
+            continue
+        parts.append(header + body)
+        used = len(header) + len(body)
+        carry = allowance - used
+        remaining -= used
+    return "\n\n".join(parts)
+
+
+def _cache_path(accession_number: str) -> Path:
+    return Path(settings.LOCAL_CACHE_DIR) / "sections" / f"{accession_number}.json"
+
+
+def _load_or_extract(accession_number: str | None, text: str, form_type: str) -> dict[str, str]:
+    if not accession_number:
+        return extract_sections(text, form_type)
+    path = _cache_path(accession_number)
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+    sections = extract_sections(text, form_type)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(sections))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Failed to cache sections for %s: %s", accession_number, e)
+    return sections
+
+
+async def get_filing_context(
+    text: str,
+    form_type: str,
+    purpose: str,
+    accession_number: str | None = None,
+    budget: int | None = None,
+) -> str:
+    """Return the budgeted prompt context for a filing, caching sections per accession.
+
+    Args:
+        text: Full parsed filing text
+        form_type: "10-K", "10-Q" (amendments accepted)
+        purpose: "profile" or "quarterly"
+        accession_number: EDGAR accession number used as the cache key
+        budget: Max characters (defaults to FILING_CONTEXT_CHARS)
+    """
+    budget = budget or settings.FILING_CONTEXT_CHARS
+    sections = await asyncio.to_thread(_load_or_extract, accession_number, text, form_type)
+    return build_prompt_context(sections, text, form_type, purpose, budget)
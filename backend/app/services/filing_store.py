@@ -0,0 +1,217 @@
+"""Tiered filing store: local content-addressed disk cache → S3 → SEC.
+
+Filings are immutable once accepted, so an accession number identifies the
+bytes forever. Locally, bodies are stored by SHA-256 (identical documents are
+kept once) with a small accession → hash pointer file, and the directory is
+kept under FILING_STORE_MAX_BYTES by evicting least-recently-used objects.
+S3 holds a durable copy under ``filings/{accession}.html`` that is written
+behind the request, so callers never wait on the upload. Filings archived
+before that layout (``Document.s3_key``, ``companies/{id}/...``) are still
+read from S3 and copied to the new key.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.document import Document
+from app.services.edgar_service import EdgarService
+
+logger = logging.getLogger(__name__)
+
+_pending_uploads: set[asyncio.Task] = set()
+
+
+def filing_s3_key(accession_number: str) -> str:
+    return f"filings/{accession_number}.html"
+
+
+async def flush_pending_uploads() -> None:
+    """Wait for every S3 write-behind upload started by this process."""
+    if _pending_uploads:
+        await asyncio.gather(*list(_pending_uploads), return_exceptions=True)
+
+
+class FilingStore:
+    """Reads filings from the cheapest tier that has them, filling the faster tiers."""
+
+    def __init__(
+        self,
+        edgar: EdgarService | None = None,
+        root: str | None = None,
+        db: AsyncSession | None = None,
+    ):
+        self.edgar = edgar or EdgarService()
+        self.root = Path(root or settings.LOCAL_CACHE_DIR) / "filings"
+        self.max_bytes = settings.FILING_STORE_MAX_BYTES
+        # Used to find copies archived under Document.s3_key before filings/{accession}
+        self.db = db
+        self._uploads: dict[str, asyncio.Task] = {}
+        self._archived: dict[str, str] = {}
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    async def get_filing(self, filing: dict) -> bytes:
+        """Return a filing's primary document given an EDGAR filing dict."""
+        return await self.get(filing["accession_number"], filing["primary_document_url"])
+
+    async def get(self, accession_number: str, source_url: str) -> bytes:
+        """Return filing bytes from local disk, then S3, then SEC (last resort)."""
+        content = await asyncio.to_thread(self._read_local, accession_number)
+        if content is not None:
+            return content
+
+        content = await self._read_s3(accession_number)
+        if content is not None:
+            await asyncio.to_thread(self._write_local, accession_number, content)
+            return content
+
+        legacy_key = await self._legacy_s3_key(accession_number, source_url)
+        if legacy_key:
+            content = await self._read_s3_key(accession_number, legacy_key)
+            if content is not None:
+                self._archived[accession_number] = legacy_key
+                await self.put(accession_number, content)  # backfill filings/{accession}
+                return content
+
+        content = await self.edgar.download_filing(source_url)
+        await self.put(accession_number, content)
+        return content
+
+    async def put(self, accession_number: str, content: bytes, upload: bool = True) -> None:
+        """Store filing bytes locally and schedule the S3 copy (see ``s3_key``)."""
+        await asyncio.to_thread(self._write_local, accession_number, content)
+        if not upload or not settings.S3_BUCKET_NAME:
+            return
+        task = asyncio.create_task(self._upload(accession_number, content))
+        self._uploads[accession_number] = task
+        _pending_uploads.add(task)
+        task.add_done_callback(_pending_uploads.discard)
+
+    async def s3_key(self, accession_number: str) -> str | None:
+        """S3 key of a filing this store has read or written, once it is known to exist.
+
+        Waits for a pending upload; None if the upload failed, S3 is disabled,
+        or the filing was only served from local disk.
+        """
+        task = self._uploads.get(accession_number)
+        key = await asyncio.shield(task) if task else None
+        return key or self._archived.get(accession_number)
+
+    # ------------------------------------------------------------------ #
+    # S3 tier
+    # ------------------------------------------------------------------ #
+
+    async def _read_s3(self, accession_number: str) -> bytes | None:
+        key = filing_s3_key(accession_number)
+        content = await self._read_s3_key(accession_number, key)
+        if content is not None:
+            self._archived[accession_number] = key
+        return content
+
+    async def _read_s3_key(self, accession_number: str, key: str) -> bytes | None:
+        if not settings.S3_BUCKET_NAME:
+            return None
+        from app.services.storage_service import StorageService
+
+        try:
+            return await StorageService().download_file(key)
+        except Exception as e:
+            logger.warning("S3 lookup failed for filing %s: %s", accession_number, e)
+            return None
+
+    async def _legacy_s3_key(self, accession_number: str, source_url: str) -> str | None:
+        """S3 key of a copy archived under an older layout, from the documents table."""
+        if self.db is None or not settings.S3_BUCKET_NAME:
+            return None
+        try:
+            result = await self.db.execute(
+                select(Document.s3_key)
+                .where(
+                    Document.source_url == source_url,
+                    Document.s3_key.is_not(None),
+                    Document.s3_key != filing_s3_key(accession_number),
+                )
+                .order_by(Document.created_at.desc())
+                .limit(1)
+            )
+        except Exception as e:
+            logger.warning("Archived filing lookup failed for %s: %s", accession_number, e)
+            return None
+        return result.scalar_one_or_none()
+
+    async def _upload(self, accession_number: str, content: bytes) -> str | None:
+        from app.services.storage_service import StorageService
+
+        try:
+            key = await StorageService().upload_file(
+                key=filing_s3_key(accession_number), content=content
+            )
+        except Exception as e:
+            logger.warning("Write-behind upload failed for filing %s: %s", accession_number, e)
+            return None
+        if key is None:
+            logger.warning("Write-behind upload failed for filing %s", accession_number)
+        return key
+
+    # ------------------------------------------------------------------ #
+    # Local disk tier (blocking, run in a thread)
+    # ------------------------------------------------------------------ #
+
+    def _pointer_path(self, accession_number: str) -> Path:
+        return self.root / "accessions" / f"{accession_number}.json"
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def _read_local(self, accession_number: str) -> bytes | None:
+        try:
+            pointer = json.loads(self._pointer_path(accession_number).read_text())
+            path = self._object_path(pointer["sha256"])
+            content = path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        if hashlib.sha256(content).hexdigest() != pointer["sha256"]:
+            logger.warning("Corrupt cached filing %s, discarding", accession_number)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # mark as recently used for LRU eviction
+        return content
+
+    def _write_local(self, accession_number: str, content: bytes) -> None:
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._object_path(sha256)
+        try:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{sha256}.{os.getpid()}.tmp")
+                tmp.write_bytes(content)
+                os.replace(tmp, path)
+            pointer = self._pointer_path(accession_number)
+            pointer.parent.mkdir(parents=True, exist_ok=True)
+            pointer.write_text(json.dumps({"sha256": sha256, "size": len(content)}))
+            self._evict()
+        except OSError as e:
+            logger.warning("Failed to cache filing %s locally: %s", accession_number, e)
+
+    def _evict(self) -> None:
+        """Delete least-recently-used objects until the store fits its size cap."""
+        objects = [p for p in (self.root / "objects").glob("*/*") if not p.name.endswith(".tmp")]
+        stats = [(p, p.stat()) for p in objects]
+        total = sum(st.st_size for _, st in stats)
+        if total <= self.max_bytes:
+            return
+        for path, st in sorted(stats, key=lambda item: item[1].st_mtime):
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            if total <= self.max_bytes * 0.9:
+                break
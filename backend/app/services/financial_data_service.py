@@ -2,20 +2,37 @@
 
 import asyncio
 import logging
+import re
 
 import httpx
 
+from app.config import settings
+from app.services.cache import JsonCache
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import Priority, QuotaExhaustedError, alpha_vantage_quota
+
 logger = logging.getLogger(__name__)
 
+# Alpha Vantage answers throttled calls with HTTP 200 and a "Note" or
+# "Information" message instead of data
+_THROTTLE_RE = re.compile(r"call frequency|rate limit|calls per|requests per", re.IGNORECASE)
+_DAILY_THROTTLE_RE = re.compile(r"per day|daily", re.IGNORECASE)
+
+BULK_QUOTES_MAX_SYMBOLS = 100
+
+_statement_cache = JsonCache("av:statement", settings.ALPHA_VANTAGE_STATEMENT_CACHE_TTL_SECONDS)
+# Set once REALTIME_BULK_QUOTES answers with a plan notice, so it is not re-probed each refresh
+_bulk_quotes_unsupported = JsonCache("av:bulk_quotes", settings.BULK_QUOTES_UNSUPPORTED_TTL_SECONDS)
+
 
 class FinancialDataService:
     """Pulls structured financial data from Alpha Vantage (free tier available)."""
 
-    def __init__(self):
+    def __init__(self, priority: Priority = Priority.INTERACTIVE):
+        self.priority = priority
         self.base_url = "https://www.alphavantage.co"
         # Get free API key at: https://www.alphavantage.co/support/#api-key
         # Set ALPHA_VANTAGE_API_KEY in Railway environment variables
-        from app.config import settings
         self.api_key = getattr(settings, 'ALPHA_VANTAGE_API_KEY', 'demo')
 
     @staticmethod
@@ -27,68 +44,127 @@ class FinancialDataService:
         return ticker
 
     def _client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=30.0,
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        )
+        return http_clients.get("alpha_vantage")
 
     async def _get(self, function: str, params: dict | None = None) -> dict:
         params = params or {}
         params["function"] = function
         params["apikey"] = self.api_key
-        async with self._client() as client:
-            resp = await client.get("/query", params=params)
-            if resp.status_code == 429:
-                raise RuntimeError("Alpha Vantage rate limit exceeded (5 calls/min, 500/day on free tier)")
-            resp.raise_for_status()
-            return resp.json()
-
-    async def get_income_statement(self, ticker: str, period: str = "quarterly") -> list[dict]:
+        await alpha_vantage_quota.acquire(self.priority)
+        resp = await self._client().get("/query", params=params)
+        if resp.status_code == 429:
+            await alpha_vantage_quota.report_throttle()
+            raise QuotaExhaustedError("Alpha Vantage rate limit exceeded (HTTP 429)")
+        resp.raise_for_status()
+        data = resp.json()
+        message = data.get("Note") or data.get("Information")
+        if message and _THROTTLE_RE.search(message):
+            # The per-minute notice also quotes the daily limit; only treat
+            # the message as daily exhaustion when it says nothing about minutes
+            daily = bool(_DAILY_THROTTLE_RE.search(message)) and "minute" not in message.lower()
+            await alpha_vantage_quota.report_throttle(daily=daily)
+            raise QuotaExhaustedError(f"Alpha Vantage throttled: {message}")
+        return data
+
+    async def _get_statement(self, function: str, symbol: str) -> dict:
+        """Fetch a full statement payload (all annual and quarterly reports), cached.
+
+        Alpha Vantage returns every period in one response, so the raw payload
+        is cached per (function, symbol) and every period view and history
+        depth is served from it without spending more quota.
+        """
+        key = f"{function}:{symbol}"
+        data = await _statement_cache.get(key)
+        if data is None:
+            data = await self._get(function, {"symbol": symbol})
+            if data.get("annualReports") or data.get("quarterlyReports"):
+                await _statement_cache.set(key, data)
+        return data
+
+    @staticmethod
+    def _reports(data: dict, period: str, limit: int) -> list[dict]:
+        reports = data.get("quarterlyReports", []) if period == "quarterly" else data.get("annualReports", [])
+        return reports[:limit]
+
+    async def get_income_statement(
+        self, ticker: str, period: str = "quarterly", limit: int = 4
+    ) -> list[dict]:
         """Fetch income statement from Alpha Vantage."""
         try:
-            if period == "quarterly":
-                data = await self._get("INCOME_STATEMENT", {"symbol": ticker})
-            else:
-                data = await self._get("INCOME_STATEMENT", {"symbol": ticker})
-            
-            annual_reports = data.get("annualReports", [])
-            quarterly_reports = data.get("quarterlyReports", [])
-            
-            reports = quarterly_reports if period == "quarterly" else annual_reports
+            data = await self._get_statement("INCOME_STATEMENT", ticker)
+            reports = self._reports(data, period, limit)
             if not reports:
                 logger.warning("No income statement data for %s", ticker)
                 return []
             
-            return [self._map_income_av(item) for item in reports[:4]]
+            return [self._map_income_av(item) for item in reports]
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logger.warning("Alpha Vantage income statement failed for %s: %s", ticker, e)
             return []
 
-    async def get_balance_sheet(self, ticker: str, period: str = "quarterly") -> list[dict]:
+    async def get_balance_sheet(
+        self, ticker: str, period: str = "quarterly", limit: int = 4
+    ) -> list[dict]:
         """Fetch balance sheet from Alpha Vantage."""
         try:
-            data = await self._get("BALANCE_SHEET", {"symbol": ticker})
-            reports = data.get("quarterlyReports", []) if period == "quarterly" else data.get("annualReports", [])
+            data = await self._get_statement("BALANCE_SHEET", ticker)
+            reports = self._reports(data, period, limit)
             if not reports:
                 return []
-            return [self._map_balance_av(item) for item in reports[:4]]
+            return [self._map_balance_av(item) for item in reports]
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logger.warning("Alpha Vantage balance sheet failed for %s: %s", ticker, e)
             return []
 
-    async def get_cash_flow(self, ticker: str, period: str = "quarterly") -> list[dict]:
+    async def get_cash_flow(
+        self, ticker: str, period: str = "quarterly", limit: int = 4
+    ) -> list[dict]:
         """Fetch cash flow from Alpha Vantage."""
         try:
-            data = await self._get("CASH_FLOW", {"symbol": ticker})
-            reports = data.get("quarterlyReports", []) if period == "quarterly" else data.get("annualReports", [])
+            data = await self._get_statement("CASH_FLOW", ticker)
+            reports = self._reports(data, period, limit)
             if not reports:
                 return []
-            return [self._map_cashflow_av(item) for item in reports[:4]]
+            return [self._map_cashflow_av(item) for item in reports]
+        except QuotaExhaustedError:
+            raise
         except Exception as e:
             logger.warning("Alpha Vantage cash flow failed for %s: %s", ticker, e)
             return []
 
+    async def get_financials(
+        self,
+        ticker: str,
+        statements: tuple[str, ...] = ("income", "balance", "cashflow", "segments"),
+        period: str = "quarterly",
+    ) -> dict[str, list[dict]]:
+        """Fetch several statements concurrently under the shared quota.
+
+        Each statement keeps its own failure handling (an empty list when it
+        could not be fetched); a quota error is re-raised once every fetch
+        has settled.
+
+        Returns:
+            Statement name -> mapped records, for each requested statement
+        """
+        fetchers = {
+            "income": lambda: self.get_income_statement(ticker, period),
+            "balance": lambda: self.get_balance_sheet(ticker, period),
+            "cashflow": lambda: self.get_cash_flow(ticker, period),
+            "segments": lambda: self.get_segments(ticker),
+        }
+        results = await asyncio.gather(
+            *(fetchers[name]() for name in statements), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dict(zip(statements, results))
+
     async def get_segments(self, ticker: str) -> list[dict]:
         """Segment data not available in Alpha Vantage."""
         logger.warning("Segment data not available for %s", ticker)
@@ -155,6 +231,44 @@ class FinancialDataService:
             logger.warning("Quote fetch failed for %s: %s", ticker, e)
             return None
 
+    async def get_bulk_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        """Fetch quotes for many tickers with REALTIME_BULK_QUOTES (up to 100 per call).
+
+        Returns quotes shaped like ``get_quote`` keyed by ticker. Tickers the
+        endpoint did not return (or every ticker, when the API key's plan
+        does not include the endpoint) are simply absent. A plan without the
+        endpoint is remembered so later calls cost no quota.
+        """
+        quotes: dict[str, dict] = {}
+        if await _bulk_quotes_unsupported.get("unsupported"):
+            return quotes
+        for start in range(0, len(tickers), BULK_QUOTES_MAX_SYMBOLS):
+            batch = tickers[start : start + BULK_QUOTES_MAX_SYMBOLS]
+            try:
+                data = await self._get("REALTIME_BULK_QUOTES", {"symbol": ",".join(batch)})
+            except QuotaExhaustedError:
+                raise
+            except Exception as e:
+                logger.warning("Bulk quote fetch failed for %d tickers: %s", len(batch), e)
+                continue
+            if "data" not in data:
+                logger.info("REALTIME_BULK_QUOTES unavailable: %s", data.get("Information") or data)
+                if data.get("Information"):
+                    await _bulk_quotes_unsupported.set("unsupported", True)
+                break
+            for row in data["data"]:
+                try:
+                    quotes[row["symbol"]] = {
+                        "price": float(row["close"]),
+                        "change": float(row["change"]),
+                        "change_pct": float(str(row["change_percent"]).replace("%", "")),
+                        "prev_close": float(row["previous_close"]),
+                        "latest_trading_day": str(row.get("timestamp", ""))[:10],
+                    }
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return quotes
+
     @staticmethod
     def _map_cashflow_av(item: dict) -> dict:
         """Map Alpha Vantage cash flow format."""
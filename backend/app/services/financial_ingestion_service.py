@@ -1,15 +1,19 @@
-"""Service for ingesting financial data from FMP into the database."""
+"""Service for ingesting financial data (SEC XBRL, Alpha Vantage) into the database."""
 
 import logging
 from decimal import Decimal
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.company import Company
+from app.models.base import generate_uuid
 from app.models.financial_snapshot import FinancialSnapshot, Segment
+from app.services.container import services
 from app.services.financial_data_service import FinancialDataService
+from app.services.xbrl_financials_service import XbrlFinancialsService, latest_complete_quarter
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +32,55 @@ def _safe_divide(num, denom) -> Decimal | None:
     return Decimal(str(num)) / Decimal(str(denom))
 
 
+def snapshot_columns(inc: dict, bal: dict, cf: dict) -> dict:
+    """FinancialSnapshot column values (with derived ratios) from mapped statements."""
+    # Compute derived margins
+    revenue = inc.get("revenue")
+    gross_profit = inc.get("gross_profit")
+    operating_income = inc.get("operating_income")
+    net_income = inc.get("net_income")
+    total_equity = bal.get("total_equity")
+    total_debt = bal.get("total_debt")
+
+    return {
+        # Income statement
+        "revenue": _to_decimal(revenue),
+        "cost_of_revenue": _to_decimal(inc.get("cost_of_revenue")),
+        "gross_profit": _to_decimal(gross_profit),
+        "operating_income": _to_decimal(operating_income),
+        "net_income": _to_decimal(net_income),
+        "ebitda": _to_decimal(inc.get("ebitda")),
+        "eps_diluted": _to_decimal(inc.get("eps_diluted")),
+        "shares_outstanding": _to_decimal(inc.get("shares_outstanding")),
+        # Balance sheet
+        "total_assets": _to_decimal(bal.get("total_assets")),
+        "total_liabilities": _to_decimal(bal.get("total_liabilities")),
+        "total_equity": _to_decimal(total_equity),
+        "cash_and_equivalents": _to_decimal(bal.get("cash_and_equivalents")),
+        "total_debt": _to_decimal(total_debt),
+        # Cash flow
+        "operating_cash_flow": _to_decimal(cf.get("operating_cash_flow")),
+        "capital_expenditures": _to_decimal(cf.get("capital_expenditures")),
+        "free_cash_flow": _to_decimal(cf.get("free_cash_flow")),
+        # Derived ratios
+        "gross_margin": _safe_divide(gross_profit, revenue),
+        "operating_margin": _safe_divide(operating_income, revenue),
+        "net_margin": _safe_divide(net_income, revenue),
+        "roe": _safe_divide(net_income, total_equity),
+        "debt_to_equity": _safe_divide(total_debt, total_equity),
+    }
+
+
 class FinancialIngestionService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        fmp: FinancialDataService | None = None,
+        xbrl: XbrlFinancialsService | None = None,
+    ):
         self.db = db
-        self.fmp = FinancialDataService()
+        self.fmp = fmp or services.financial_data()
+        self.xbrl = xbrl or services.xbrl()
 
     async def ingest_latest_financials(self, company_id: UUID) -> FinancialSnapshot:
         # Look up company
@@ -43,11 +92,27 @@ class FinancialIngestionService:
         ticker = company.ticker
         fmp_ticker = self.fmp.resolve_fmp_ticker(ticker, company.exchange)
 
-        # Fetch all 4 data sources in parallel-ish (sequential for simplicity)
-        income_data = await self.fmp.get_income_statement(fmp_ticker)
-        balance_data = await self.fmp.get_balance_sheet(fmp_ticker)
-        cashflow_data = await self.fmp.get_cash_flow(fmp_ticker)
-        segments_data = await self.fmp.get_segments(fmp_ticker)
+        # SEC registrants: all three statements from one free XBRL companyfacts
+        # request; Alpha Vantage only fills whatever XBRL could not provide
+        income_data, balance_data, cashflow_data = [], [], []
+        if company.cik:
+            statements = await self.xbrl.get_statements(company.cik)
+            income_data = statements["income"]
+            balance_data = statements["balance"]
+            cashflow_data = statements["cashflow"]
+
+        missing = tuple(
+            name
+            for name, data in (
+                ("income", income_data), ("balance", balance_data), ("cashflow", cashflow_data)
+            )
+            if not data
+        )
+        fetched = await self.fmp.get_financials(fmp_ticker, (*missing, "segments"))
+        income_data = income_data or fetched.get("income", [])
+        balance_data = balance_data or fetched.get("balance", [])
+        cashflow_data = cashflow_data or fetched.get("cashflow", [])
+        segments_data = fetched["segments"]
 
         if not income_data:
             raise ValueError(f"No income statement data available for {ticker}")
@@ -76,50 +141,12 @@ class FinancialIngestionService:
                 f"Snapshot already exists for {ticker} Q{fiscal_quarter} {fiscal_year}"
             )
 
-        # Compute derived margins
-        revenue = inc.get("revenue")
-        gross_profit = inc.get("gross_profit")
-        operating_income = inc.get("operating_income")
-        net_income = inc.get("net_income")
-        total_equity = bal.get("total_equity")
-        total_debt = bal.get("total_debt")
-
-        gross_margin = _safe_divide(gross_profit, revenue)
-        operating_margin = _safe_divide(operating_income, revenue)
-        net_margin = _safe_divide(net_income, revenue)
-        roe = _safe_divide(net_income, total_equity)
-        debt_to_equity = _safe_divide(total_debt, total_equity)
-
         snapshot = FinancialSnapshot(
             company_id=company_id,
             fiscal_year=fiscal_year,
             fiscal_quarter=fiscal_quarter,
             currency=company.currency,
-            # Income statement
-            revenue=_to_decimal(revenue),
-            cost_of_revenue=_to_decimal(inc.get("cost_of_revenue")),
-            gross_profit=_to_decimal(gross_profit),
-            operating_income=_to_decimal(operating_income),
-            net_income=_to_decimal(net_income),
-            ebitda=_to_decimal(inc.get("ebitda")),
-            eps_diluted=_to_decimal(inc.get("eps_diluted")),
-            shares_outstanding=_to_decimal(inc.get("shares_outstanding")),
-            # Balance sheet
-            total_assets=_to_decimal(bal.get("total_assets")),
-            total_liabilities=_to_decimal(bal.get("total_liabilities")),
-            total_equity=_to_decimal(total_equity),
-            cash_and_equivalents=_to_decimal(bal.get("cash_and_equivalents")),
-            total_debt=_to_decimal(total_debt),
-            # Cash flow
-            operating_cash_flow=_to_decimal(cf.get("operating_cash_flow")),
-            capital_expenditures=_to_decimal(cf.get("capital_expenditures")),
-            free_cash_flow=_to_decimal(cf.get("free_cash_flow")),
-            # Derived ratios
-            gross_margin=gross_margin,
-            operating_margin=operating_margin,
-            net_margin=net_margin,
-            roe=roe,
-            debt_to_equity=debt_to_equity,
+            **snapshot_columns(inc, bal, cf),
         )
         self.db.add(snapshot)
         await self.db.flush()
@@ -140,3 +167,81 @@ class FinancialIngestionService:
         await self.db.commit()
         logger.info("Ingested financials for %s Q%d %d", ticker, fiscal_quarter, fiscal_year)
         return snapshot
+
+    async def bulk_ingest_frames(
+        self, year: int | None = None, quarter: int | None = None
+    ) -> tuple[int, list[str]]:
+        """Create snapshots for every active SEC company from XBRL frames.
+
+        A few dozen frame requests cover the whole universe, and all new rows
+        are written with a single bulk insert. Periods are calendar quarters
+        (frames align fiscal periods to them); companies that already have a
+        snapshot for the quarter are left untouched. Cash flow columns are
+        usually NULL for Q2-Q4 because filers report cash flow year-to-date
+        and frames only carry three-month facts (see
+        ``XbrlFinancialsService.get_frame_statements``); use per-company
+        ingestion where cash flow matters.
+
+        Returns:
+            (number of snapshots inserted, tickers with no XBRL data)
+        """
+        if year is None or quarter is None:
+            year, quarter = latest_complete_quarter()
+
+        result = await self.db.execute(
+            select(Company).where(Company.is_active.is_(True), Company.cik.is_not(None))
+        )
+        companies = result.scalars().all()
+        existing = set(
+            (
+                await self.db.execute(
+                    select(FinancialSnapshot.company_id).where(
+                        FinancialSnapshot.fiscal_year == year,
+                        FinancialSnapshot.fiscal_quarter == quarter,
+                    )
+                )
+            ).scalars()
+        )
+
+        records = await self.xbrl.get_frame_statements(year, quarter)
+
+        rows: list[dict] = []
+        missing: list[str] = []
+        for company in companies:
+            if company.id in existing:
+                continue
+            record = records.get(company.cik.lstrip("0"))
+            if not record:
+                missing.append(company.ticker)
+                continue
+            rows.append({
+                "id": generate_uuid(),
+                "company_id": company.id,
+                "fiscal_year": year,
+                "fiscal_quarter": quarter,
+                "currency": company.currency,
+                **snapshot_columns(record, record, record),
+            })
+
+        no_cashflow = sum(1 for row in rows if row.get("operating_cash_flow") is None)
+        if no_cashflow:
+            logger.info(
+                "Frames snapshots for Q%d %d: %d of %d without cash flow (reported year-to-date)",
+                quarter, year, no_cashflow, len(rows),
+            )
+
+        inserted = 0
+        if rows:
+            stmt = insert(FinancialSnapshot).on_conflict_do_nothing(
+                index_elements=["company_id", "fiscal_year", "fiscal_quarter"]
+            )
+            result = await self.db.execute(stmt, rows)
+            await self.db.commit()
+            # rowcount excludes conflicting rows when the driver reports it
+            rowcount = result.rowcount
+            inserted = rowcount if rowcount is not None and rowcount >= 0 else len(rows)
+        logger.info(
+            "Bulk-ingested %d snapshots for CY%d Q%d (%d companies without XBRL data)",
+            inserted, year, quarter, len(missing),
+        )
+        return inserted, missing
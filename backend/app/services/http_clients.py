@@ -0,0 +1,133 @@
+"""Shared, long-lived httpx clients for outbound data providers.
+
+Each provider gets one pooled ``httpx.AsyncClient`` per process so requests
+reuse TCP/TLS connections instead of paying a fresh handshake every call.
+Clients are created lazily and closed on FastAPI shutdown / Celery worker exit.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    base_url: str = ""
+    headers: dict[str, str] = field(default_factory=dict)
+    timeout: float = 30.0
+    http2: bool = False
+
+
+CLIENT_CONFIGS: dict[str, ClientConfig] = {
+    "edgar": ClientConfig(
+        headers={"User-Agent": settings.EDGAR_USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+        http2=True,
+    ),
+    "alpha_vantage": ClientConfig(
+        base_url="https://www.alphavantage.co",
+        headers={"User-Agent": BROWSER_USER_AGENT},
+        http2=True,
+    ),
+    "sedar": ClientConfig(
+        headers={
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        },
+    ),
+}
+
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled httpx clients, one per provider.
+
+    httpx connection pools are bound to the event loop that opened them, so a
+    client is rebuilt if it is requested from a different (or closed) loop.
+    The replaced client is closed on its own loop if that loop is still
+    running, and otherwise kept until the next ``aclose`` so its sockets are
+    not leaked.
+    """
+
+    def __init__(self, configs: dict[str, ClientConfig] | None = None):
+        self._configs = configs or CLIENT_CONFIGS
+        self._clients: dict[str, tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        # Replaced clients whose loop could not close them
+        self._stale: list[tuple[str, httpx.AsyncClient]] = []
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        config = self._configs[name]
+        http2 = config.http2 and settings.HTTP2_ENABLED and _http2_available()
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            headers=config.headers,
+            timeout=config.timeout,
+            limits=limits,
+            http2=http2,
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for a provider, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(name)
+        if entry:
+            client, client_loop = entry
+            if client_loop is loop and not client.is_closed:
+                return client
+            self._retire(name, client, client_loop)
+        client = self._build(name)
+        self._clients[name] = (client, loop)
+        return client
+
+    def _retire(
+        self, name: str, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """Close a replaced client, on its own loop when that loop is still running."""
+        if client.is_closed:
+            return
+        if loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            self._stale.append((name, client))
+
+    async def aclose(self) -> None:
+        """Close every client owned by the current event loop, and any retired ones."""
+        loop = asyncio.get_running_loop()
+        for name, (client, client_loop) in list(self._clients.items()):
+            if client_loop is loop:
+                await self._close(name, client)
+            else:
+                self._retire(name, client, client_loop)
+            del self._clients[name]
+        stale, self._stale = self._stale, []
+        for name, client in stale:
+            await self._close(name, client)
+
+    @staticmethod
+    async def _close(name: str, client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("Failed to close %s HTTP client: %s", name, e)
+
+
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,71 @@
+"""Incremental parser for the top-level fields of a streamed JSON object.
+
+LLM responses arrive token by token. ``JsonFieldStream`` is fed those chunks
+and returns each top-level ``key: value`` pair of the first JSON object as
+soon as the value is complete, so a caller can forward ``bull_case`` while
+``bear_case`` is still being written. Text before the opening brace (such as
+a Markdown fence) and anything after the closing brace is ignored.
+"""
+
+import json
+
+
+class JsonFieldStream:
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_start: int | None = None
+        self._key: str | None = None
+        self._value_start: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """Consume ``chunk``; return the fields it completed, in order."""
+        if self.done:
+            return []
+        self._buffer += chunk
+        fields: list[tuple[str, object]] = []
+        while self._pos < len(self._buffer) and not self.done:
+            char = self._buffer[self._pos]
+            if self._depth == 0 and char != "{":
+                pass  # preamble before the object
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None:
+                        self._key = json.loads(self._buffer[self._key_start : self._pos + 1])
+                        self._key_start = None
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = self._pos
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(self._pos, fields)
+                    self.done = True
+            elif self._depth == 1 and char == ":" and self._key is not None:
+                self._value_start = self._pos + 1
+            elif self._depth == 1 and char == ",":
+                self._emit(self._pos, fields)
+            self._pos += 1
+        return fields
+
+    def _emit(self, end: int, fields: list[tuple[str, object]]) -> None:
+        if self._key is not None and self._value_start is not None:
+            raw = self._buffer[self._value_start : end]
+            try:
+                fields.append((self._key, json.loads(raw)))
+            except ValueError:
+                pass  # malformed value; the full-response parse decides what to keep
+        self._key = None
+        self._value_start = None
@@ -0,0 +1,152 @@
+"""Request/token budgets and concurrency control for Groq chat completions.
+
+Groq limits each key by requests per minute and tokens per minute (prompt
+plus completion). Every call first reserves one request and an estimate of
+its tokens from two shared token buckets (so API replicas and Celery workers
+draw on one budget), then takes a per-process concurrency slot. All three
+waits are served by priority, so an interactive page load overtakes a bulk
+regeneration queue. Once the response reports actual usage the token
+reservation is settled, and a 429's ``retry-after`` pauses every caller
+instead of each one burning its own retries.
+"""
+
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
+
+from app.config import settings
+from app.services.rate_limiter import Priority, PrioritySemaphore, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Rough tokens-per-character ratio for English prose and JSON on Llama tokenizers
+CHARS_PER_TOKEN = 4
+# Fallback pause when a 429 carries no usable retry-after
+DEFAULT_THROTTLE_SECONDS = 10.0
+# Longest pause a single 429 may impose, so interactive calls never hang for long
+MAX_THROTTLE_SECONDS = 60.0
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Estimate prompt tokens for ``texts`` (deliberately on the high side)."""
+    return sum(len(text) for text in texts) // CHARS_PER_TOKEN + 1
+
+
+def parse_retry_after(headers) -> float | None:
+    """Seconds to back off from a 429's headers, or None if it gives no hint.
+
+    ``retry-after`` (seconds) wins when present; otherwise Groq's
+    ``x-ratelimit-reset-tokens`` duration (e.g. ``"7.66s"``, ``"1m2.5s"``).
+    ``x-ratelimit-reset-requests`` is ignored: it is the requests-per-day
+    reset, hours away, and says nothing about when a retry may succeed.
+    """
+    if not headers:
+        return None
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    reset_tokens = headers.get("x-ratelimit-reset-tokens")
+    if reset_tokens:
+        seconds = sum(
+            float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+            for amount, unit in _DURATION_PART_RE.findall(reset_tokens)
+        )
+        if seconds:
+            return seconds
+    return None
+
+
+class LLMScheduler:
+    """Requests/min, tokens/min and concurrency budgets for one LLM provider."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        shared: bool = True,
+    ):
+        self.name = name
+        self.requests = TokenBucket(
+            rate=requests_per_minute / 60,
+            capacity=requests_per_minute,
+            redis_key=f"ratelimit:{name}:requests" if shared else None,
+        )
+        self.tokens = TokenBucket(
+            rate=tokens_per_minute / 60,
+            capacity=tokens_per_minute,
+            redis_key=f"ratelimit:{name}:tokens" if shared else None,
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphores: dict[asyncio.AbstractEventLoop, PrioritySemaphore] = {}
+
+    def _semaphore(self) -> PrioritySemaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Futures are loop-bound; drop semaphores of closed loops as we go
+            self._semaphores = {
+                lp: sem for lp, sem in self._semaphores.items() if not lp.is_closed()
+            }
+            semaphore = self._semaphores[loop] = PrioritySemaphore(self.max_concurrency)
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: Priority = Priority.INTERACTIVE):
+        """Reserve budget for one call and hold a concurrency slot while it runs.
+
+        Yields a ``Reservation``; report the response's real token usage on it
+        so the token budget is settled.
+        """
+        await self.requests.acquire(priority)
+        await self.tokens.acquire(priority, tokens=estimated_tokens)
+        semaphore = self._semaphore()
+        await semaphore.acquire(priority)
+        reservation = Reservation(self, min(estimated_tokens, self.tokens.capacity))
+        try:
+            yield reservation
+        finally:
+            semaphore.release()
+            await reservation.settle()
+
+    async def report_throttle(self, retry_after: float | None) -> None:
+        """Pause every caller after the provider answered 429."""
+        seconds = retry_after if retry_after is not None else DEFAULT_THROTTLE_SECONDS
+        seconds = min(seconds, MAX_THROTTLE_SECONDS)
+        logger.warning("%s throttled; pausing requests for %.1fs", self.name, seconds)
+        await self.requests.pause(seconds)
+
+
+class Reservation:
+    """Tokens reserved for one call, settled against the reported usage."""
+
+    def __init__(self, scheduler: LLMScheduler, reserved: int):
+        self._scheduler = scheduler
+        self.reserved = reserved
+        self.used: int | None = None
+
+    def record_usage(self, total_tokens: int | None) -> None:
+        self.used = total_tokens
+
+    async def settle(self) -> None:
+        if self.used is None or self.used == self.reserved:
+            return
+        try:
+            await self._scheduler.tokens.consume(self.used - self.reserved)
+        except Exception as e:
+            logger.warning("Could not settle %s token usage: %s", self._scheduler.name, e)
+
+
+groq_scheduler = LLMScheduler(
+    "groq",
+    requests_per_minute=settings.GROQ_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.GROQ_TOKENS_PER_MINUTE,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+)
@@ -1,21 +1,29 @@
 """LLM service for thesis generation and analysis using Groq (Llama 3)."""
 
 import asyncio
+import hashlib
 import json
 import logging
-from pathlib import Path
+from collections.abc import AsyncIterator
 
-from groq import AsyncGroq
+from groq import AsyncGroq, RateLimitError
 
 from app.config import settings
+from app.services.cache import BoundedJsonCache
+from app.services.json_stream import JsonFieldStream
+from app.services.llm_scheduler import estimate_tokens, groq_scheduler, parse_retry_after
+from app.services.prompt_registry import PromptTemplate, prompts
+from app.services.rate_limiter import Priority
 
 logger = logging.getLogger(__name__)
 
-PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+MAX_TOKENS = 4096
+# Extra attempts for 429s, which wait out the provider's retry-after instead of backing off
+MAX_THROTTLE_RETRIES = 3
 
-
-def _load_prompt(name: str) -> str:
-    return (PROMPTS_DIR / name).read_text()
+_response_cache = BoundedJsonCache(
+    "llm:response", settings.LLM_CACHE_TTL_SECONDS, settings.LLM_CACHE_MAX_ENTRIES
+)
 
 
 def _parse_json_response(text: str) -> dict:
@@ -47,51 +55,179 @@ def _parse_json_response(text: str) -> dict:
     return json.loads(text)
 
 
+def _is_json_response(text: str) -> bool:
+    try:
+        _parse_json_response(text)
+    except ValueError:
+        return False
+    return True
+
+
 class LLMService:
     """Generates investment theses and analyses using Groq (Llama 3)."""
 
-    def __init__(self):
+    def __init__(self, priority: Priority = Priority.INTERACTIVE):
         self.model = settings.LLM_MODEL
-        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+        self.priority = priority
+        # Retries go through groq_scheduler so they respect the shared RPM/TPM budget
+        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+
+    def _cache_key(self, system: str, user_prompt: str, temperature: float) -> str:
+        request = {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "temperature": temperature,
+            "system": system,
+            "user": user_prompt,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    async def _call(
+        self,
+        system: str,
+        user_prompt: str,
+        temperature: float = 0.3,
+        retries: int = 2,
+        use_cache: bool = True,
+    ) -> str:
+        """Call LLM with retry on failure.
+
+        Each attempt waits for ``groq_scheduler`` budget at this service's
+        priority. A 429 pauses all callers for the provider's retry-after and
+        is retried up to MAX_THROTTLE_RETRIES extra times.
+
+        Responses are served from / stored in a Redis cache keyed by a hash of
+        the full request unless ``use_cache`` is False or LLM_CACHE_ENABLED is
+        off. Only responses containing parseable JSON (what every prompt asks
+        for) are stored, so a malformed answer is retried rather than replayed.
+        """
+        use_cache = use_cache and settings.LLM_CACHE_ENABLED
+        key = self._cache_key(system, user_prompt, temperature)
+        if use_cache:
+            cached = await _response_cache.get(key)
+            if cached is not None:
+                logger.info("LLM response cache hit %s", key[:12])
+                return cached
 
-    async def _call(self, system: str, user_prompt: str, temperature: float = 0.3, retries: int = 2) -> str:
-        """Call LLM with retry on failure."""
-        for attempt in range(retries + 1):
+        estimated = estimate_tokens(system, user_prompt) + settings.LLM_EXPECTED_COMPLETION_TOKENS
+        attempt = throttled = 0
+        while True:
             try:
-                chat_completion = await self.client.chat.completions.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    temperature=temperature,
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                )
-                return chat_completion.choices[0].message.content
+                async with groq_scheduler.slot(estimated, self.priority) as reservation:
+                    chat_completion = await self.client.chat.completions.create(
+                        model=self.model,
+                        max_tokens=MAX_TOKENS,
+                        temperature=temperature,
+                        messages=[
+                            {"role": "system", "content": system},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                    )
+                    usage = getattr(chat_completion, "usage", None)
+                    reservation.record_usage(getattr(usage, "total_tokens", None))
+                content = chat_completion.choices[0].message.content
+                if use_cache and content and _is_json_response(content):
+                    await _response_cache.set(key, content)
+                return content
+            except RateLimitError as e:
+                if throttled == MAX_THROTTLE_RETRIES:
+                    raise
+                throttled += 1
+                logger.warning(f"LLM call throttled (429 #{throttled}): {e}")
+                await groq_scheduler.report_throttle(parse_retry_after(e.response.headers))
             except Exception as e:
                 if attempt == retries:
                     raise
                 logger.warning(f"LLM call failed (attempt {attempt + 1}): {e}")
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                attempt += 1
+
+    async def _stream(
+        self,
+        system: str,
+        user_prompt: str,
+        temperature: float = 0.3,
+        retries: int = 2,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """Stream a completion's content deltas.
+
+        Scheduling, caching, 429 handling and retries with backoff match
+        ``_call``; a cached response is replayed as a single chunk. Failures
+        are only retried before the first delta, since partial output has
+        already been sent on.
+        """
+        use_cache = use_cache and settings.LLM_CACHE_ENABLED
+        key = self._cache_key(system, user_prompt, temperature)
+        if use_cache:
+            cached = await _response_cache.get(key)
+            if cached is not None:
+                logger.info("LLM response cache hit %s", key[:12])
+                yield cached
+                return
+
+        estimated = estimate_tokens(system, user_prompt) + settings.LLM_EXPECTED_COMPLETION_TOKENS
+        attempt = throttled = 0
+        parts: list[str] = []
+        while True:
+            try:
+                async with groq_scheduler.slot(estimated, self.priority) as reservation:
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        max_tokens=MAX_TOKENS,
+                        temperature=temperature,
+                        messages=[
+                            {"role": "system", "content": system},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        stream=True,
+                    )
+                    async for chunk in stream:
+                        # Groq reports usage on the final chunk's x_groq extension
+                        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                        if usage is not None:
+                            reservation.record_usage(getattr(usage, "total_tokens", None))
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                break
+            except RateLimitError as e:
+                if throttled == MAX_THROTTLE_RETRIES or parts:
+                    raise
+                throttled += 1
+                logger.warning(f"LLM stream throttled (429 #{throttled}): {e}")
+                await groq_scheduler.report_throttle(parse_retry_after(e.response.headers))
+            except Exception as e:
+                if attempt == retries or parts:
+                    raise
+                logger.warning(f"LLM stream failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                attempt += 1
 
-    async def generate_business_profile(self, company_data: dict, filing_text: str) -> dict:
+        content = "".join(parts)
+        if use_cache and content and _is_json_response(content):
+            await _response_cache.set(key, content)
+
+    async def generate_business_profile(
+        self, company_data: dict, filing_text: str, use_cache: bool = True
+    ) -> dict:
         """Generate a structured business profile from filing data."""
-        prompt_template = _load_prompt("business_profile.txt")
-        prompt = prompt_template.format(
+        template = prompts.get("business_profile")
+        prompt = template.render(
             company_name=company_data.get("name", ""),
             ticker=company_data.get("ticker", ""),
             exchange=company_data.get("exchange", ""),
             sector=company_data.get("sector", ""),
             industry=company_data.get("industry", ""),
-            filing_text=filing_text[:30000],
+            filing_text=filing_text[: settings.FILING_CONTEXT_CHARS],
         )
 
         response = await self._call(
-            system="You are a senior equity research analyst. Respond only with valid JSON.",
-            user_prompt=prompt,
-            temperature=0.3,
+            system=template.system, user_prompt=prompt, temperature=0.3, use_cache=use_cache
         )
         result = _parse_json_response(response)
+        result["prompt_version"] = template.version
 
         # Ensure JSON array/object fields are stored as JSON strings
         # key_products is now a dict (segment → revenue share), geographic_mix same
@@ -115,9 +251,51 @@ class LLMService:
         business_profile: dict,
         prior_thesis: dict | None = None,
         market_context: dict | None = None,
+        use_cache: bool = True,
     ) -> dict:
         """Generate a three-scenario investment thesis."""
-        prompt_template = _load_prompt("thesis_generation.txt")
+        template, prompt = self._thesis_prompt(
+            company_data, financial_snapshot, business_profile, prior_thesis, market_context
+        )
+        response = await self._call(
+            system=template.system, user_prompt=prompt, temperature=0.3, use_cache=use_cache
+        )
+        return self._thesis_result(response, template)
+
+    async def stream_thesis(
+        self,
+        company_data: dict,
+        financial_snapshot: dict,
+        business_profile: dict,
+        prior_thesis: dict | None = None,
+        market_context: dict | None = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Like ``generate_thesis``, but yield each field as soon as the LLM finishes it.
+
+        Yields ``(field, value)`` pairs with raw JSON values, then a final
+        ``(None, result)`` carrying the same dict ``generate_thesis`` returns.
+        """
+        template, prompt = self._thesis_prompt(
+            company_data, financial_snapshot, business_profile, prior_thesis, market_context
+        )
+        parser = JsonFieldStream()
+        chunks = []
+        async for chunk in self._stream(template.system, prompt, use_cache=use_cache):
+            chunks.append(chunk)
+            for field in parser.feed(chunk):
+                yield field
+        yield None, self._thesis_result("".join(chunks), template)
+
+    def _thesis_prompt(
+        self,
+        company_data: dict,
+        financial_snapshot: dict,
+        business_profile: dict,
+        prior_thesis: dict | None,
+        market_context: dict | None,
+    ) -> tuple[PromptTemplate, str]:
+        template = prompts.get("thesis_generation")
 
         # Build prior thesis section
         prior_thesis_section = ""
@@ -144,10 +322,9 @@ class LLMService:
 
         # Format market context for prompt
         from app.services.market_sentiment_service import MarketSentimentService
-        mss = MarketSentimentService()
-        market_context_section = mss.format_for_prompt(market_context or {})
+        market_context_section = MarketSentimentService.format_for_prompt(market_context or {})
 
-        prompt = prompt_template.format(
+        prompt = template.render(
             company_name=company_data.get("name", ""),
             ticker=company_data.get("ticker", ""),
             sector=company_data.get("sector", ""),
@@ -167,13 +344,12 @@ class LLMService:
             prior_thesis_section=prior_thesis_section,
             drift_fields=drift_fields,
         )
+        return template, prompt
 
-        response = await self._call(
-            system="You are a senior equity research analyst. Respond only with valid JSON. Do NOT provide buy/sell/hold recommendations.",
-            user_prompt=prompt,
-            temperature=0.3,
-        )
+    @staticmethod
+    def _thesis_result(response: str, template: PromptTemplate) -> dict:
         result = _parse_json_response(response)
+        result["prompt_version"] = template.version
 
         # Ensure JSON array fields are stored as JSON strings
         for field in ("key_drivers", "key_risks", "catalysts"):
@@ -183,10 +359,10 @@ class LLMService:
         return result
 
     async def generate_quarterly_summary(
-        self, filing_text: str, prior_snapshot: dict | None = None
+        self, filing_text: str, prior_snapshot: dict | None = None, use_cache: bool = True
     ) -> dict:
         """Generate executive summary and key changes from a quarterly filing."""
-        prompt_template = _load_prompt("quarterly_summary.txt")
+        template = prompts.get("quarterly_summary")
 
         prior_snapshot_section = ""
         if prior_snapshot:
@@ -197,17 +373,16 @@ class LLMService:
                 f"EPS: {prior_snapshot.get('eps_diluted', 'N/A')}\n"
             )
 
-        prompt = prompt_template.format(
-            filing_text=filing_text[:30000],
+        prompt = template.render(
+            filing_text=filing_text[: settings.FILING_CONTEXT_CHARS],
             prior_snapshot_section=prior_snapshot_section,
         )
 
         response = await self._call(
-            system="You are a senior equity research analyst. Respond only with valid JSON.",
-            user_prompt=prompt,
-            temperature=0.3,
+            system=template.system, user_prompt=prompt, temperature=0.3, use_cache=use_cache
         )
         result = _parse_json_response(response)
+        result["prompt_version"] = template.version
 
         # Ensure key_changes is stored as JSON string
         if isinstance(result.get("key_changes"), list):
@@ -1,9 +1,30 @@
-"""Market sentiment service — fetches news & analyst context from Alpha Vantage."""
+"""Market sentiment service — fetches news & analyst context from Alpha Vantage.
+
+Overview and news are cached separately (analyst targets and ratios move
+daily, news hourly) so regenerating theses for the same tickers does not
+spend two Alpha Vantage calls each time. Tickers without coverage are cached
+as empty results for a shorter period.
+"""
 
 import logging
+import re
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.services.cache import JsonCache
+
+if TYPE_CHECKING:
+    from app.services.financial_data_service import FinancialDataService
 
 logger = logging.getLogger(__name__)
 
+_overview_cache = JsonCache("av:overview", settings.MARKET_OVERVIEW_CACHE_TTL_SECONDS)
+_news_cache = JsonCache("av:news", settings.MARKET_NEWS_CACHE_TTL_SECONDS)
+
+# Alpha Vantage answers unknown symbols with an "Invalid inputs" notice rather
+# than an empty payload; other notices (bad key, premium) must not be cached
+_NO_COVERAGE_RE = re.compile(r"invalid input", re.IGNORECASE)
+
 # Higher absolute value = more opinionated (bull or bear)
 _SENTIMENT_RANK = {
     "Bullish": 2,
@@ -21,10 +42,12 @@ class MarketSentimentService:
     All methods fall back gracefully — never raise.
     """
 
-    def __init__(self):
-        # Lazy import to avoid circular dependency
-        from app.services.financial_data_service import FinancialDataService
-        self._fds = FinancialDataService()
+    def __init__(self, fds: "FinancialDataService | None" = None):
+        if fds is None:
+            # Lazy import to avoid circular dependency
+            from app.services.financial_data_service import FinancialDataService
+            fds = FinancialDataService()
+        self._fds = fds
 
     async def get_market_context(self, ticker: str) -> dict:
         """Fetch analyst overview + recent news for a ticker.
@@ -70,7 +93,8 @@ class MarketSentimentService:
             "recent_news": news,
         }
 
-    def format_for_prompt(self, ctx: dict) -> str:
+    @staticmethod
+    def format_for_prompt(ctx: dict) -> str:
         """Render market context as a prompt-friendly string."""
         if not ctx:
             return "No market context available."
@@ -110,9 +134,22 @@ class MarketSentimentService:
     # ------------------------------------------------------------------ #
 
     async def _get_overview(self, ticker: str) -> dict:
+        cached = await _overview_cache.get(ticker)
+        if cached is not None:
+            return cached
         data = await self._fds._get("OVERVIEW", {"symbol": ticker})
         if not data or "Symbol" not in data:
+            if _no_coverage(data):
+                await _overview_cache.set(
+                    ticker, {}, ttl_seconds=settings.MARKET_CONTEXT_NEGATIVE_TTL_SECONDS
+                )
             return {}
+        overview = self._map_overview(data)
+        await _overview_cache.set(ticker, overview)
+        return overview
+
+    @staticmethod
+    def _map_overview(data: dict) -> dict:
         high = data.get("52WeekHigh") or ""
         low = data.get("52WeekLow") or ""
         week_range = f"${low} – ${high}" if high and low and high != "None" and low != "None" else None
@@ -124,14 +161,25 @@ class MarketSentimentService:
         }
 
     async def _get_news(self, ticker: str) -> list[dict]:
+        cached = await _news_cache.get(ticker)
+        if cached is not None:
+            return cached
         data = await self._fds._get(
             "NEWS_SENTIMENT",
             {"tickers": ticker, "limit": "20", "sort": "RELEVANCE"},
         )
-        feed = data.get("feed") or []
-        if not feed:
+        if not data.get("feed"):
+            if _no_coverage(data):
+                await _news_cache.set(
+                    ticker, [], ttl_seconds=settings.MARKET_CONTEXT_NEGATIVE_TTL_SECONDS
+                )
             return []
+        news = self._map_news(data["feed"], ticker)
+        await _news_cache.set(ticker, news)
+        return news
 
+    @staticmethod
+    def _map_news(feed: list[dict], ticker: str) -> list[dict]:
         results = []
         for art in feed:
             # Filter to articles where this ticker is a primary subject
@@ -166,6 +214,14 @@ class MarketSentimentService:
         return results[:8]
 
 
+def _no_coverage(data: dict) -> bool:
+    """True when a (non-throttled) response means Alpha Vantage has nothing for the ticker."""
+    if "Error Message" in data:
+        return False
+    notice = data.get("Information") or data.get("Note")
+    return not notice or bool(_NO_COVERAGE_RE.search(notice))
+
+
 def _clean(val: str | None) -> str | None:
     """Return None for missing / placeholder AV values."""
     if not val or val in ("None", "-", "0", "0.0", "N/A"):
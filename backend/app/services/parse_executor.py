@@ -0,0 +1,72 @@
+"""Process pool for CPU-bound filing parsing.
+
+HTML-to-text conversion of a large 10-K takes long enough to stall every
+other request on an event loop, so async call sites hand it to a pool of
+worker processes instead. The pool is created lazily, sized by
+PARSE_POOL_SIZE, and at most PARSE_MAX_PENDING jobs are submitted at once;
+further callers wait for a free slot rather than growing the queue.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import settings
+from app.services.filing_parser import html_to_text
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_slots: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = settings.PARSE_POOL_SIZE or os.cpu_count() or 1
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _slots:
+        _slots[loop] = asyncio.Semaphore(settings.PARSE_MAX_PENDING)
+    return _slots[loop]
+
+
+async def parse_html(content: bytes, max_chars: int) -> str:
+    """Convert filing HTML to text in the parse pool without blocking the loop.
+
+    Args:
+        content: Raw HTML bytes
+        max_chars: Character budget passed to ``html_to_text``
+
+    Returns:
+        Extracted text
+    """
+    global _executor
+    async with _get_slots():
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_get_executor(), html_to_text, content, max_chars)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); rebuild the pool on next use and
+            # finish this job on a thread so the caller still gets its text
+            logger.warning("Parse pool broken, recreating it")
+            _executor = None
+            return await asyncio.to_thread(html_to_text, content, max_chars)
+
+
+def shutdown_parse_executor() -> None:
+    """Stop the parse pool's worker processes."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
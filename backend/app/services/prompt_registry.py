@@ -0,0 +1,155 @@
+"""Prompt template registry: load once, compile once, version every prompt.
+
+Templates in ``app/prompts`` are read and parsed a single time (at startup or
+on first use) instead of on every generation. Each template's placeholders
+are checked against the fields the service passes, so a typo in a prompt
+file fails at load time rather than as a ``KeyError`` mid-request. Every
+template also exposes a short content hash (covering the system prompt too)
+that is stored with generated theses and profiles, tying each row to the
+exact prompt that produced it.
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Formatter
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+ANALYST_SYSTEM = "You are a senior equity research analyst. Respond only with valid JSON."
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    """What the service supplies for a template: its system prompt and field names."""
+
+    system: str
+    fields: frozenset[str]
+
+
+PROMPT_SPECS: dict[str, PromptSpec] = {
+    "business_profile": PromptSpec(
+        system=ANALYST_SYSTEM,
+        fields=frozenset(
+            {"company_name", "ticker", "exchange", "sector", "industry", "filing_text"}
+        ),
+    ),
+    "thesis_generation": PromptSpec(
+        system=f"{ANALYST_SYSTEM} Do NOT provide buy/sell/hold recommendations.",
+        fields=frozenset({
+            "company_name", "ticker", "sector", "industry", "revenue", "net_income", "ebitda",
+            "eps_diluted", "gross_margin", "operating_margin", "free_cash_flow", "total_debt",
+            "cash", "debt_to_equity", "business_profile", "market_context_section",
+            "prior_thesis_section", "drift_fields",
+        }),
+    ),
+    "quarterly_summary": PromptSpec(
+        system=ANALYST_SYSTEM,
+        fields=frozenset({"filing_text", "prior_snapshot_section"}),
+    ),
+}
+
+
+class PromptTemplateError(ValueError):
+    """A prompt file is missing or its placeholders do not match its spec."""
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    system: str
+    text: str
+    fields: frozenset[str]
+    version: str
+    # Alternating (literal, field) pairs from parsing the template once
+    _parts: tuple[tuple[str, str | None], ...] = field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, name: str, text: str, spec: PromptSpec) -> "PromptTemplate":
+        parts: list[tuple[str, str | None]] = []
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise PromptTemplateError(f"Prompt {name!r} is not a valid template: {e}") from e
+        for literal, field_name, format_spec, conversion in parsed:
+            if field_name is not None and (
+                not field_name.isidentifier() or format_spec or conversion
+            ):
+                raise PromptTemplateError(
+                    f"Prompt {name!r} has unsupported placeholder {{{field_name}}}; "
+                    "use plain {name} fields"
+                )
+            parts.append((literal, field_name))
+
+        fields = frozenset(f for _, f in parts if f is not None)
+        if fields != spec.fields:
+            raise PromptTemplateError(
+                f"Prompt {name!r} placeholders do not match its spec: "
+                f"unknown {sorted(fields - spec.fields)}, unused {sorted(spec.fields - fields)}"
+            )
+
+        digest = hashlib.sha256(f"{spec.system}\x00{text}".encode()).hexdigest()[:12]
+        return cls(
+            name=name,
+            system=spec.system,
+            text=text,
+            fields=fields,
+            version=f"{name}@{digest}",
+            _parts=tuple(parts),
+        )
+
+    def render(self, **values) -> str:
+        """Fill the template; every field must be supplied and nothing else."""
+        if values.keys() != self.fields:
+            raise PromptTemplateError(
+                f"Prompt {self.name!r} expects {sorted(self.fields)}, got {sorted(values)}"
+            )
+        return "".join(
+            literal + (str(values[name]) if name is not None else "")
+            for literal, name in self._parts
+        )
+
+
+class PromptRegistry:
+    """Compiled templates from a prompt directory, keyed by file stem."""
+
+    def __init__(self, directory: Path = PROMPTS_DIR, specs: dict[str, PromptSpec] = PROMPT_SPECS):
+        self.directory = directory
+        self.specs = specs
+        self._templates: dict[str, PromptTemplate] | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, PromptTemplate]:
+        """Read and compile every template; idempotent, safe to call at startup."""
+        if self._templates is None:
+            with self._lock:
+                if self._templates is None:
+                    self._templates = self._compile_all()
+                    logger.info(
+                        "Loaded prompts: %s", ", ".join(t.version for t in self._templates.values())
+                    )
+        return self._templates
+
+    def _compile_all(self) -> dict[str, PromptTemplate]:
+        templates = {}
+        for name, spec in self.specs.items():
+            path = self.directory / f"{name}.txt"
+            try:
+                text = path.read_text()
+            except OSError as e:
+                raise PromptTemplateError(f"Prompt {name!r} could not be read: {e}") from e
+            templates[name] = PromptTemplate.compile(name, text, spec)
+        return templates
+
+    def get(self, name: str) -> PromptTemplate:
+        return self.load()[name]
+
+    def versions(self) -> dict[str, str]:
+        return {name: template.version for name, template in self.load().items()}
+
+
+prompts = PromptRegistry()
@@ -0,0 +1,199 @@
+"""Quote cache: market-hours TTL, single-flight fetches, stale-while-revalidate.
+
+Every dashboard page view asks for prices, but Alpha Vantage allows a handful
+of calls per minute. Quotes are therefore kept in process memory (hot tickers
+are plain dict hits) and in Redis (so all API processes share one upstream
+call per ticker and TTL). Concurrent misses for the same ticker wait on a
+single fetch. Once a quote expires it can still be served for a grace period
+while a background refresh runs.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.services.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+
+
+def quote_ttl(now: datetime | None = None) -> float:
+    """Seconds a quote fetched at ``now`` stays fresh.
+
+    QUOTE_TTL_SECONDS while US/Canadian markets are open; otherwise until the
+    next open (weekdays, exchange holidays not modelled), capped at
+    QUOTE_TTL_CLOSED_MAX_SECONDS.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    open_today = now.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+    close_today = now.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    if now.weekday() < 5 and open_today <= now < close_today:
+        return float(settings.QUOTE_TTL_SECONDS)
+
+    next_open = open_today if now < open_today else open_today + timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    until_open = (next_open - now).total_seconds()
+    return max(min(until_open, settings.QUOTE_TTL_CLOSED_MAX_SECONDS), settings.QUOTE_TTL_SECONDS)
+
+
+class QuoteCache:
+    """Caches quotes from ``fetch`` (ticker -> quote) and ``fetch_many`` (tickers -> quotes)."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[dict | None]] | None = None,
+        fetch_many: Callable[[list[str]], Awaitable[dict[str, dict]]] | None = None,
+    ):
+        self._fetch = fetch
+        self._fetch_many = fetch_many
+        # ticker -> {"quote": ..., "fetched_at": epoch, "expires_at": epoch}
+        self._entries: dict[str, dict] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._shared = JsonCache("quote", settings.QUOTE_TTL_CLOSED_MAX_SECONDS)
+
+    def _provider(self):
+        from app.services.financial_data_service import FinancialDataService
+
+        return FinancialDataService()
+
+    async def _fetch_quote(self, ticker: str) -> dict | None:
+        if self._fetch is None:
+            self._fetch = self._provider().get_quote
+        return await self._fetch(ticker)
+
+    async def _fetch_quotes(self, tickers: list[str]) -> dict[str, dict]:
+        if self._fetch_many is None:
+            self._fetch_many = self._provider().get_bulk_quotes
+        return await self._fetch_many(tickers)
+
+    async def _entries_for(self, tickers: list[str], now: float) -> dict[str, dict]:
+        """Newest known entry per ticker: process memory, then Redis for expired/missing ones."""
+        entries = {t: self._entries[t] for t in tickers if t in self._entries}
+        expired = [t for t in tickers if t not in entries or entries[t]["expires_at"] <= now]
+        if expired:
+            for ticker, shared in (await self._shared.get_many(expired)).items():
+                local = entries.get(ticker)
+                if local is None or shared["fetched_at"] > local["fetched_at"]:
+                    entries[ticker] = self._entries[ticker] = shared
+        return entries
+
+    async def get(self, ticker: str) -> dict | None:
+        """Return a quote for ``ticker``, fetching upstream only when needed."""
+        return (await self._get([ticker], batch=False)).get(ticker)
+
+    async def get_many(self, tickers: list[str]) -> dict[str, dict]:
+        """Return quotes for many tickers; all misses are fetched in one batched call.
+
+        Tickers the batch endpoint could not price fall back to single-quote
+        fetches, at most QUOTE_BULK_FALLBACK_MAX_TICKERS of them so a list
+        request never queues behind the per-minute quota; the rest are served
+        stale if possible. Tickers with no quote at all are absent from the result.
+        """
+        return await self._get(list(dict.fromkeys(tickers)), batch=True)
+
+    async def _get(self, tickers: list[str], batch: bool) -> dict[str, dict]:
+        now = time.time()
+        entries = await self._entries_for(tickers, now)
+        quotes: dict[str, dict] = {}
+        waiting: list[str] = []
+        refresh: list[str] = []
+        for ticker in tickers:
+            entry = entries.get(ticker)
+            if entry and entry["expires_at"] > now:
+                quotes[ticker] = entry["quote"]
+                continue
+            refresh.append(ticker)
+            stale_until = entry["expires_at"] + settings.QUOTE_STALE_SECONDS if entry else 0
+            if entry and settings.QUOTE_STALE_WHILE_REVALIDATE and now < stale_until:
+                quotes[ticker] = entry["quote"]  # revalidated in the background
+            else:
+                waiting.append(ticker)
+
+        futures = self._refresh(refresh, batch) if refresh else {}
+        for ticker in waiting:
+            # Shielded so a cancelled request does not cancel the fetch others await
+            quote = await asyncio.shield(futures[ticker])
+            entry = entries.get(ticker)
+            if quote is None and entry and now < entry["expires_at"] + settings.QUOTE_STALE_SECONDS:
+                quote = entry["quote"]  # upstream failed; stale beats nothing
+            if quote is not None:
+                quotes[ticker] = quote
+        return quotes
+
+    def _refresh(self, tickers: list[str], batch: bool) -> dict[str, asyncio.Future]:
+        """Start (or join) the single in-flight fetch for each ticker."""
+        loop = asyncio.get_running_loop()
+        futures: dict[str, asyncio.Future] = {}
+        start: list[str] = []
+        for ticker in tickers:
+            future = self._inflight.get(ticker)
+            if future is None or future.done() or future.get_loop() is not loop:
+                future = self._inflight[ticker] = loop.create_future()
+                future.add_done_callback(self._forget)
+                start.append(ticker)
+            futures[ticker] = future
+        if start:
+            if batch:
+                asyncio.create_task(self._load_many({t: futures[t] for t in start}))
+            else:
+                for ticker in start:
+                    asyncio.create_task(self._load(ticker, futures[ticker]))
+        return futures
+
+    def _forget(self, future: asyncio.Future) -> None:
+        for ticker, inflight in list(self._inflight.items()):
+            if inflight is future:
+                del self._inflight[ticker]
+
+    async def _load(self, ticker: str, future: asyncio.Future) -> None:
+        try:
+            quote = await self._fetch_quote(ticker)
+        except Exception as e:
+            logger.warning("Quote refresh failed for %s: %s", ticker, e)
+            quote = None
+        if quote is not None:
+            await self._store(ticker, quote)
+        if not future.done():
+            future.set_result(quote)
+
+    async def _load_many(self, futures: dict[str, asyncio.Future]) -> None:
+        tickers = list(futures)
+        try:
+            quotes = await self._fetch_quotes(tickers)
+        except Exception as e:
+            # Usually quota exhaustion; per-ticker retries would only fail the same way
+            logger.warning("Bulk quote refresh failed for %d tickers: %s", len(tickers), e)
+            for future in futures.values():
+                if not future.done():
+                    future.set_result(None)
+            return
+        for ticker, quote in quotes.items():
+            if ticker in futures:
+                await self._store(ticker, quote)
+                if not futures[ticker].done():
+                    futures[ticker].set_result(quote)
+        missing = [t for t in tickers if t not in quotes]
+        fallback = missing[: settings.QUOTE_BULK_FALLBACK_MAX_TICKERS]
+        for ticker in missing[len(fallback) :]:
+            if not futures[ticker].done():
+                futures[ticker].set_result(None)
+        await asyncio.gather(*(self._load(t, futures[t]) for t in fallback))
+
+    async def _store(self, ticker: str, quote: dict) -> None:
+        fetched_at = time.time()
+        ttl = quote_ttl()
+        entry = {"quote": quote, "fetched_at": fetched_at, "expires_at": fetched_at + ttl}
+        self._entries[ticker] = entry
+        await self._shared.set(ticker, entry, ttl_seconds=int(ttl + settings.QUOTE_STALE_SECONDS))
+
+
+quote_cache = QuoteCache()
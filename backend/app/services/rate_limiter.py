@@ -0,0 +1,336 @@
+"""Async token-bucket rate limiting with priority lanes, plus daily quotas.
+
+Used to keep outbound calls under provider fair-access budgets (e.g. SEC
+EDGAR's 10 requests/second). Waiters are served strictly by priority, then
+arrival order, so interactive API requests overtake background sweeps. When
+a Redis key is configured the budget is also enforced across every process
+(API replicas and Celery workers) through an atomic Lua token bucket.
+
+``QuotaManager`` layers a hard per-day call budget on top of a per-minute
+bucket for metered providers such as Alpha Vantage. ``PrioritySemaphore``
+caps concurrency with the same priority ordering.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop talking to Redis after an error before trying again
+_REDIS_RETRY_SECONDS = 30.0
+
+# KEYS[1] = bucket key; ARGV = rate (tokens/s), capacity, cost, force (1 = take
+# the cost even if it overdraws the bucket; a negative cost refunds).
+# Returns 0 when the tokens were taken, otherwise milliseconds until they are available.
+_SHARED_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3]) or 1
+local force = ARGV[4] == '1'
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if force or tokens >= cost then
+    tokens = math.min(capacity, tokens - cost)
+else
+    wait = math.ceil((cost - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+# KEYS[1] = bucket key; ARGV = rate, capacity. Returns current tokens (as a string).
+_PEEK_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+return tostring(math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000))
+"""
+
+# KEYS[1] = bucket key; ARGV = tokens to leave in the bucket, ttl ms.
+_SET_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('HSET', KEYS[1], 'tokens', ARGV[1], 'ts', now)
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+
+class QuotaExhaustedError(RuntimeError):
+    """A provider's call budget is used up (or the provider says it is)."""
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    wakeup: asyncio.Future = field(compare=False)
+
+
+class TokenBucket:
+    """Priority-ordered async token bucket, optionally shared through Redis."""
+
+    def __init__(self, rate: float, capacity: float | None = None, redis_key: str | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.redis_key = redis_key
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._redis_disabled_until = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wake_head(self) -> None:
+        if self._waiters and not self._waiters[0].wakeup.done():
+            self._waiters[0].wakeup.set_result(None)
+
+    async def _shared_wait(self, cost: float = 1, force: bool = False) -> float:
+        """Take ``cost`` shared tokens; return seconds to wait if too few are free."""
+        if not self._redis_available():
+            return 0.0
+        try:
+            wait_ms = await get_redis().eval(
+                _SHARED_BUCKET_SCRIPT, 1, self.redis_key, self.rate, self.capacity,
+                cost, int(force),
+            )
+        except Exception as e:
+            logger.warning("Shared rate limit unavailable for %s, using local bucket: %s", self.redis_key, e)
+            self._redis_disabled_until = time.monotonic() + _REDIS_RETRY_SECONDS
+            return 0.0
+        return int(wait_ms) / 1000
+
+    def _redis_available(self) -> bool:
+        return bool(self.redis_key) and time.monotonic() >= self._redis_disabled_until
+
+    async def available(self) -> float:
+        """Tokens currently available (the lower of the local and shared buckets)."""
+        self._refill()
+        tokens = self._tokens
+        if self._redis_available():
+            try:
+                shared = await get_redis().eval(
+                    _PEEK_BUCKET_SCRIPT, 1, self.redis_key, self.rate, self.capacity
+                )
+                tokens = min(tokens, float(shared))
+            except Exception as e:
+                logger.warning("Shared rate limit unavailable for %s: %s", self.redis_key, e)
+        return max(tokens, 0.0)
+
+    async def pause(self, seconds: float) -> None:
+        """Withhold tokens for ``seconds``, e.g. after the provider throttled us."""
+        self._refill()
+        self._tokens = min(self._tokens, 1 - self.rate * seconds)
+        if self._redis_available():
+            try:
+                await get_redis().eval(
+                    _SET_BUCKET_SCRIPT, 1, self.redis_key, 1 - self.rate * seconds,
+                    int((seconds + self.capacity / self.rate) * 1000) + 1000,
+                )
+            except Exception as e:
+                logger.warning("Shared rate limit unavailable for %s: %s", self.redis_key, e)
+
+    async def consume(self, tokens: float) -> None:
+        """Charge (or, if negative, refund) tokens without waiting; the bucket may go negative.
+
+        Used to settle a reservation once the real cost is known.
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - tokens)
+        await self._shared_wait(tokens, force=True)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, tokens: float = 1) -> None:
+        """Wait until ``tokens`` are available for this caller, respecting priority.
+
+        Requests larger than the bucket's capacity are charged the full capacity.
+        """
+        cost = min(tokens, self.capacity)
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(int(priority), next(self._seq), loop.create_future())
+        heapq.heappush(self._waiters, waiter)
+        try:
+            while True:
+                if self._waiters[0] is not waiter:
+                    await waiter.wakeup
+                    waiter.wakeup = loop.create_future()
+                    continue
+                self._refill()
+                if self._tokens < cost:
+                    await asyncio.sleep((cost - self._tokens) / self.rate)
+                    continue
+                shared_wait = await self._shared_wait(cost)
+                if shared_wait:
+                    await asyncio.sleep(shared_wait)
+                    continue
+                self._tokens -= cost
+                break
+        finally:
+            was_head = self._waiters and self._waiters[0] is waiter
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            if was_head:
+                self._wake_head()
+
+
+class PrioritySemaphore:
+    """Semaphore whose waiters are released by priority, then arrival order."""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: Priority) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        waiter = _Waiter(int(priority), next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await waiter.wakeup
+        except asyncio.CancelledError:
+            if waiter.wakeup.done() and not waiter.wakeup.cancelled():
+                self.release()  # slot was handed over just as we were cancelled
+            else:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            if not waiter.wakeup.done():
+                waiter.wakeup.set_result(None)
+                return
+        self._value += 1
+
+
+edgar_rate_limiter = TokenBucket(
+    rate=settings.EDGAR_MAX_REQUESTS_PER_SECOND,
+    redis_key="ratelimit:edgar" if settings.EDGAR_RATE_LIMIT_SHARED else None,
+)
+
+
+class QuotaManager:
+    """Per-minute (callers queue) and per-day (callers fail) budgets for one provider.
+
+    Both budgets are shared through Redis when ``shared`` is set; days are
+    UTC calendar days. If Redis is unreachable the process falls back to
+    counting on its own.
+    """
+
+    def __init__(self, name: str, per_minute: int, per_day: int, shared: bool = True):
+        self.name = name
+        self.per_day = per_day
+        self.shared = shared
+        self.minute = TokenBucket(
+            rate=per_minute / 60,
+            capacity=per_minute,
+            redis_key=f"ratelimit:{name}" if shared else None,
+        )
+        self._local_day = ""
+        self._local_used = 0
+        self._redis_disabled_until = 0.0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _day_key(self, day: str) -> str:
+        return f"quota:{self.name}:{day}"
+
+    def _count_locally(self, day: str, increment: int) -> int:
+        if self._local_day != day:
+            self._local_day, self._local_used = day, 0
+        self._local_used += increment
+        return self._local_used
+
+    async def _count(self, increment: int = 0, set_to: int | None = None) -> int:
+        """Add to (or set) today's call count and return it."""
+        day = self._today()
+        if set_to is not None:
+            increment = max(set_to - self._count_locally(day, 0), 0)
+        local = self._count_locally(day, increment)
+        if not self.shared or time.monotonic() < self._redis_disabled_until:
+            return local
+        try:
+            redis = get_redis()
+            key = self._day_key(day)
+            if set_to is not None:
+                await redis.set(key, set_to, ex=2 * 86400)
+                return set_to
+            if not increment:
+                return int(await redis.get(key) or 0)
+            used = await redis.incrby(key, increment)
+            if used == increment:
+                await redis.expire(key, 2 * 86400)
+            return int(used)
+        except Exception as e:
+            logger.warning("Shared quota unavailable for %s, counting locally: %s", self.name, e)
+            self._redis_disabled_until = time.monotonic() + _REDIS_RETRY_SECONDS
+            return local
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a per-minute slot and charge one call to today's budget.
+
+        Raises:
+            QuotaExhaustedError: today's budget is used up
+        """
+        if await self._count() >= self.per_day:
+            raise QuotaExhaustedError(f"{self.name} daily quota of {self.per_day} calls exhausted")
+        await self.minute.acquire(priority)
+        if await self._count(1) > self.per_day:
+            raise QuotaExhaustedError(f"{self.name} daily quota of {self.per_day} calls exhausted")
+
+    async def report_throttle(self, daily: bool = False) -> None:
+        """Record that the provider refused a call despite our accounting."""
+        if daily:
+            await self._count(set_to=self.per_day)
+        else:
+            await self.minute.pause(60)
+
+    async def remaining(self) -> dict:
+        """Calls left in the current minute window and in today's budget."""
+        used = await self._count()
+        return {
+            "per_minute": int(await self.minute.available()),
+            "per_day": max(self.per_day - used, 0),
+            "per_day_limit": self.per_day,
+        }
+
+
+alpha_vantage_quota = QuotaManager(
+    "alpha_vantage",
+    per_minute=settings.ALPHA_VANTAGE_CALLS_PER_MINUTE,
+    per_day=settings.ALPHA_VANTAGE_CALLS_PER_DAY,
+)
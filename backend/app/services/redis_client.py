@@ -0,0 +1,34 @@
+"""Shared async Redis connection for cross-process coordination (rate limits, caches)."""
+
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Redis | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_redis() -> Redis:
+    """Return the process-wide Redis client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = Redis.from_url(settings.REDIS_URL, socket_timeout=2.0, socket_connect_timeout=2.0)
+        _client_loop = loop
+    return _client
+
+
+async def close_redis() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning("Failed to close Redis client: %s", e)
+    _client = None
+    _client_loop = None
@@ -1,10 +1,12 @@
 """SEDAR+ filing retrieval service for TSX-listed companies."""
 
 import logging
-import re
 
 import httpx
 
+from app.services.filing_parser import html_to_text
+from app.services.http_clients import http_clients
+
 logger = logging.getLogger(__name__)
 
 # SEDAR+ API endpoints
@@ -30,17 +32,12 @@ class SedarService:
     SEDAR+ Direct API or a third-party service (e.g., Calcbench, Intrinio).
     """
 
-    def __init__(self):
-        self.session = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            },
-        )
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return http_clients.get("sedar")
 
     async def close(self):
-        await self.session.aclose()
+        """No-op: the pooled client is owned by the shared registry."""
 
     async def get_recent_filings(
         self, company_name: str, filing_type: str = "10-K"
@@ -91,37 +88,17 @@ class SedarService:
             logger.error("Failed to download SEDAR+ filing: %s", e)
             raise
 
-    def parse_filing_html(self, content: bytes) -> str:
+    def parse_filing_html(self, content: bytes, max_chars: int = MAX_FILING_TEXT_CHARS) -> str:
         """Extract text content from a SEDAR+ HTML filing.
         
-        Uses regex-based tag stripping for lightweight parsing.
-        Falls back gracefully if beautifulsoup4 is available.
+        Streams the document through ``filing_parser.html_to_text``, so memory
+        stays bounded and parsing stops once ``max_chars`` is reached.
         
         Args:
             content: Raw HTML bytes
+            max_chars: Maximum length of the returned text
             
         Returns:
             Extracted text content
         """
-        try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(content, "lxml")
-            # Remove script and style elements
-            for tag in soup(["script", "style"]):
-                tag.decompose()
-            text = soup.get_text(separator="\n")
-        except ImportError:
-            # Fallback: simple regex tag stripping
-            text_str = content.decode("utf-8", errors="replace")
-            text = re.sub(r"<[^>]+>", " ", text_str)
-
-        # Clean up whitespace
-        lines = [line.strip() for line in text.splitlines()]
-        text = "\n".join(line for line in lines if line)
-
-        # Truncate to fit LLM context
-        if len(text) > MAX_FILING_TEXT_CHARS:
-            text = text[:MAX_FILING_TEXT_CHARS]
-
-        return text
+        return html_to_text(content, max_chars)
@@ -0,0 +1,126 @@
+"""Single-flight generation: one producer per key, in-process and across replicas.
+
+Opening a company page fires several GETs that each auto-generate the same
+missing thesis or business profile (an EDGAR fetch plus a ~30 s LLM call),
+and the unique version index then rejects all but one insert. ``SingleFlight``
+lets the first caller produce while everyone else waits for the result:
+
+- within a process, late arrivals await the leader's in-flight future;
+- across replicas, the leader holds a Redis lease (``SET NX EX``) and other
+  replicas poll for the stored result until it appears or the lease lapses.
+
+Waiters re-read the result through their own ``existing`` callback (i.e. their
+own DB session) rather than sharing ORM objects with the leader. If Redis is
+unreachable the lease is skipped and only in-process deduplication applies.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the lease only if we still hold it (it may have expired and been re-taken)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(self, name: str, lease_seconds: int, poll_seconds: float):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _lease_key(self, key: str) -> str:
+        return f"singleflight:{self.name}:{key}"
+
+    async def _acquire(self, key: str) -> str | None:
+        """Take the cross-replica lease; returns its token, or None if another replica holds it."""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await get_redis().set(
+                self._lease_key(key), token, nx=True, ex=self.lease_seconds
+            )
+        except Exception as e:
+            logger.warning("Single-flight lease unavailable for %s, continuing: %s", key, e)
+            return token
+        return token if acquired else None
+
+    async def _release(self, key: str, token: str) -> None:
+        try:
+            await get_redis().eval(_RELEASE_SCRIPT, 1, self._lease_key(key), token)
+        except Exception as e:
+            logger.warning("Single-flight lease release failed for %s: %s", key, e)
+
+    async def run(
+        self,
+        key: str,
+        existing: Callable[[], Awaitable[T | None]],
+        produce: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return ``existing()`` if present, otherwise the result of a single ``produce()``.
+
+        ``produce`` runs at most once at a time per key. Its exceptions reach
+        only the caller that ran it; waiters then retry, taking the lead
+        themselves if the result still does not exist.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None or inflight.get_loop() is not loop:
+                break
+            # Shielded so a cancelled waiter does not cancel the leader's signal
+            await asyncio.shield(inflight)
+            result = await existing()
+            if result is not None:
+                return result
+
+        future = self._inflight[key] = loop.create_future()
+        try:
+            return await self._lead(key, existing, produce)
+        finally:
+            future.set_result(None)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _lead(
+        self,
+        key: str,
+        existing: Callable[[], Awaitable[T | None]],
+        produce: Callable[[], Awaitable[T]],
+    ) -> T:
+        token = await self._acquire(key)
+        while token is None:
+            # Another replica is producing; wait for its result or for the lease to lapse
+            await asyncio.sleep(self.poll_seconds)
+            result = await existing()
+            if result is not None:
+                return result
+            token = await self._acquire(key)
+
+        try:
+            # Produced elsewhere between our first check and taking the lease
+            result = await existing()
+            if result is not None:
+                return result
+            return await produce()
+        finally:
+            await self._release(key, token)
+
+
+# Auto-generation of missing theses / business profiles on GET endpoints
+autogeneration = SingleFlight(
+    "autogen", settings.AUTOGEN_LEASE_SECONDS, settings.AUTOGEN_POLL_SECONDS
+)
@@ -1,68 +1,193 @@
-"""S3 document storage service."""
+"""Document storage service (S3, or a local filesystem stand-in).
 
+boto3 is synchronous, so every call is offloaded to a bounded thread pool and
+callers queue on a semaphore when it is saturated; the event loop never blocks
+on S3 I/O. Large uploads use multipart transfers and downloads can be
+streamed in chunks instead of buffering whole objects.
+"""
+
+import asyncio
 import logging
+import shutil
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
-
-import boto3
-from botocore.config import Config
+from pathlib import Path
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+MULTIPART_THRESHOLD_BYTES = 8 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
 
-class StorageService:
-    """Manages document storage in S3."""
+_executor = ThreadPoolExecutor(
+    max_workers=settings.S3_MAX_CONCURRENCY, thread_name_prefix="storage"
+)
+_slots: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def _get_slots() -> asyncio.Semaphore:
+    # Allow one queued call per worker thread before callers start waiting
+    loop = asyncio.get_running_loop()
+    if loop not in _slots:
+        _slots[loop] = asyncio.Semaphore(settings.S3_MAX_CONCURRENCY * 2)
+    return _slots[loop]
+
+
+async def _run(func, *args, **kwargs):
+    """Run a blocking storage call on the storage thread pool with backpressure."""
+    async with _get_slots():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+class S3Backend:
+    """Blocking S3 primitives built on boto3."""
 
     def __init__(self):
-        self.bucket = settings.S3_BUCKET_NAME
-        self.region = settings.S3_REGION
-        
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
         # Configure boto3 client with retry settings
         config = Config(
             retries={"max_attempts": 3, "mode": "standard"},
             signature_version="s3v4",
+            max_pool_connections=settings.S3_MAX_CONCURRENCY * 2,
         )
-        
+
         self.client = boto3.client(
             "s3",
-            region_name=self.region,
+            region_name=settings.S3_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             config=config,
         )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize=MULTIPART_THRESHOLD_BYTES,
+        )
+
+    def put(self, bucket: str, key: str, content: bytes, content_type: str) -> None:
+        self.client.upload_fileobj(
+            BytesIO(content),
+            bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config,
+        )
+
+    def get(self, bucket: str, key: str) -> bytes:
+        return self.client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+    def open(self, bucket: str, key: str) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=bucket, Key=key)["Body"]
+        return body.iter_chunks(DOWNLOAD_CHUNK_BYTES)
+
+    def download_to(self, bucket: str, key: str, path: str) -> None:
+        self.client.download_file(bucket, key, path, Config=self.transfer_config)
+
+    def presign(self, bucket: str, key: str, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def delete(self, bucket: str, key: str) -> None:
+        self.client.delete_object(Bucket=bucket, Key=key)
+
+    def exists(self, bucket: str, key: str) -> bool:
+        self.client.head_object(Bucket=bucket, Key=key)
+        return True
+
+
+class FilesystemBackend:
+    """Stores objects under a local directory (``{root}/{bucket}/{key}``).
+
+    Used for local development and tests in place of S3.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = Path(root or settings.STORAGE_FILESYSTEM_ROOT)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        path = (self.root / bucket / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def put(self, bucket: str, key: str, content: bytes, content_type: str) -> None:
+        path = self._path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+    def get(self, bucket: str, key: str) -> bytes:
+        return self._path(bucket, key).read_bytes()
+
+    def open(self, bucket: str, key: str) -> Iterator[bytes]:
+        with self._path(bucket, key).open("rb") as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_BYTES):
+                yield chunk
+
+    def download_to(self, bucket: str, key: str, path: str) -> None:
+        shutil.copyfile(self._path(bucket, key), path)
+
+    def presign(self, bucket: str, key: str, expires_in: int) -> str:
+        return self._path(bucket, key).as_uri()
+
+    def delete(self, bucket: str, key: str) -> None:
+        self._path(bucket, key).unlink()
+
+    def exists(self, bucket: str, key: str) -> bool:
+        if not self._path(bucket, key).is_file():
+            raise FileNotFoundError(key)
+        return True
+
+
+def _default_backend() -> S3Backend | FilesystemBackend:
+    if settings.STORAGE_BACKEND == "filesystem":
+        return FilesystemBackend()
+    return S3Backend()
+
+
+class StorageService:
+    """Manages document storage in S3 without blocking the event loop."""
+
+    def __init__(self, backend: S3Backend | FilesystemBackend | None = None):
+        self.bucket = settings.S3_BUCKET_NAME
+        self.region = settings.S3_REGION
+        self.backend = backend or _default_backend()
 
     async def upload_file(
-        self, 
-        bucket: str | None = None, 
-        key: str = "", 
+        self,
+        bucket: str | None = None,
+        key: str = "",
         content: bytes = b"",
         content_type: str = "text/html",
     ) -> str | None:
-        """Upload a file to S3.
-        
+        """Upload a file to S3 (multipart above 8 MB).
+
         Args:
             bucket: Bucket name (defaults to configured bucket)
             key: S3 object key
             content: File content as bytes
             content_type: MIME type of the content
-            
+
         Returns:
             S3 key of the uploaded object, or None if upload failed
         """
         bucket = bucket or self.bucket
-        
+
         if not content:
             logger.warning("No content to upload")
             return None
-        
+
         try:
-            self.client.upload_fileobj(
-                BytesIO(content),
-                bucket,
-                key,
-                ExtraArgs={"ContentType": content_type},
-            )
+            await _run(self.backend.put, bucket, key, content, content_type)
             logger.info("Uploaded file to s3://%s/%s", bucket, key)
             return key
         except Exception as e:
@@ -71,52 +196,77 @@ class StorageService:
 
     async def download_file(self, key: str) -> bytes | None:
         """Download a file from S3.
-        
+
         Args:
             key: S3 object key
-            
+
         Returns:
             File content as bytes, or None if download failed
         """
         try:
-            response = self.client.get_object(Bucket=self.bucket, Key=key)
-            return response["Body"].read()
+            return await _run(self.backend.get, self.bucket, key)
         except Exception as e:
             logger.error("Failed to download from S3: %s", e)
             return None
 
+    async def iter_file(self, key: str) -> AsyncIterator[bytes]:
+        """Stream a file from S3 in chunks without buffering the whole object.
+
+        Args:
+            key: S3 object key
+
+        Yields:
+            Successive chunks of the object (up to 1 MB each)
+        """
+        chunks = await _run(self.backend.open, self.bucket, key)
+        sentinel = object()
+        while (chunk := await _run(next, chunks, sentinel)) is not sentinel:
+            yield chunk
+
+    async def download_to_path(self, key: str, path: str) -> bool:
+        """Stream a file from S3 straight to a local path.
+
+        Args:
+            key: S3 object key
+            path: Destination file path
+
+        Returns:
+            True if the download succeeded, False otherwise
+        """
+        try:
+            await _run(self.backend.download_to, self.bucket, key, path)
+            return True
+        except Exception as e:
+            logger.error("Failed to download from S3: %s", e)
+            return False
+
     async def get_download_url(self, key: str, expires_in: int = 3600) -> str | None:
         """Generate a presigned download URL for a file.
-        
+
         Args:
             key: S3 object key
             expires_in: URL expiration time in seconds
-            
+
         Returns:
             Presigned URL, or None if generation failed
         """
         try:
-            url = self.client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.bucket, "Key": key},
-                ExpiresIn=expires_in,
-            )
-            return url
+            return await _run(self.backend.presign, self.bucket, key, expires_in)
         except Exception as e:
             logger.error("Failed to generate presigned URL: %s", e)
             return None
 
     async def delete_file(self, key: str) -> bool:
         """Delete a file from S3.
-        
+
         Args:
             key: S3 object key
-            
+
         Returns:
             True if deletion succeeded, False otherwise
         """
         try:
-            self.client.delete_object(Bucket=self.bucket, Key=key)
+            await _run(self.backend.delete, self.bucket, key)
             logger.info("Deleted file from s3://%s/%s", self.bucket, key)
             return True
         except Exception as e:
@@ -125,15 +275,14 @@ class StorageService:
 
     async def file_exists(self, key: str) -> bool:
         """Check if a file exists in S3.
-        
+
         Args:
             key: S3 object key
-            
+
         Returns:
             True if file exists, False otherwise
         """
         try:
-            self.client.head_object(Bucket=self.bucket, Key=key)
-            return True
+            return await _run(self.backend.exists, self.bucket, key)
         except Exception:
             return False
@@ -75,6 +75,7 @@ class ThesisService:
             drift_summary=thesis_data.get("drift_summary"),
             conviction_direction=thesis_data.get("conviction_direction"),
             llm_model_used=thesis_data.get("llm_model_used", settings.LLM_MODEL),
+            prompt_version=thesis_data.get("prompt_version"),
         )
         self.db.add(thesis)
         await self.db.commit()
@@ -0,0 +1,365 @@
+"""Financial statements from SEC XBRL companyfacts (free, one request per CIK).
+
+Produces the same mapped dicts as ``FinancialDataService`` (``_map_income_av``
+and friends) so it can stand in for Alpha Vantage for every SEC registrant.
+Facts are looked up through a us-gaap concept table: the first concept in
+each list that reports a value for a period wins, which covers filers that
+switched tags over the years (e.g. ``SalesRevenueNet`` to
+``RevenueFromContractWithCustomerExcludingAssessedTax``).
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+
+from app.services.edgar_service import EdgarService
+
+logger = logging.getLogger(__name__)
+
+# field -> us-gaap concepts, in order of preference
+INCOME_CONCEPTS: dict[str, tuple[str, ...]] = {
+    "revenue": (
+        "Revenues",
+        "RevenueFromContractWithCustomerExcludingAssessedTax",
+        "RevenueFromContractWithCustomerIncludingAssessedTax",
+        "SalesRevenueNet",
+    ),
+    "cost_of_revenue": ("CostOfRevenue", "CostOfGoodsAndServicesSold", "CostOfGoodsSold"),
+    "gross_profit": ("GrossProfit",),
+    "operating_income": ("OperatingIncomeLoss",),
+    "net_income": ("NetIncomeLoss", "ProfitLoss"),
+    "depreciation_amortization": (
+        "DepreciationDepletionAndAmortization",
+        "DepreciationAndAmortization",
+        "DepreciationAmortizationAndAccretionNet",
+    ),
+    "eps_diluted": ("EarningsPerShareDiluted",),
+    "shares_outstanding": ("WeightedAverageNumberOfDilutedSharesOutstanding",),
+}
+BALANCE_CONCEPTS: dict[str, tuple[str, ...]] = {
+    "total_assets": ("Assets",),
+    "total_liabilities": ("Liabilities",),
+    "total_equity": (
+        "StockholdersEquity",
+        "StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest",
+    ),
+    "cash_and_equivalents": (
+        "CashCashEquivalentsAndShortTermInvestments",
+        "CashAndCashEquivalentsAtCarryingValue",
+    ),
+    "total_debt": ("LongTermDebt", "LongTermDebtNoncurrent", "DebtInstrumentCarryingAmount"),
+}
+CASHFLOW_CONCEPTS: dict[str, tuple[str, ...]] = {
+    "operating_cash_flow": (
+        "NetCashProvidedByUsedInOperatingActivities",
+        "NetCashProvidedByUsedInOperatingActivitiesContinuingOperations",
+    ),
+    "capital_expenditures": ("PaymentsToAcquirePropertyPlantAndEquipment",),
+}
+
+# Units for fields that are not reported in USD
+FIELD_UNITS = {"eps_diluted": "USD/shares", "shares_outstanding": "shares"}
+# Per-share and share-count facts cannot be differenced into quarters
+NON_ADDITIVE_FIELDS = frozenset({"eps_diluted", "shares_outstanding"})
+
+QUARTER_DAYS = range(75, 106)
+ANNUAL_DAYS = range(340, 381)
+
+
+def _days(start: str, end: str) -> int:
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days
+
+
+def _latest_facts(entries: list[dict], instant: bool) -> dict[tuple[str | None, str], float]:
+    """Collapse a concept's facts to one value per period, preferring the latest filing."""
+    best: dict[tuple[str | None, str], tuple[str, float]] = {}
+    for entry in entries:
+        if "end" not in entry or "val" not in entry:
+            continue
+        start = entry.get("start")
+        if instant == (start is not None):
+            continue
+        key = (start, entry["end"])
+        filed = entry.get("filed", "")
+        if key not in best or filed >= best[key][0]:
+            best[key] = (filed, entry["val"])
+    return {key: val for key, (_, val) in best.items()}
+
+
+def _duration_series(facts: dict, period: str, additive: bool) -> dict[str, float]:
+    """Map period end date -> value for one concept's duration facts.
+
+    Quarterly values come from three-month facts; when a filer only reports
+    year-to-date figures (typical for cash flow), quarters are derived by
+    differencing consecutive cumulative facts that share a start date. This
+    also yields Q4 as fiscal year minus nine months.
+    """
+    wanted = QUARTER_DAYS if period == "quarterly" else ANNUAL_DAYS
+    series = {end: val for (start, end), val in facts.items() if _days(start, end) in wanted}
+    if period != "quarterly" or not additive:
+        return series
+
+    by_start: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    for (start, end), val in facts.items():
+        by_start[start].append((end, val))
+    for cumulative in by_start.values():
+        cumulative.sort()
+        for (prev_end, prev_val), (end, val) in zip(cumulative, cumulative[1:]):
+            if end not in series and _days(prev_end, end) in QUARTER_DAYS:
+                series[end] = val - prev_val
+    return series
+
+
+def _field_series(
+    gaap: dict, field: str, concepts: tuple[str, ...], period: str, instant: bool
+) -> dict[str, float]:
+    unit = FIELD_UNITS.get(field, "USD")
+    series: dict[str, float] = {}
+    for concept in concepts:
+        entries = gaap.get(concept, {}).get("units", {}).get(unit, [])
+        facts = _latest_facts(entries, instant)
+        if instant:
+            concept_series = {end: val for (_, end), val in facts.items()}
+        else:
+            concept_series = _duration_series(facts, period, field not in NON_ADDITIVE_FIELDS)
+        for end, val in concept_series.items():
+            series.setdefault(end, val)
+    return series
+
+
+def _as_int(val) -> int | None:
+    return int(val) if val is not None else None
+
+
+def _sum_or_none(a, b, sign: int = 1):
+    return a + sign * b if a is not None and b is not None else None
+
+
+def latest_complete_quarter(today: date | None = None, lag_days: int = 45) -> tuple[int, int]:
+    """Most recent calendar quarter that ended at least ``lag_days`` ago.
+
+    10-Qs are due 40-45 days after quarter end, so younger frames are sparse.
+    """
+    cutoff = (today or date.today()) - timedelta(days=lag_days)
+    quarter = (cutoff.month - 1) // 3 + 1
+    # The quarter containing the cutoff has not ended yet; step back one
+    quarter -= 1
+    if quarter == 0:
+        return cutoff.year - 1, 4
+    return cutoff.year, quarter
+
+
+def derive_fourth_quarter(annual: list[dict], quarters: list[list[dict]]) -> list[dict]:
+    """Derive Q4 frame rows as the fiscal year minus its first three quarters.
+
+    ``CY{y}Q4`` frames only hold three-month facts, and most filers report Q4
+    only inside the annual figure. A row is derived for a CIK when its annual
+    fact starts with its Q1 fact, the Q1-Q3 facts are consecutive quarters,
+    and the year ends one quarter after Q3; filers whose fiscal year does not
+    line up with the calendar quarters are skipped.
+
+    Args:
+        annual: rows of the ``CY{y}`` frame
+        quarters: rows of the ``CY{y}Q1``, ``Q2`` and ``Q3`` frames, in order
+
+    Returns:
+        Frame-shaped ``{"cik", "start", "end", "val"}`` rows for calendar Q4
+    """
+    by_cik = [{row["cik"]: row for row in rows if "cik" in row} for rows in quarters]
+    derived = []
+    for year in annual:
+        cik = year.get("cik")
+        parts = [quarter.get(cik) for quarter in by_cik]
+        if cik is None or any(p is None or "start" not in p for p in parts):
+            continue
+        ends = [parts[0]["start"], *(p["end"] for p in parts), year.get("end")]
+        if year.get("start") != parts[0]["start"] or ends[-1] is None:
+            continue
+        if all(_days(a, b) in QUARTER_DAYS for a, b in zip(ends, ends[1:])):
+            derived.append({
+                "cik": cik,
+                "start": parts[-1]["end"],
+                "end": year["end"],
+                "val": year["val"] - sum(p["val"] for p in parts),
+            })
+    return derived
+
+
+def map_frame_rows(frames: list[tuple[str, list[dict]]]) -> dict[str, dict]:
+    """Merge fetched frames into one flat statement record per CIK.
+
+    Args:
+        frames: ``(field, rows)`` pairs in concept-preference order, so the
+            first concept reporting a value for a CIK wins
+
+    Returns:
+        Unpadded CIK -> record with every income / balance / cash flow field
+    """
+    merged: dict[str, dict] = defaultdict(dict)
+    for field, rows in frames:
+        for row in rows:
+            if "cik" in row and "val" in row:
+                merged[str(row["cik"])].setdefault(field, row["val"])
+
+    records = {}
+    for cik, values in merged.items():
+        record = {
+            field: values.get(field)
+            for concepts in (INCOME_CONCEPTS, BALANCE_CONCEPTS, CASHFLOW_CONCEPTS)
+            for field in concepts
+        }
+        if record["revenue"] is None and record["net_income"] is None:
+            continue
+        for field, val in record.items():
+            if field not in NON_ADDITIVE_FIELDS:
+                record[field] = _as_int(val)
+        d_and_a = record.pop("depreciation_amortization")
+        record["ebitda"] = _sum_or_none(record["operating_income"], d_and_a)
+        record["free_cash_flow"] = _sum_or_none(
+            record["operating_cash_flow"], record["capital_expenditures"], sign=-1
+        )
+        records[cik] = record
+    return records
+
+
+def map_company_facts(
+    facts: dict, period: str = "quarterly", limit: int = 4
+) -> dict[str, list[dict]]:
+    """Map a companyfacts document to income / balance / cash flow records.
+
+    Records are shaped like ``FinancialDataService._map_income_av``,
+    ``_map_balance_av`` and ``_map_cashflow_av`` output, newest first.
+    """
+    gaap = facts.get("facts", {}).get("us-gaap", {})
+
+    def build(
+        concepts: dict[str, tuple[str, ...]], instant: bool, anchors: tuple[str, ...]
+    ) -> dict[str, dict]:
+        columns = {
+            field: _field_series(gaap, field, names, period, instant)
+            for field, names in concepts.items()
+        }
+        ends = sorted({end for field in anchors for end in columns[field]}, reverse=True)
+        return {end: {field: columns[field].get(end) for field in concepts} for end in ends}
+
+    def base(end: str) -> dict:
+        return {"date": end, "period": "quarterly", "calendar_year": end[:4]}
+
+    income = []
+    income_rows = build(INCOME_CONCEPTS, False, ("revenue", "net_income"))
+    for end, row in list(income_rows.items())[:limit]:
+        operating_income = row["operating_income"]
+        d_and_a = row["depreciation_amortization"]
+        ebitda = _sum_or_none(operating_income, d_and_a)
+        income.append({
+            **base(end),
+            "revenue": _as_int(row["revenue"]),
+            "cost_of_revenue": _as_int(row["cost_of_revenue"]),
+            "gross_profit": _as_int(row["gross_profit"]),
+            "operating_income": _as_int(operating_income),
+            "net_income": _as_int(row["net_income"]),
+            "ebitda": _as_int(ebitda),
+            "eps_diluted": row["eps_diluted"],
+            "shares_outstanding": _as_int(row["shares_outstanding"]),
+        })
+
+    balance_rows = build(BALANCE_CONCEPTS, True, ("total_assets",))
+    if period != "quarterly":
+        # Instant facts carry no duration; keep only fiscal year ends
+        annual_ends = set(income_rows)
+        balance_rows = {end: row for end, row in balance_rows.items() if end in annual_ends}
+    balance = [
+        {**base(end), **{field: _as_int(val) for field, val in row.items()}}
+        for end, row in list(balance_rows.items())[:limit]
+    ]
+
+    cashflow = []
+    cashflow_rows = build(CASHFLOW_CONCEPTS, False, ("operating_cash_flow",))
+    for end, row in list(cashflow_rows.items())[:limit]:
+        ocf = row["operating_cash_flow"]
+        capex = row["capital_expenditures"]
+        fcf = _sum_or_none(ocf, capex, sign=-1)
+        cashflow.append({
+            **base(end),
+            "operating_cash_flow": _as_int(ocf),
+            "capital_expenditures": _as_int(capex),
+            "free_cash_flow": _as_int(fcf),
+        })
+
+    return {"income": income, "balance": balance, "cashflow": cashflow}
+
+
+class XbrlFinancialsService:
+    """Pulls structured financial statements from SEC XBRL companyfacts."""
+
+    def __init__(self, edgar: EdgarService | None = None):
+        self.edgar = edgar or EdgarService()
+
+    async def get_statements(
+        self, cik: str, period: str = "quarterly", limit: int = 4
+    ) -> dict[str, list[dict]]:
+        """Fetch income statement, balance sheet and cash flow records for a CIK.
+
+        Returns:
+            ``{"income": [...], "balance": [...], "cashflow": [...]}``; lists are
+            empty when the company has no usable XBRL facts or the fetch failed.
+        """
+        try:
+            facts = await self.edgar.get_company_facts(cik)
+            return map_company_facts(facts, period, limit)
+        except Exception as e:
+            logger.warning("XBRL companyfacts failed for CIK %s: %s", cik, e)
+            return {"income": [], "balance": [], "cashflow": []}
+
+    async def get_frame_statements(self, year: int, quarter: int) -> dict[str, dict]:
+        """Fetch every filer's statements for one calendar quarter via XBRL frames.
+
+        One request per (field, concept) pair regardless of how many companies
+        are covered. Frames align each filer's fiscal periods to the nearest
+        calendar quarter, so results are keyed to calendar quarters.
+
+        Duration frames only contain three-month facts. For Q4, additive fields
+        missing from the quarter frame are derived from the annual and Q1-Q3
+        frames (see ``derive_fourth_quarter``). Cash flow is reported
+        year-to-date and no frame holds six- or nine-month facts, so operating
+        cash flow, capex and free cash flow are usually None for Q2-Q4 (and
+        for Q4 unless the filer reports three-month cash flows); use
+        ``get_statements``, which differences the cumulative facts, for those.
+
+        Returns:
+            Unpadded CIK -> flat record with income, balance and cash flow fields
+        """
+        requests = []
+        derivable = []
+        for concepts, instant in (
+            (INCOME_CONCEPTS, False),
+            (BALANCE_CONCEPTS, True),
+            (CASHFLOW_CONCEPTS, False),
+        ):
+            period = f"CY{year}Q{quarter}" + ("I" if instant else "")
+            for field, names in concepts.items():
+                unit = FIELD_UNITS.get(field, "USD").replace("/", "-per-")
+                requests.extend((field, concept, unit, period) for concept in names)
+                if quarter == 4 and not instant and field not in NON_ADDITIVE_FIELDS:
+                    derivable.extend((field, concept, unit) for concept in names)
+
+        async def fetch(field: str, concept: str, unit: str, period: str) -> tuple[str, list[dict]]:
+            try:
+                return field, await self.edgar.get_frame(concept, unit, period)
+            except Exception as e:
+                logger.warning("XBRL frame %s/%s failed: %s", concept, period, e)
+                return field, []
+
+        async def fourth_quarter(field: str, concept: str, unit: str) -> tuple[str, list[dict]]:
+            periods = [f"CY{year}", *(f"CY{year}Q{q}" for q in (1, 2, 3))]
+            frames = await asyncio.gather(*(fetch(field, concept, unit, p) for p in periods))
+            annual, *quarters = (rows for _, rows in frames)
+            return field, derive_fourth_quarter(annual, quarters)
+
+        frames = await asyncio.gather(
+            *(fetch(*request) for request in requests),
+            *(fourth_quarter(*request) for request in derivable),
+        )
+        # Reported three-month facts come first, so derived values only fill gaps
+        return map_frame_rows(frames)
@@ -1,5 +1,8 @@
+import asyncio
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.config import settings
 
@@ -16,11 +19,59 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
 )
 
+_check_interval = settings.FILING_CHECK_INTERVAL_MINUTES
+
 celery_app.conf.beat_schedule = {
     "check-for-new-filings": {
         "task": "app.tasks.quarterly_ingestion.check_for_new_filings",
-        "schedule": crontab(minute=0),  # Every hour
+        # Hourly by default; set FILING_CHECK_INTERVAL_MINUTES=5 during earnings season
+        "schedule": crontab(minute=0) if _check_interval >= 60 else crontab(minute=f"*/{_check_interval}"),
     },
 }
 
 celery_app.autodiscover_tasks(["app.tasks"])
+
+
+# ---- Worker event loop ----
+# Each worker process keeps one event loop for its lifetime so pooled HTTP
+# clients (and DB connections) survive across tasks instead of being rebuilt
+# by a fresh asyncio.run() per task.
+
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro):
+    """Run a coroutine on this worker process's long-lived event loop."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    global _worker_loop
+    from app.services.prompt_registry import prompts
+
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    prompts.load()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    from app.services.container import services
+    from app.services.filing_store import flush_pending_uploads
+    from app.services.http_clients import http_clients
+    from app.services.redis_client import close_redis
+
+    _worker_loop.run_until_complete(flush_pending_uploads())
+    _worker_loop.run_until_complete(services.aclose())
+    _worker_loop.run_until_complete(http_clients.aclose())
+    _worker_loop.run_until_complete(close_redis())
+    _worker_loop.close()
+    _worker_loop = None
@@ -1,7 +1,7 @@
 """Quarterly ingestion pipeline — 7-step process for each company filing.
 
 Steps:
-1. Download filing from EDGAR/SEDAR+
+1. Download filing from EDGAR/SEDAR+ (fetched and parsed once, shared by later steps)
 2. Upload raw document to S3
 3. Pull structured financial data from API
 4. Create financial snapshot
@@ -10,9 +10,9 @@ Steps:
 7. Create quarterly update record
 """
 
-import asyncio
 import logging
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from uuid import UUID
 
@@ -25,17 +25,22 @@ from app.models.financial_snapshot import FinancialSnapshot, Segment
 from app.models.thesis_version import ThesisVersion
 from app.models.quarterly_update import QuarterlyUpdate
 from app.models.business_profile import BusinessProfile
-from app.services.edgar_service import EdgarService
-from app.services.sedar_service import SedarService
-from app.services.financial_data_service import FinancialDataService
-from app.services.llm_service import LLMService
+from app.services.container import services
+from app.services.edgar_service import MAX_FULL_FILING_TEXT_CHARS, EdgarService
+from app.services.filing_sections import get_filing_context
+from app.services.filing_store import FilingStore, filing_s3_key, flush_pending_uploads
+from app.services.rate_limiter import Priority
+from app.services.redis_client import get_redis
 from app.services.storage_service import StorageService
 from app.config import settings
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 
 QUARTER_MAP = {"Q1": 1, "Q2": 2, "Q3": 3, "Q4": 4}
+DISCOVERY_FORM_TYPES = ("10-Q", "10-K")
+# A queued filing is not re-dispatched for this long while its pipeline runs
+DISPATCH_CLAIM_TTL_SECONDS = 6 * 3600
 
 
 def _to_decimal(val) -> Decimal | None:
@@ -52,11 +57,24 @@ def _safe_divide(num, denom) -> Decimal | None:
     return Decimal(str(num)) / Decimal(str(denom))
 
 
+@dataclass
+class FilingArtifact:
+    """A filing fetched and parsed once per pipeline run, shared by every step."""
+
+    source_url: str
+    content: bytes = b""
+    text: str = ""
+    s3_key: str | None = None
+
+
 @celery_app.task(name="app.tasks.quarterly_ingestion.check_for_new_filings")
 def check_for_new_filings():
-    """Hourly beat task: check all active companies for new filings.
+    """Beat task: discover new filings for all active companies.
     
-    For each company with a new filing detected, dispatches
+    In "feed" / "daily_index" mode (EDGAR_DISCOVERY_MODE), EDGAR's
+    latest-filings feed or daily form index is pulled once per cycle and
+    intersected with our CIKs in memory; "submissions" mode polls every
+    company individually. For each new filing detected, dispatches
     process_company_filing as a separate task.
     """
     logger.info("Checking for new filings across all active companies")
@@ -68,42 +86,142 @@ def check_for_new_filings():
                 select(Company).where(Company.is_active.is_(True))
             )
             companies = result.scalars().all()
-            
-            for company in companies:
-                filings = []
-                
-                # Check EDGAR for US companies
-                if company.cik:
-                    edgar = EdgarService()
-                    try:
-                        filings.extend(await edgar.get_recent_filings(company.cik, "10-Q"))
-                        filings.extend(await edgar.get_recent_filings(company.cik, "10-K"))
-                    except Exception as e:
-                        logger.warning("Failed to check EDGAR for %s: %s", company.ticker, e)
-                
-                # Check SEDAR+ for Canadian companies (TSX)
-                if company.exchange == "TSX":
-                    sedar = SedarService()
-                    try:
-                        sedar_filings = await sedar.get_recent_filings(company.name)
-                        filings.extend(sedar_filings)
-                    except Exception as e:
-                        logger.warning("Failed to check SEDAR+ for %s: %s", company.ticker, e)
-                
-                # Dispatch processing task for each new filing
-                for filing in filings:
-                    # Check if we already have this document
-                    existing = await session.execute(
-                        select(Document).where(
-                            Document.company_id == company.id,
-                            Document.source_url == filing.get("primary_document_url", filing.get("url", "")),
-                        )
-                    )
-                    if not existing.scalar_one_or_none():
-                        logger.info("Dispatching processing task for %s filing", company.ticker)
-                        process_company_filing.delay(str(company.id), filing)
+
+            if settings.EDGAR_DISCOVERY_MODE == "submissions":
+                await _check_submissions(session, companies)
+            else:
+                await _check_discovery(session, companies)
     
-    asyncio.run(_check())
+    run_async(_check())
+
+
+async def _check_submissions(session, companies: list[Company]):
+    """Poll each company's EDGAR submissions / SEDAR+ listing individually."""
+    edgar = services.edgar(Priority.BACKGROUND)
+    for company in companies:
+        filings = []
+        
+        # Check EDGAR for US companies
+        if company.cik:
+            try:
+                by_form = await edgar.get_recent_filings_by_form(company.cik, ("10-Q", "10-K"))
+                filings.extend(by_form["10-Q"])
+                filings.extend(by_form["10-K"])
+            except Exception as e:
+                logger.warning("Failed to check EDGAR for %s: %s", company.ticker, e)
+        
+        filings.extend(await _check_sedar(company))
+        
+        # Dispatch processing task for each new filing
+        for filing in filings:
+            await _dispatch_if_new(session, company, filing)
+
+
+async def _check_discovery(session, companies: list[Company]):
+    """Discover filings from one EDGAR-wide listing and dispatch only our CIKs."""
+    companies_by_cik: dict[str, list[Company]] = {}
+    for company in companies:
+        if company.cik:
+            companies_by_cik.setdefault(company.cik.lstrip("0"), []).append(company)
+
+    edgar = services.edgar(Priority.BACKGROUND)
+    try:
+        discovered = await _discover_edgar_filings(edgar)
+    except Exception as e:
+        logger.warning("EDGAR filing discovery failed: %s", e)
+        discovered = []
+
+    matches = [f for f in discovered if f["cik"] in companies_by_cik]
+    logger.info("EDGAR discovery: %d filings, %d for tracked companies", len(discovered), len(matches))
+
+    for entry in matches:
+        accession_dir = entry["accession_number"].replace("-", "")
+        cik_companies = companies_by_cik[entry["cik"]]
+        already_stored = await session.execute(
+            select(Document.id).where(
+                Document.company_id.in_([c.id for c in cik_companies]),
+                Document.source_url.like(f"%/{accession_dir}/%"),
+            ).limit(1)
+        )
+        if already_stored.scalar_one_or_none():
+            continue
+
+        # Resolve the primary document URL from the company's submissions listing
+        try:
+            recent = await edgar.get_recent_filings(entry["cik"], entry["form_type"])
+        except Exception as e:
+            logger.warning("Failed to resolve EDGAR filing %s: %s", entry["accession_number"], e)
+            continue
+        filing = next(
+            (f for f in recent if f["accession_number"] == entry["accession_number"]), None
+        )
+        if not filing:
+            continue
+        for company in cik_companies:
+            await _dispatch_if_new(session, company, filing)
+
+    for company in companies:
+        for filing in await _check_sedar(company):
+            await _dispatch_if_new(session, company, filing)
+
+
+async def _discover_edgar_filings(edgar: EdgarService) -> list[dict]:
+    """Pull recent 10-Q/10-K filings across all EDGAR filers."""
+    if settings.EDGAR_DISCOVERY_MODE == "daily_index":
+        today = datetime.now(timezone.utc).date()
+        filings = []
+        # Yesterday's index catches filings accepted after the previous cycle's cutoff
+        for day in (today - timedelta(days=1), today):
+            filings.extend(await edgar.get_daily_index_filings(day, DISCOVERY_FORM_TYPES))
+        return filings
+
+    # Look back two intervals so a delayed beat run never misses a window
+    since = datetime.now(timezone.utc) - timedelta(
+        minutes=2 * settings.FILING_CHECK_INTERVAL_MINUTES
+    )
+    filings = []
+    for form_type in DISCOVERY_FORM_TYPES:
+        filings.extend(await edgar.get_current_filings(form_type, since=since))
+    return filings
+
+
+async def _check_sedar(company: Company) -> list[dict]:
+    """Check SEDAR+ for Canadian companies (TSX)."""
+    if company.exchange != "TSX":
+        return []
+    sedar = services.sedar()
+    try:
+        return await sedar.get_recent_filings(company.name)
+    except Exception as e:
+        logger.warning("Failed to check SEDAR+ for %s: %s", company.ticker, e)
+        return []
+
+
+async def _dispatch_if_new(session, company: Company, filing: dict):
+    """Dispatch process_company_filing unless the document is already stored or queued."""
+    source_url = filing.get("primary_document_url", filing.get("url", ""))
+    existing = await session.execute(
+        select(Document).where(
+            Document.company_id == company.id,
+            Document.source_url == source_url,
+        )
+    )
+    if existing.scalar_one_or_none():
+        return
+    if not await _claim_dispatch(company, source_url):
+        return
+    logger.info("Dispatching processing task for %s filing", company.ticker)
+    process_company_filing.delay(str(company.id), filing)
+
+
+async def _claim_dispatch(company: Company, source_url: str) -> bool:
+    """Mark a filing as queued so frequent beat runs don't dispatch it twice."""
+    key = f"filings:dispatched:{company.id}:{source_url}"
+    try:
+        return bool(await get_redis().set(key, "1", nx=True, ex=DISPATCH_CLAIM_TTL_SECONDS))
+    except Exception as e:
+        logger.warning("Dispatch dedup unavailable, dispatching anyway: %s", e)
+        return True
 
 
 @celery_app.task(
@@ -123,7 +241,7 @@ def process_company_filing(self, company_id: str, filing_info: dict):
     
     try:
         # Run the async pipeline
-        asyncio.run(_run_pipeline(UUID(company_id), filing_info))
+        run_async(_run_pipeline(UUID(company_id), filing_info))
         logger.info("Successfully processed filing for company %s", company_id)
     except Exception as exc:
         logger.exception("Failed to process filing for company %s", company_id)
@@ -139,57 +257,96 @@ async def _run_pipeline(company_id: UUID, filing_info: dict):
         if not company:
             raise ValueError(f"Company {company_id} not found")
         
-        # Step 1 & 2: Download and upload to S3
-        doc = await _step_download_and_store(session, company, filing_info)
+        # Step 1: Download and parse the filing once for every later step
+        artifact = await _step_fetch_filing(session, company, filing_info)
+
+        # Step 2: Upload to S3
+        doc = await _step_store_document(session, company, filing_info, artifact)
         
         # Step 3 & 4: Pull financial data and create snapshot
         snapshot = await _step_pull_financials_and_create_snapshot(session, company, filing_info)
         
         # Step 5: Generate/update business profile (only for annual filings)
-        profile = await _step_generate_profile(session, company, snapshot, filing_info)
+        profile = await _step_generate_profile(session, company, snapshot, filing_info, artifact)
         
         # Step 6: Generate thesis version
         thesis = await _step_generate_thesis(session, company, snapshot, profile)
         
         # Step 7: Create quarterly update
-        update = await _step_create_quarterly_update(session, company, snapshot, thesis, filing_info)
+        update = await _step_create_quarterly_update(
+            session, company, snapshot, thesis, filing_info, artifact
+        )
         
+        await flush_pending_uploads()
         await session.commit()
         
         return update
 
 
-async def _step_download_and_store(session, company: Company, filing_info: dict) -> Document:
-    """Step 1 & 2: Download filing and upload to S3, create document record."""
+async def _step_fetch_filing(session, company: Company, filing_info: dict) -> FilingArtifact:
+    """Step 1: Download the filing and extract its text, once per pipeline run."""
     source_url = filing_info.get("primary_document_url", filing_info.get("url", ""))
-    source = "edgar" if company.cik else "sedar"
-    doc_type = filing_info.get("form_type", filing_info.get("type", "Unknown"))
-    filing_date = filing_info.get("filing_date")
-    
-    # Download the filing
-    content = b""
+    artifact = FilingArtifact(source_url=source_url)
+
     if company.cik:
-        edgar = EdgarService()
+        edgar = services.edgar(Priority.BACKGROUND)
+        accession_number = filing_info.get("accession_number")
         try:
-            content = await edgar.download_filing(source_url)
+            if accession_number:
+                store = FilingStore(edgar, db=session)
+                artifact.content = await store.get(accession_number, source_url)
+                # Only a copy known to be in S3 (read from it, or uploaded successfully)
+                artifact.s3_key = await store.s3_key(accession_number)
+            else:
+                artifact.content = await edgar.download_filing(source_url)
         except Exception as e:
             logger.warning("Failed to download from EDGAR: %s", e)
+            return artifact
+        parser = edgar
     else:
-        sedar = SedarService()
+        sedar = services.sedar()
         try:
-            content = await sedar.download_filing(source_url)
+            artifact.content = await sedar.download_filing(source_url)
         except Exception as e:
             logger.warning("Failed to download from SEDAR+: %s", e)
+            return artifact
+        parser = sedar
+
+    try:
+        artifact.text = parser.parse_filing_html(
+            artifact.content, max_chars=MAX_FULL_FILING_TEXT_CHARS
+        )
+    except Exception as e:
+        logger.warning("Failed to get filing text: %s", e)
+
+    return artifact
+
+
+async def _step_store_document(
+    session, company: Company, filing_info: dict, artifact: FilingArtifact
+) -> Document:
+    """Step 2: Upload the downloaded filing to S3 and create the document record."""
+    source_url = artifact.source_url
+    source = "edgar" if company.cik else "sedar"
+    doc_type = filing_info.get("form_type", filing_info.get("type", "Unknown"))
+    filing_date = filing_info.get("filing_date")
+    content = artifact.content
     
     # Upload to S3 (optional - continue even if S3 fails)
-    s3_key = None
+    s3_key = artifact.s3_key
     file_size = len(content) if content else None
-    if content and settings.S3_BUCKET_NAME:
+    if content and settings.S3_BUCKET_NAME and not s3_key:
         storage = StorageService()
+        accession_number = filing_info.get("accession_number")
         try:
             s3_key = await storage.upload_file(
                 bucket=settings.S3_BUCKET_NAME,
-                key=f"companies/{company.id}/{doc_type}_{filing_date or 'unknown'}.html",
+                # The filing store's key when there is one, so later reads find it in S3
+                key=(
+                    filing_s3_key(accession_number)
+                    if accession_number
+                    else f"companies/{company.id}/{doc_type}_{filing_date or 'unknown'}.html"
+                ),
                 content=content,
             )
         except Exception as e:
@@ -213,15 +370,16 @@ async def _step_pull_financials_and_create_snapshot(
     session, company: Company, filing_info: dict
 ) -> FinancialSnapshot | None:
     """Step 3 & 4: Pull structured financial data and create snapshot."""
-    fmp = FinancialDataService()
+    fmp = services.financial_data(Priority.BACKGROUND)
     fmp_ticker = fmp.resolve_fmp_ticker(company.ticker, company.exchange)
 
     try:
-        # Fetch financial data from FMP
-        income_data = await fmp.get_income_statement(fmp_ticker)
-        balance_data = await fmp.get_balance_sheet(fmp_ticker)
-        cashflow_data = await fmp.get_cash_flow(fmp_ticker)
-        segments_data = await fmp.get_segments(fmp_ticker)
+        # Fetch all statements concurrently
+        fetched = await fmp.get_financials(fmp_ticker)
+        income_data = fetched["income"]
+        balance_data = fetched["balance"]
+        cashflow_data = fetched["cashflow"]
+        segments_data = fetched["segments"]
         
         if not income_data:
             logger.warning("No financial data available for %s", company.ticker)
@@ -311,7 +469,11 @@ async def _step_pull_financials_and_create_snapshot(
 
 
 async def _step_generate_profile(
-    session, company: Company, snapshot: FinancialSnapshot | None, filing_info: dict
+    session,
+    company: Company,
+    snapshot: FinancialSnapshot | None,
+    filing_info: dict,
+    artifact: FilingArtifact,
 ) -> BusinessProfile | None:
     """Step 5: Generate business profile from annual filing (10-K or AIF)."""
     doc_type = filing_info.get("form_type", filing_info.get("type", ""))
@@ -320,23 +482,16 @@ async def _step_generate_profile(
     if doc_type not in ["10-K", "AIF"]:
         return None
     
-    # Get filing text for LLM
     filing_text = ""
-    source_url = filing_info.get("primary_document_url", filing_info.get("url", ""))
-    
-    if company.cik:
-        edgar = EdgarService()
-        try:
-            content = await edgar.download_filing(source_url)
-            filing_text = edgar.parse_filing_html(content)
-        except Exception as e:
-            logger.warning("Failed to get filing text: %s", e)
-    
+    if artifact.text:
+        filing_text = await get_filing_context(
+            artifact.text, doc_type, "profile", filing_info.get("accession_number")
+        )
     if not filing_text:
         filing_text = f"{company.name} ({company.ticker}) is a {company.industry} company in the {company.sector} sector."
     
     # Generate profile via LLM
-    llm = LLMService()
+    llm = services.llm(Priority.BACKGROUND)
     company_data = {
         "name": company.name,
         "ticker": company.ticker,
@@ -371,6 +526,7 @@ async def _step_generate_profile(
         geographic_mix=result.get("geographic_mix", "{}"),
         moat_assessment=result.get("moat_assessment", "none"),
         moat_sources=result.get("moat_sources", "[]"),
+        prompt_version=result.get("prompt_version"),
     )
     session.add(profile)
     logger.info("Generated business profile v%d for %s", next_version, company.ticker)
@@ -431,7 +587,7 @@ async def _step_generate_thesis(
         }
     
     # Generate thesis via LLM
-    llm = LLMService()
+    llm = services.llm(Priority.BACKGROUND)
     try:
         result = await llm.generate_thesis(company_data, snapshot_data, profile_data, prior_thesis_data)
     except Exception as e:
@@ -460,6 +616,7 @@ async def _step_generate_thesis(
         drift_summary=result.get("drift_summary"),
         conviction_direction=result.get("conviction_direction"),
         llm_model_used=settings.LLM_MODEL,
+        prompt_version=result.get("prompt_version"),
     )
     session.add(thesis)
     logger.info("Generated thesis v%d for %s", next_version, company.ticker)
@@ -468,7 +625,7 @@ async def _step_generate_thesis(
 
 async def _step_create_quarterly_update(
     session, company: Company, snapshot: FinancialSnapshot | None, 
-    thesis: ThesisVersion | None, filing_info: dict
+    thesis: ThesisVersion | None, filing_info: dict, artifact: FilingArtifact
 ) -> QuarterlyUpdate | None:
     """Step 7: Create quarterly update record."""
     if not snapshot or not thesis:
@@ -487,18 +644,14 @@ async def _step_create_quarterly_update(
         logger.info("Quarterly update already exists")
         return None
     
-    # Get filing text for LLM
     filing_text = ""
-    source_url = filing_info.get("primary_document_url", filing_info.get("url", ""))
-    
-    if company.cik:
-        edgar = EdgarService()
-        try:
-            content = await edgar.download_filing(source_url)
-            filing_text = edgar.parse_filing_html(content)
-        except Exception as e:
-            logger.warning("Failed to get filing text: %s", e)
-    
+    if artifact.text:
+        filing_text = await get_filing_context(
+            artifact.text,
+            filing_info.get("form_type", filing_info.get("type", "10-Q")),
+            "quarterly",
+            filing_info.get("accession_number"),
+        )
     if not filing_text:
         filing_text = f"{company.name} ({company.ticker}) quarterly filing."
     
@@ -529,7 +682,7 @@ async def _step_create_quarterly_update(
         }
     
     # Generate summary via LLM
-    llm = LLMService()
+    llm = services.llm(Priority.BACKGROUND)
     try:
         result = await llm.generate_quarterly_summary(filing_text, prior_snapshot_data)
     except Exception as e:
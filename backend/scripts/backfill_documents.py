@@ -0,0 +1,210 @@
+"""Backfill filing documents (and optionally financial snapshots) from SEC bulk archives.
+
+SEC publishes nightly ``submissions.zip`` (every filer's submissions JSON) and
+``companyfacts.zip`` (every filer's XBRL facts). Reading those once replaces
+thousands of throttled per-company requests when bootstrapping a fresh
+environment.
+
+Usage:
+    python -m scripts.backfill_documents
+    python -m scripts.backfill_documents --submissions /data/submissions.zip \\
+        --companyfacts https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip
+
+Archives can be local paths or URLs. A URL is streamed to a temporary file
+(zip archives need random access to their central directory); members are
+never extracted, only the ones for CIKs in the companies table are read, one
+at a time, and rows are written with bulk inserts.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+from typing import IO
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import async_session_factory
+from app.models.base import generate_uuid
+from app.models.company import Company
+from app.models.document import Document
+from app.models.financial_snapshot import FinancialSnapshot
+from app.services.edgar_service import EdgarService
+from app.services.financial_ingestion_service import snapshot_columns
+from app.services.xbrl_financials_service import map_company_facts
+
+logger = logging.getLogger(__name__)
+
+SUBMISSIONS_ZIP_URL = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+INSERT_BATCH_SIZE = 1000
+
+
+@contextmanager
+def open_archive(source: str):
+    """Open a zip archive from a local path or by streaming a URL to a temp file."""
+    if not source.startswith(("http://", "https://")):
+        with zipfile.ZipFile(source) as archive:
+            yield archive
+        return
+
+    with tempfile.TemporaryFile() as tmp:
+        _download(source, tmp)
+        tmp.seek(0)
+        with zipfile.ZipFile(tmp) as archive:
+            yield archive
+
+
+def _download(url: str, out: IO[bytes]) -> None:
+    logger.info("Downloading %s", url)
+    headers = {"User-Agent": settings.EDGAR_USER_AGENT}
+    with httpx.stream("GET", url, headers=headers, timeout=60.0, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_BYTES):
+            out.write(chunk)
+
+
+def iter_members(archive: zipfile.ZipFile, ciks: set[str]):
+    """Yield ``(padded_cik, parsed_json)`` for the archive members of the given CIKs.
+
+    Only primary ``CIK##########.json`` members are read; the paginated
+    ``-submissions-NNN.json`` history files are skipped.
+    """
+    for name in archive.namelist():
+        if not (name.startswith("CIK") and name.endswith(".json")) or "-" in name:
+            continue
+        cik = name[3:-5]
+        if cik not in ciks:
+            continue
+        with archive.open(name) as member:
+            yield cik, json.load(member)
+
+
+async def _load_companies(session) -> dict[str, list[Company]]:
+    result = await session.execute(
+        select(Company).where(Company.is_active.is_(True), Company.cik.is_not(None))
+    )
+    by_cik: dict[str, list[Company]] = defaultdict(list)
+    for company in result.scalars():
+        by_cik[company.cik.lstrip("0").zfill(10)].append(company)
+    return by_cik
+
+
+async def backfill_documents(
+    session, archive: zipfile.ZipFile, by_cik: dict[str, list[Company]],
+    form_types: tuple[str, ...], limit: int,
+) -> int:
+    existing = set(
+        (await session.execute(
+            select(Document.company_id, Document.source_url).where(Document.source == "edgar")
+        )).all()
+    )
+
+    rows: list[dict] = []
+    inserted = 0
+    for cik, data in iter_members(archive, set(by_cik)):
+        by_form = EdgarService.filings_from_submissions(data, cik, form_types, limit)
+        for filings in by_form.values():
+            for filing in filings:
+                for company in by_cik[cik]:
+                    key = (company.id, filing["primary_document_url"])
+                    if key in existing:
+                        continue
+                    existing.add(key)
+                    rows.append({
+                        "id": generate_uuid(),
+                        "company_id": company.id,
+                        "doc_type": filing["form_type"],
+                        "source": "edgar",
+                        "source_url": filing["primary_document_url"],
+                        "filing_date": filing["filing_date"],
+                    })
+        if len(rows) >= INSERT_BATCH_SIZE:
+            await session.execute(insert(Document), rows)
+            inserted += len(rows)
+            rows = []
+    if rows:
+        await session.execute(insert(Document), rows)
+        inserted += len(rows)
+    await session.commit()
+    return inserted
+
+
+async def backfill_snapshots(
+    session, archive: zipfile.ZipFile, by_cik: dict[str, list[Company]]
+) -> int:
+    """Insert quarterly snapshots (keyed by calendar quarter) from companyfacts."""
+    stmt = pg_insert(FinancialSnapshot).on_conflict_do_nothing(
+        index_elements=["company_id", "fiscal_year", "fiscal_quarter"]
+    )
+    rows: list[dict] = []
+    inserted = 0
+    for cik, facts in iter_members(archive, set(by_cik)):
+        statements = map_company_facts(facts)
+        balance = {row["date"]: row for row in statements["balance"]}
+        cashflow = {row["date"]: row for row in statements["cashflow"]}
+        for inc in statements["income"]:
+            end = date.fromisoformat(inc["date"])
+            for company in by_cik[cik]:
+                rows.append({
+                    "id": generate_uuid(),
+                    "company_id": company.id,
+                    "fiscal_year": end.year,
+                    "fiscal_quarter": (end.month - 1) // 3 + 1,
+                    "currency": company.currency,
+                    **snapshot_columns(
+                        inc, balance.get(inc["date"], {}), cashflow.get(inc["date"], {})
+                    ),
+                })
+        if len(rows) >= INSERT_BATCH_SIZE:
+            await session.execute(stmt, rows)
+            inserted += len(rows)
+            rows = []
+    if rows:
+        await session.execute(stmt, rows)
+        inserted += len(rows)
+    await session.commit()
+    return inserted
+
+
+async def backfill(args: argparse.Namespace) -> None:
+    form_types = tuple(f.strip() for f in args.forms.split(",") if f.strip())
+    async with async_session_factory() as session:
+        by_cik = await _load_companies(session)
+        print(f"Backfilling {len(by_cik)} CIKs")
+
+        with open_archive(args.submissions) as archive:
+            documents = await backfill_documents(session, archive, by_cik, form_types, args.limit)
+        print(f"Inserted {documents} documents")
+
+        if args.companyfacts:
+            with open_archive(args.companyfacts) as archive:
+                snapshots = await backfill_snapshots(session, archive, by_cik)
+            print(f"Inserted up to {snapshots} financial snapshots (existing periods skipped)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--submissions", default=SUBMISSIONS_ZIP_URL, help="Path or URL of submissions.zip"
+    )
+    parser.add_argument(
+        "--companyfacts", default=None, help="Path or URL of companyfacts.zip (optional)"
+    )
+    parser.add_argument(
+        "--forms", default="10-K,10-Q", help="Comma-separated form types (default: 10-K,10-Q)"
+    )
+    parser.add_argument("--limit", type=int, default=5, help="Filings per form type per company")
+    asyncio.run(backfill(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
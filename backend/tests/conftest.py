@@ -71,6 +71,35 @@ async def test_client(db_session):
 # ---- Mock fixtures for external services ----
 
 
+class MemoryCache:
+    """In-memory stand-in for ``JsonCache``; records the TTL of each write."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def get_many(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    async def set(self, key, value, ttl_seconds=None):
+        self.data[key] = value
+        self.ttls[key] = ttl_seconds
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+        self.ttls.pop(key, None)
+
+
+@pytest.fixture
+def memory_cache():
+    """Factory for ``MemoryCache`` instances to patch over module-level caches."""
+    return MemoryCache
+
+
+
 @pytest.fixture
 def mock_fmp():
     """Mock FinancialDataService to avoid real FMP API calls."""
@@ -0,0 +1,132 @@
+"""Tests for JsonCache / BoundedJsonCache — size-bounded eviction and fail-open behaviour."""
+
+import time
+
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import BoundedJsonCache, JsonCache
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio for the cache: strings plus one sorted set per key."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def zadd(self, name, mapping):
+        self.zsets.setdefault(name, {}).update(mapping)
+
+    async def zremrangebyscore(self, name, low, high):
+        zset = self.zsets.get(name, {})
+        for member, score in list(zset.items()):
+            if score <= float(high):
+                del zset[member]
+
+    async def zcard(self, name):
+        return len(self.zsets.get(name, {}))
+
+    async def zpopmin(self, name, count):
+        zset = self.zsets.get(name, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return [(member.encode(), score) for member, score in popped]
+
+    async def zrem(self, name, member):
+        self.zsets.get(name, {}).pop(member, None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis):
+        self._redis = redis
+        self._calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((getattr(self._redis, name), args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [await method(*args, **kwargs) for method, args, kwargs in self._calls]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache_module, "get_redis", lambda: fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_bounded_cache_evicts_oldest_entries(redis):
+    cache = BoundedJsonCache("llm", ttl_seconds=100, max_entries=2)
+    await cache.set("a", 1, ttl_seconds=10)
+    await cache.set("b", 2, ttl_seconds=20)
+    await cache.set("c", 3, ttl_seconds=30)
+
+    assert await cache.get("a") is None
+    assert await cache.get("b") == 2 and await cache.get("c") == 3
+    assert set(redis.zsets["llm:__index__"]) == {"b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_bounded_cache_prunes_expired_index_entries(redis):
+    cache = BoundedJsonCache("llm", ttl_seconds=100, max_entries=2)
+    # Redis already expired the value; only the index still remembers it
+    redis.zsets["llm:__index__"] = {"gone": time.time() - 1}
+
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+
+    assert set(redis.zsets["llm:__index__"]) == {"a", "b"}
+    assert await cache.get("a") == 1  # nothing live was evicted for the stale entry
+
+
+@pytest.mark.asyncio
+async def test_bounded_cache_delete_removes_index_entry(redis):
+    cache = BoundedJsonCache("llm", ttl_seconds=100, max_entries=2)
+    await cache.set("a", 1)
+    await cache.delete("a")
+    assert await cache.get("a") is None
+    assert redis.zsets["llm:__index__"] == {}
+
+
+@pytest.mark.asyncio
+async def test_cache_fails_open_and_backs_off(monkeypatch):
+    calls = 0
+
+    def broken_redis():
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache_module, "get_redis", broken_redis)
+    cache = BoundedJsonCache("llm", ttl_seconds=100, max_entries=2)
+
+    await cache.set("a", 1)  # swallowed
+    assert await cache.get("a") is None
+    assert await JsonCache("other", 100).get_many(["a"]) == {}
+    # The failed write disabled this cache; the read did not touch Redis again
+    assert calls == 2
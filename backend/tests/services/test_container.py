@@ -0,0 +1,37 @@
+"""Tests for ServiceContainer — application-scoped service singletons."""
+
+import pytest
+
+from app.services.container import ServiceContainer
+from app.services.rate_limiter import Priority
+
+
+class TestServiceContainer:
+    def test_services_are_singletons(self):
+        container = ServiceContainer()
+        assert container.financial_data() is container.financial_data()
+        assert container.edgar() is container.edgar()
+        assert container.sedar() is container.sedar()
+
+    def test_priorities_get_separate_instances(self):
+        container = ServiceContainer()
+        background = container.edgar(Priority.BACKGROUND)
+        assert background is not container.edgar()
+        assert background.priority == Priority.BACKGROUND
+        assert container.xbrl(Priority.BACKGROUND).edgar is background
+
+    def test_market_sentiment_shares_financial_data_service(self):
+        container = ServiceContainer()
+        assert container.market_sentiment()._fds is container.financial_data()
+
+    @pytest.mark.asyncio
+    async def test_llm_reused_within_event_loop(self):
+        container = ServiceContainer()
+        assert container.llm() is container.llm()
+
+    @pytest.mark.asyncio
+    async def test_llm_per_priority(self):
+        container = ServiceContainer()
+        background = container.llm(Priority.BACKGROUND)
+        assert background is not container.llm()
+        assert background.priority == Priority.BACKGROUND
@@ -1,7 +1,10 @@
-"""Tests for EdgarService — EDGAR response parsing, CIK padding."""
+"""Tests for EdgarService — EDGAR response parsing, CIK padding, submissions memo."""
+
+import time
 
 import pytest
 
+from app.services import edgar_service
 from app.services.edgar_service import EdgarService
 
 
@@ -43,3 +46,74 @@ class TestParseFilingHtml:
         service = EdgarService()
         text = service.parse_filing_html(b"")
         assert isinstance(text, str)
+
+
+class TestParseDailyIndex:
+    INDEX = (
+        "Description:           Daily Index of EDGAR Dissemination Feed by Form Type\n"
+        "Form Type   Company Name                                                  CIK         Date Filed  File Name\n"
+        "---------------------------------------------------------------------------------------------------------\n"
+        "10-K        MICROSOFT CORP                                                789019      20250730    edgar/data/789019/0000950170-25-100235.txt\n"
+        "10-Q        APPLE INC                                                     320193      20250801    edgar/data/320193/0000320193-25-000073.txt\n"
+        "SC 13G      SOME FUND LP                                                  1234567     20250801    edgar/data/1234567/0001234567-25-000001.txt\n"
+    )
+
+    def test_filters_form_types(self):
+        filings = EdgarService.parse_daily_index(self.INDEX, ("10-Q",))
+        assert filings == [{
+            "cik": "320193",
+            "accession_number": "0000320193-25-000073",
+            "form_type": "10-Q",
+            "filing_date": "2025-08-01",
+        }]
+
+    def test_skips_header_lines(self):
+        filings = EdgarService.parse_daily_index(self.INDEX, ("10-Q", "10-K"))
+        assert [f["cik"] for f in filings] == ["789019", "320193"]
+
+
+class TestParseCurrentFeed:
+    FEED = b"""<?xml version="1.0" encoding="ISO-8859-1" ?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>Latest Filings</title>
+<entry>
+<title>10-Q - APPLE INC (0000320193) (Filer)</title>
+<link rel="alternate" type="text/html" href="https://www.sec.gov/Archives/edgar/data/320193/000032019325000073/0000320193-25-000073-index.htm"/>
+<summary type="html"> &lt;b&gt;Filed:&lt;/b&gt; 2025-08-01 &lt;b&gt;AccNo:&lt;/b&gt; 0000320193-25-000073 &lt;b&gt;Size:&lt;/b&gt; 5 MB</summary>
+<updated>2025-08-01T06:01:36-04:00</updated>
+<category scheme="https://www.sec.gov/" label="form type" term="10-Q"/>
+<id>urn:tag:sec.gov,2008:accession-number=0000320193-25-000073</id>
+</entry>
+</feed>"""
+
+    def test_parses_entry(self):
+        entries = EdgarService.parse_current_feed(self.FEED)
+        assert len(entries) == 1
+        entry = entries[0]
+        assert entry["cik"] == "320193"
+        assert entry["accession_number"] == "0000320193-25-000073"
+        assert entry["form_type"] == "10-Q"
+        assert entry["filing_date"] == "2025-08-01"
+        assert entry["updated"] is not None
+
+
+class TestSubmissionsMemo:
+    @pytest.fixture(autouse=True)
+    def memo(self, monkeypatch):
+        memo = type(edgar_service._submissions_memo)()
+        monkeypatch.setattr(edgar_service, "_submissions_memo", memo)
+        monkeypatch.setattr(edgar_service, "SUBMISSIONS_MEMO_MAX_ENTRIES", 3)
+        return memo
+
+    def test_evicts_least_recently_used(self, memo):
+        for cik in ("1", "2", "3"):
+            edgar_service._memoize_submissions(cik, {"cik": cik})
+        memo.move_to_end("1")  # "1" read again
+        edgar_service._memoize_submissions("4", {"cik": "4"})
+        assert list(memo) == ["3", "1", "4"]
+
+    def test_prunes_expired_entries_on_insert(self, memo):
+        expired = time.monotonic() - edgar_service.SUBMISSIONS_MEMO_SECONDS - 1
+        memo["1"] = (expired, {"cik": "1"})
+        edgar_service._memoize_submissions("2", {"cik": "2"})
+        assert list(memo) == ["2"]
@@ -0,0 +1,34 @@
+"""Tests for the streaming filing HTML-to-text parser."""
+
+from app.services.filing_parser import html_to_text
+
+
+def test_drops_hidden_inline_xbrl_and_scripts():
+    html = (
+        b'<html><body><div style="display: none"><ix:header>'
+        b"<ix:hidden>dei:EntityCentralIndexKey</ix:hidden></ix:header></div>"
+        b"<p>Item 1. Business</p><script>evil()</script></body></html>"
+    )
+    text = html_to_text(html, 1000)
+    assert text == "Item 1. Business"
+
+
+def test_joins_inline_spans_and_breaks_blocks():
+    html = b"<p>We sell <span>wid</span><span>gets</span>.</p><div>Second&nbsp;line</div>"
+    assert html_to_text(html, 1000) == "We sell widgets.\nSecond line"
+
+
+def test_drops_numeric_tables_keeps_text_tables():
+    html = (
+        b"<table><tr><td>Net sales</td><td>$</td><td>394,328</td><td>(1,234)</td></tr></table>"
+        b"<table><tr><td>Item 7.</td><td>Management's Discussion</td></tr></table>"
+    )
+    text = html_to_text(html, 1000)
+    assert "394,328" not in text
+    assert "Item 7. Management's Discussion" in text
+
+
+def test_stops_at_budget():
+    html = b"<html><body>" + b"<p>paragraph of filing text</p>" * 100_000 + b"</body></html>"
+    text = html_to_text(html, 5_000)
+    assert 0 < len(text) <= 5_000
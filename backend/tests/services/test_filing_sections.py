@@ -0,0 +1,60 @@
+"""Tests for section-aware filing extraction."""
+
+from app.services.filing_sections import build_prompt_context, extract_sections
+
+TEN_K = """
+Table of Contents
+Item 1. Business 3
+Item 1A. Risk Factors 10
+Item 7. Management's Discussion and Analysis 30
+
+PART I
+Item 1. Business
+We design and sell widgets to customers around the world.
+Item 1A. Risk Factors
+Our business depends on the supply of widget parts.
+PART II
+Item 7. Management's Discussion and Analysis of Financial Condition
+Revenue grew 12% driven by strong widget demand.
+Item 8. Financial Statements
+"""
+
+TEN_Q = """
+PART I - FINANCIAL INFORMATION
+Item 1. Financial Statements
+Balance sheet.
+Item 2. Management's Discussion and Analysis
+Quarterly revenue rose on higher volumes.
+PART II - OTHER INFORMATION
+Item 1. Legal Proceedings
+None.
+Item 1A. Risk Factors
+No material changes.
+"""
+
+
+class TestExtractSections:
+    def test_10k_body_wins_over_table_of_contents(self):
+        sections = extract_sections(TEN_K, "10-K")
+        assert "widgets to customers" in sections["1"]
+        assert "supply of widget parts" in sections["1A"]
+        assert "Revenue grew 12%" in sections["7"]
+
+    def test_10q_items_keyed_by_part(self):
+        sections = extract_sections(TEN_Q, "10-Q")
+        assert "Quarterly revenue rose" in sections["I-2"]
+        assert "Legal" in sections["II-1"]
+        assert "No material changes" in sections["II-1A"]
+
+
+class TestBuildPromptContext:
+    def test_uses_planned_sections_within_budget(self):
+        sections = extract_sections(TEN_K, "10-K")
+        context = build_prompt_context(sections, TEN_K, "10-K", "profile", budget=400)
+        assert len(context) <= 400 + 10
+        assert context.startswith("=== Item 1. Business ===")
+        assert "Revenue grew" in context
+
+    def test_falls_back_to_head_without_sections(self):
+        text = "No item headings here. " * 50
+        assert build_prompt_context({}, text, "10-K", "profile", budget=100) == text[:100]
@@ -0,0 +1,100 @@
+"""Tests for FilingStore — local content-addressed tier, LRU eviction and the S3 tier."""
+
+import hashlib
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import filing_store, storage_service
+from app.services.filing_store import FilingStore, filing_s3_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    edgar = MagicMock()
+    edgar.download_filing = AsyncMock(return_value=b"<html>from sec</html>")
+    return FilingStore(edgar=edgar, root=str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_sec(store):
+    await store.put("0000320193-25-000073", b"<html>cached</html>", upload=False)
+    content = await store.get("0000320193-25-000073", "https://www.sec.gov/test.htm")
+    assert content == b"<html>cached</html>"
+    store.edgar.download_filing.assert_not_awaited()
+
+
+def test_identical_content_stored_once(store):
+    store._write_local("0000000001-25-000001", b"same body")
+    store._write_local("0000000001-25-000002", b"same body")
+    objects = list((store.root / "objects").glob("*/*"))
+    assert len(objects) == 1
+    assert store._read_local("0000000001-25-000002") == b"same body"
+
+
+def test_evicts_least_recently_used(store):
+    store.max_bytes = 25
+    store._write_local("0000000001-25-000001", b"a" * 10)
+    old = store._object_path(hashlib.sha256(b"a" * 10).hexdigest())
+    os.utime(old, (1, 1))
+    store._write_local("0000000001-25-000002", b"b" * 10)
+    store._write_local("0000000001-25-000003", b"c" * 10)
+
+    assert store._read_local("0000000001-25-000001") is None
+    assert store._read_local("0000000001-25-000003") == b"c" * 10
+
+
+class _FakeStorage:
+    objects: dict[str, bytes] = {}
+    fail_uploads = False
+
+    async def download_file(self, key):
+        return self.objects.get(key)
+
+    async def upload_file(self, bucket=None, key="", content=b"", content_type="text/html"):
+        if self.fail_uploads:
+            return None
+        self.objects[key] = content
+        return key
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setattr(filing_store.settings, "S3_BUCKET_NAME", "filings-test")
+    monkeypatch.setattr(_FakeStorage, "objects", {})
+    monkeypatch.setattr(_FakeStorage, "fail_uploads", False)
+    monkeypatch.setattr(storage_service, "StorageService", _FakeStorage)
+    return _FakeStorage
+
+
+@pytest.mark.asyncio
+async def test_s3_key_reported_after_upload_succeeds(store, s3):
+    await store.get("0000000001-25-000001", "https://www.sec.gov/a.htm")
+    key = await store.s3_key("0000000001-25-000001")
+    assert key == filing_s3_key("0000000001-25-000001")
+    assert key in s3.objects
+
+
+@pytest.mark.asyncio
+async def test_s3_key_is_none_when_upload_fails(store, s3):
+    s3.fail_uploads = True
+    await store.get("0000000001-25-000001", "https://www.sec.gov/a.htm")
+    assert await store.s3_key("0000000001-25-000001") is None
+
+
+@pytest.mark.asyncio
+async def test_legacy_archive_is_read_and_backfilled(store, s3):
+    legacy = "companies/abc/10-K_2024-11-01.html"
+    s3.objects[legacy] = b"<html>archived</html>"
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = legacy
+    store.db = MagicMock()
+    store.db.execute = AsyncMock(return_value=result)
+
+    content = await store.get("0000000001-25-000001", "https://www.sec.gov/a.htm")
+
+    assert content == b"<html>archived</html>"
+    store.edgar.download_filing.assert_not_awaited()
+    assert await store.s3_key("0000000001-25-000001") == filing_s3_key("0000000001-25-000001")
+    assert s3.objects[filing_s3_key("0000000001-25-000001")] == b"<html>archived</html>"
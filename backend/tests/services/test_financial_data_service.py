@@ -1,8 +1,12 @@
 """Tests for FinancialDataService — FMP response mapping, ticker suffix logic."""
 
+from unittest.mock import AsyncMock
+
 import pytest
 
+from app.services import financial_data_service
 from app.services.financial_data_service import FinancialDataService
+from app.services.rate_limiter import QuotaExhaustedError
 
 
 class TestResolveFmpTicker:
@@ -86,3 +90,67 @@ class TestMapCashflow:
         result = FinancialDataService._map_cashflow(raw)
         assert result["operating_cash_flow"] == 40_000_000
         assert result["free_cash_flow"] == 30_000_000
+
+
+class TestStatementPayloadCache:
+    PAYLOAD = {
+        "annualReports": [{"fiscalDateEnding": "2024-12-31", "totalRevenue": "400"}],
+        "quarterlyReports": [
+            {"fiscalDateEnding": f"2024-{m:02d}-30", "totalRevenue": "100"} for m in (12, 9, 6, 3)
+        ] + [{"fiscalDateEnding": "2023-12-31", "totalRevenue": "90"}],
+    }
+
+    @pytest.mark.asyncio
+    async def test_all_period_views_share_one_call(self, monkeypatch, memory_cache):
+        monkeypatch.setattr(financial_data_service, "_statement_cache", memory_cache())
+        service = FinancialDataService()
+        service._get = AsyncMock(return_value=self.PAYLOAD)
+
+        quarterly = await service.get_income_statement("AAPL")
+        annual = await service.get_income_statement("AAPL", period="annual")
+        history = await service.get_income_statement("AAPL", limit=20)
+
+        assert len(quarterly) == 4
+        assert annual[0]["revenue"] == 400
+        assert len(history) == 5
+        service._get.assert_awaited_once_with("INCOME_STATEMENT", {"symbol": "AAPL"})
+
+
+class TestBulkQuotes:
+    @pytest.mark.asyncio
+    async def test_unsupported_plan_is_remembered(self, monkeypatch, memory_cache):
+        monkeypatch.setattr(financial_data_service, "_bulk_quotes_unsupported", memory_cache())
+        service = FinancialDataService()
+        service._get = AsyncMock(return_value={"Information": "This is a premium endpoint."})
+
+        assert await service.get_bulk_quotes(["AAPL", "MSFT"]) == {}
+        assert await service.get_bulk_quotes(["AAPL", "MSFT"]) == {}
+        service._get.assert_awaited_once()
+
+
+class TestGetFinancials:
+    @pytest.mark.asyncio
+    async def test_fetches_requested_statements(self):
+        service = FinancialDataService()
+        service.get_income_statement = AsyncMock(return_value=[{"revenue": 1}])
+        service.get_balance_sheet = AsyncMock(return_value=[])
+        service.get_cash_flow = AsyncMock(return_value=[{"free_cash_flow": 2}])
+
+        result = await service.get_financials("AAPL", ("income", "balance", "cashflow"))
+
+        assert result == {
+            "income": [{"revenue": 1}],
+            "balance": [],
+            "cashflow": [{"free_cash_flow": 2}],
+        }
+
+    @pytest.mark.asyncio
+    async def test_quota_error_raised_after_all_fetches_settle(self):
+        service = FinancialDataService()
+        service.get_income_statement = AsyncMock(side_effect=QuotaExhaustedError("quota"))
+        service.get_balance_sheet = AsyncMock(return_value=[])
+        service.get_cash_flow = AsyncMock(return_value=[])
+
+        with pytest.raises(QuotaExhaustedError):
+            await service.get_financials("AAPL", ("income", "balance", "cashflow"))
+        service.get_cash_flow.assert_awaited_once()
@@ -0,0 +1,43 @@
+"""Tests for HTTPClientRegistry — per-loop clients and closing replaced ones."""
+
+import asyncio
+
+import pytest
+
+from app.services.http_clients import ClientConfig, HTTPClientRegistry
+
+
+def _registry() -> HTTPClientRegistry:
+    return HTTPClientRegistry({"test": ClientConfig(base_url="https://example.test")})
+
+
+@pytest.mark.asyncio
+async def test_client_reused_within_loop():
+    registry = _registry()
+    assert registry.get("test") is registry.get("test")
+    await registry.aclose()
+
+
+def test_client_from_finished_loop_is_closed_on_next_aclose():
+    registry = _registry()
+
+    async def use():
+        return registry.get("test")
+
+    async def replace_and_close():
+        new = registry.get("test")
+        await registry.aclose()
+        return new
+
+    # Private loops: asyncio.run() would clear the session loop other tests share
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        old = first.run_until_complete(use())  # loop stays open but is no longer running
+        new = second.run_until_complete(replace_and_close())
+    finally:
+        first.close()
+        second.close()
+
+    assert new is not old
+    assert old.is_closed and new.is_closed
+    assert registry._stale == []
@@ -0,0 +1,47 @@
+"""Tests for JsonFieldStream — top-level fields of a JSON object fed in chunks."""
+
+import json
+
+import pytest
+
+from app.services.json_stream import JsonFieldStream
+
+THESIS = {
+    "bull_case": 'Demand "surprises", margins {expand}',
+    "bull_target": 210.5,
+    "key_drivers": ["Pricing", "Volume, mix"],
+    "scenarios": {"base": [1, {"weight": 0.5}]},
+    "drift_summary": None,
+}
+
+
+def _feed(text: str, size: int) -> tuple[list, JsonFieldStream]:
+    parser = JsonFieldStream()
+    fields = []
+    for i in range(0, len(text), size):
+        fields += parser.feed(text[i : i + size])
+    return fields, parser
+
+
+@pytest.mark.parametrize("size", [1, 5, 10_000])
+def test_emits_every_field_regardless_of_chunking(size):
+    fields, parser = _feed(json.dumps(THESIS), size)
+    assert fields == list(THESIS.items())
+    assert parser.done
+
+
+def test_field_is_emitted_before_the_object_ends():
+    parser = JsonFieldStream()
+    assert parser.feed('{"bull_case": "up", "base_') == [("bull_case", "up")]
+    assert parser.feed('case": "flat"}') == [("base_case", "flat")]
+
+
+def test_ignores_fences_and_trailing_text():
+    text = '```json\n{"bear_case": "down"}\n```\nLet me know "if" {anything} else.'
+    fields, _ = _feed(text, 3)
+    assert fields == [("bear_case", "down")]
+
+
+def test_skips_malformed_values():
+    fields, _ = _feed('{"bull_target": 12.5.1, "bear_case": "down"}', 4)
+    assert fields == [("bear_case", "down")]
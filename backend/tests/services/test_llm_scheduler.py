@@ -0,0 +1,124 @@
+"""Tests for LLMScheduler — token estimates, retry-after parsing, budgets and settlement."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_scheduler import (
+    MAX_THROTTLE_SECONDS,
+    LLMScheduler,
+    estimate_tokens,
+    parse_retry_after,
+)
+from app.services.rate_limiter import Priority
+
+
+def _scheduler(**overrides) -> LLMScheduler:
+    limits = {"requests_per_minute": 600, "tokens_per_minute": 6000, "max_concurrency": 2}
+    return LLMScheduler("test", shared=False, **(limits | overrides))
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 400, "b" * 400) == 201
+
+
+class TestParseRetryAfter:
+    def test_retry_after_seconds(self):
+        assert parse_retry_after({"retry-after": "7"}) == 7.0
+
+    def test_token_reset_duration(self):
+        assert parse_retry_after({"x-ratelimit-reset-tokens": "1m2.5s"}) == pytest.approx(62.5)
+        assert parse_retry_after({"x-ratelimit-reset-tokens": "340ms"}) == pytest.approx(0.34)
+
+    def test_retry_after_wins_over_reset_headers(self):
+        headers = {
+            "retry-after": "7",
+            "x-ratelimit-reset-requests": "2h24m0s",
+            "x-ratelimit-reset-tokens": "7.66s",
+        }
+        assert parse_retry_after(headers) == 7.0
+
+    def test_daily_request_reset_is_not_a_backoff(self):
+        assert parse_retry_after({"x-ratelimit-reset-requests": "2h24m0s"}) is None
+
+    def test_no_usable_hint(self):
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"retry-after": "soon"}) is None
+
+
+@pytest.mark.asyncio
+async def test_reservation_settles_to_actual_usage():
+    scheduler = _scheduler()
+    async with scheduler.slot(3000) as reservation:
+        reservation.record_usage(1000)
+    assert await scheduler.tokens.available() == pytest.approx(5000, abs=10)
+
+
+@pytest.mark.asyncio
+async def test_unreported_usage_keeps_estimate():
+    scheduler = _scheduler()
+    async with scheduler.slot(3000):
+        pass
+    assert await scheduler.tokens.available() == pytest.approx(3000, abs=10)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    scheduler = _scheduler(max_concurrency=2)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with scheduler.slot(10):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_interactive_call_overtakes_queued_bulk_calls():
+    scheduler = _scheduler(max_concurrency=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def call(name: str, priority: Priority):
+        async with scheduler.slot(10, priority):
+            order.append(name)
+            if name == "first":
+                await release.wait()
+
+    tasks = [asyncio.create_task(call("first", Priority.BACKGROUND))]
+    await asyncio.sleep(0.01)
+    tasks += [asyncio.create_task(call(f"bg{i}", Priority.BACKGROUND)) for i in range(2)]
+    await asyncio.sleep(0.01)
+    tasks.append(asyncio.create_task(call("ui", Priority.INTERACTIVE)))
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["first", "ui", "bg0", "bg1"]
+
+
+@pytest.mark.asyncio
+async def test_throttle_report_pauses_new_calls():
+    scheduler = _scheduler(requests_per_minute=600)
+    await scheduler.report_throttle(0.1)
+    start = time.monotonic()
+    async with scheduler.slot(10):
+        pass
+    assert time.monotonic() - start >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_throttle_pause_is_capped():
+    scheduler = _scheduler(requests_per_minute=600)
+    await scheduler.report_throttle(8640)  # a daily reset mistaken for a backoff
+    assert scheduler.requests._tokens == pytest.approx(
+        1 - scheduler.requests.rate * MAX_THROTTLE_SECONDS, abs=1
+    )
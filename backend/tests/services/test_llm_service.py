@@ -1,10 +1,16 @@
 """Tests for LLMService — JSON parsing, prompt formatting (mocked Groq)."""
 
 import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
+from groq import RateLimitError
 
-from app.services.llm_service import _parse_json_response
+from app.services import llm_service
+from app.services.llm_scheduler import LLMScheduler
+from app.services.llm_service import LLMService, _parse_json_response
 
 
 class TestParseJsonResponse:
@@ -41,3 +47,123 @@ class TestParseJsonResponse:
         result = _parse_json_response(json.dumps(data))
         assert result["bull_target"] == 200.0
         assert len(result["key_drivers"]) == 2
+
+
+def _completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _stream(*parts: str):
+    async def chunks():
+        for part in parts:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+    return chunks()
+
+
+@pytest.fixture
+def service(monkeypatch, memory_cache):
+    monkeypatch.setattr(llm_service, "_response_cache", memory_cache())
+    monkeypatch.setattr(llm_service, "groq_scheduler", LLMScheduler(
+        "test", requests_per_minute=600, tokens_per_minute=100000, max_concurrency=2,
+        shared=False,
+    ))
+    service = LLMService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(return_value=_completion('{"bull_case": "up"}'))
+    )))
+    return service
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_identical_requests_hit_cache(self, service):
+        first = await service._call("sys", "prompt")
+        second = await service._call("sys", "prompt")
+        assert first == second == '{"bull_case": "up"}'
+        service.client.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_any_request_change_misses(self, service):
+        await service._call("sys", "prompt")
+        await service._call("sys", "prompt", temperature=0.7)
+        await service._call("other", "prompt")
+        assert service.client.chat.completions.create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_bypass_flag_skips_cache(self, service):
+        await service._call("sys", "prompt")
+        await service._call("sys", "prompt", use_cache=False)
+        assert service.client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_non_json_response_not_cached(self, service):
+        service.client.chat.completions.create.return_value = _completion("Sorry, I can't.")
+        await service._call("sys", "prompt")
+        await service._call("sys", "prompt")
+        assert service.client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_call_waits_and_retries(self, service):
+        response = httpx.Response(
+            429, headers={"retry-after": "0"}, request=httpx.Request("POST", "https://groq.test")
+        )
+        service.client.chat.completions.create.side_effect = [
+            RateLimitError("rate limited", response=response, body=None),
+            _completion('{"bull_case": "up"}'),
+        ]
+        assert await service._call("sys", "prompt", retries=0) == '{"bull_case": "up"}'
+        assert service.client.chat.completions.create.await_count == 2
+
+
+class TestStreaming:
+    @pytest.mark.asyncio
+    async def test_stream_is_cached_and_replayed(self, service):
+        service.client.chat.completions.create.return_value = _stream('{"bull_case"', ': "up"}')
+        first = [chunk async for chunk in service._stream("sys", "prompt")]
+        second = [chunk async for chunk in service._stream("sys", "prompt")]
+        assert first == ['{"bull_case"', ': "up"}']
+        assert second == ['{"bull_case": "up"}']
+        service.client.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_thesis_yields_fields_then_result(self, service):
+        thesis = {
+            "bull_case": "up", "base_case": "flat", "bear_case": "down",
+            "key_drivers": ["a"], "key_risks": ["b"], "catalysts": ["c"],
+        }
+        text = json.dumps(thesis)
+        service.client.chat.completions.create.return_value = _stream(text[:25], text[25:])
+
+        events = [event async for event in service.stream_thesis({"name": "Acme"}, {}, {})]
+
+        assert events[:-1] == list(thesis.items())
+        field, result = events[-1]
+        assert field is None
+        assert result["key_drivers"] == '["a"]'
+        assert result["prompt_version"].startswith("thesis_generation@")
+
+    @pytest.mark.asyncio
+    async def test_stream_retries_errors_before_first_delta(self, service):
+        service.client.chat.completions.create.side_effect = [
+            ConnectionError("reset"),
+            _stream('{"bull_case": "up"}'),
+        ]
+        with patch.object(llm_service.asyncio, "sleep", AsyncMock()):
+            chunks = [chunk async for chunk in service._stream("sys", "prompt")]
+        assert chunks == ['{"bull_case": "up"}']
+        assert service.client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_does_not_retry_after_output_started(self, service):
+        async def broken():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="{"))])
+            raise ConnectionError("reset")
+
+        service.client.chat.completions.create.return_value = broken()
+        chunks = []
+        with pytest.raises(ConnectionError):
+            async for chunk in service._stream("sys", "prompt"):
+                chunks.append(chunk)
+        assert chunks == ["{"]
+        service.client.chat.completions.create.assert_awaited_once()
@@ -0,0 +1,73 @@
+"""Tests for MarketSentimentService — market context caching."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services import market_sentiment_service
+from app.services.market_sentiment_service import MarketSentimentService
+
+OVERVIEW = {"Symbol": "AAPL", "AnalystTargetPrice": "210.50", "PERatio": "31.2",
+            "ForwardPE": "28.0", "52WeekHigh": "237.23", "52WeekLow": "164.08"}
+NEWS = {"feed": [{
+    "title": "Apple beats estimates",
+    "source": "Reuters",
+    "summary": "Strong iPhone sales.",
+    "overall_sentiment_label": "Bullish",
+    "time_published": "20250501T120000",
+    "ticker_sentiment": [{"ticker": "AAPL", "relevance_score": "0.9"}],
+}]}
+
+
+@pytest.fixture
+def caches(monkeypatch, memory_cache):
+    overview, news = memory_cache(), memory_cache()
+    monkeypatch.setattr(market_sentiment_service, "_overview_cache", overview)
+    monkeypatch.setattr(market_sentiment_service, "_news_cache", news)
+    return overview, news
+
+
+def _service(responses: dict) -> MarketSentimentService:
+    service = MarketSentimentService()
+    service._fds._get = AsyncMock(side_effect=lambda function, params: responses[function])
+    return service
+
+
+@pytest.mark.asyncio
+async def test_market_context_cached_across_calls(caches):
+    service = _service({"OVERVIEW": OVERVIEW, "NEWS_SENTIMENT": NEWS})
+
+    first = await service.get_market_context("AAPL")
+    second = await service.get_market_context("AAPL")
+
+    assert first == second
+    assert first["analyst_target_price"] == "210.50"
+    assert first["recent_news"][0]["title"] == "Apple beats estimates"
+    assert service._fds._get.await_count == 2  # one OVERVIEW + one NEWS_SENTIMENT
+
+
+@pytest.mark.asyncio
+async def test_ticker_without_coverage_is_negatively_cached(caches):
+    overview_cache, news_cache = caches
+    service = _service({
+        "OVERVIEW": {},
+        "NEWS_SENTIMENT": {"Information": "Invalid inputs. Please refer to the API documentation"},
+    })
+
+    await service.get_market_context("ZZZZ")
+    ctx = await service.get_market_context("ZZZZ")
+
+    assert ctx["analyst_target_price"] is None and ctx["recent_news"] == []
+    assert service._fds._get.await_count == 2
+    assert overview_cache.data["ZZZZ"] == {} and news_cache.data["ZZZZ"] == []
+
+
+@pytest.mark.asyncio
+async def test_api_notices_are_not_cached(caches):
+    overview_cache, news_cache = caches
+    notice = {"Information": "This is a premium endpoint."}
+    service = _service({"OVERVIEW": notice, "NEWS_SENTIMENT": notice})
+
+    await service.get_market_context("AAPL")
+
+    assert overview_cache.data == {} and news_cache.data == {}
@@ -0,0 +1,43 @@
+"""Tests for the filing parse process pool — results and lifecycle."""
+
+import pytest
+
+from app.config import settings
+from app.services import parse_executor
+from app.services.filing_parser import html_to_text
+from app.services.parse_executor import parse_html, shutdown_parse_executor
+
+HTML = (
+    b"<html><body><h1>Item 7. Management's Discussion</h1>"
+    b"<p>Revenue grew 12% on services.</p><table><tr><td>Total</td><td>1,234</td></tr></table>"
+    b"</body></html>"
+)
+
+
+@pytest.fixture(autouse=True)
+def single_worker_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PARSE_POOL_SIZE", 1)
+    yield
+    shutdown_parse_executor()
+
+
+@pytest.mark.asyncio
+async def test_parse_runs_in_pool_and_matches_in_process_parser():
+    text = await parse_html(HTML, 10_000)
+
+    assert parse_executor._executor is not None
+    assert text == html_to_text(HTML, 10_000)
+
+
+@pytest.mark.asyncio
+async def test_shutdown_stops_pool_and_next_parse_recreates_it():
+    await parse_html(HTML, 10_000)
+    first = parse_executor._executor
+
+    shutdown_parse_executor()
+    assert parse_executor._executor is None
+    shutdown_parse_executor()  # idempotent
+
+    assert await parse_html(HTML, 10_000) == html_to_text(HTML, 10_000)
+    assert parse_executor._executor is not None
+    assert parse_executor._executor is not first
@@ -0,0 +1,61 @@
+"""Tests for the prompt registry — compilation, placeholder checks, versions."""
+
+import pytest
+
+from app.services.prompt_registry import (
+    PromptRegistry,
+    PromptSpec,
+    PromptTemplate,
+    PromptTemplateError,
+    prompts,
+)
+
+SPEC = PromptSpec(system="sys", fields=frozenset({"name", "ticker"}))
+
+
+class TestPromptTemplate:
+    def test_render_matches_str_format(self):
+        text = "Company {name} ({ticker}) returns {{\"json\": true}}"
+        template = PromptTemplate.compile("t", text, SPEC)
+        assert template.render(name="Apple", ticker="AAPL") == text.format(
+            name="Apple", ticker="AAPL"
+        )
+
+    def test_unknown_and_unused_placeholders_rejected(self):
+        with pytest.raises(PromptTemplateError, match="unknown \\['nmae'\\]"):
+            PromptTemplate.compile("t", "{nmae} {ticker}", SPEC)
+
+    def test_format_specs_rejected(self):
+        with pytest.raises(PromptTemplateError, match="unsupported placeholder"):
+            PromptTemplate.compile("t", "{name!r} {ticker}", SPEC)
+
+    def test_render_requires_exact_fields(self):
+        template = PromptTemplate.compile("t", "{name} {ticker}", SPEC)
+        with pytest.raises(PromptTemplateError):
+            template.render(name="Apple")
+
+    def test_version_tracks_text_and_system_prompt(self):
+        base = PromptTemplate.compile("t", "{name} {ticker}", SPEC)
+        assert base.version.startswith("t@")
+        assert base.version == PromptTemplate.compile("t", "{name} {ticker}", SPEC).version
+        assert base.version != PromptTemplate.compile("t", "{name}: {ticker}", SPEC).version
+        other_system = PromptSpec(system="other", fields=SPEC.fields)
+        assert base.version != PromptTemplate.compile("t", "{name} {ticker}", other_system).version
+
+
+class TestPromptRegistry:
+    def test_shipped_prompts_match_their_specs(self):
+        assert set(prompts.versions()) == {
+            "business_profile", "thesis_generation", "quarterly_summary"
+        }
+
+    def test_files_read_once(self, tmp_path):
+        (tmp_path / "t.txt").write_text("{name} {ticker}")
+        registry = PromptRegistry(tmp_path, {"t": SPEC})
+        first = registry.get("t")
+        (tmp_path / "t.txt").write_text("changed {name} {ticker}")
+        assert registry.get("t") is first
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(PromptTemplateError, match="could not be read"):
+            PromptRegistry(tmp_path, {"t": SPEC}).load()
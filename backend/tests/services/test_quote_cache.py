@@ -0,0 +1,111 @@
+"""Tests for QuoteCache — TTLs, single-flight and stale-while-revalidate."""
+
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config import settings
+from app.services.quote_cache import MARKET_TZ, QuoteCache, quote_ttl
+
+QUOTE = {"price": 100.0, "change": 1.0, "change_pct": 1.0, "prev_close": 99.0,
+         "latest_trading_day": "2025-06-02"}
+
+
+class _NoSharedCache:
+    async def get(self, key):
+        return None
+
+    async def get_many(self, keys):
+        return {}
+
+    async def set(self, key, value, ttl_seconds=None):
+        pass
+
+
+def _cache(fetch, fetch_many=None) -> QuoteCache:
+    cache = QuoteCache(fetch=fetch, fetch_many=fetch_many)
+    cache._shared = _NoSharedCache()
+    return cache
+
+
+class TestQuoteTtl:
+    def test_market_hours_use_short_ttl(self):
+        monday_noon = datetime(2025, 6, 2, 12, 0, tzinfo=MARKET_TZ)
+        assert quote_ttl(monday_noon) == settings.QUOTE_TTL_SECONDS
+
+    def test_after_close_lasts_until_next_open(self):
+        friday_evening = datetime(2025, 6, 6, 20, 0, tzinfo=MARKET_TZ)
+        monday_open = datetime(2025, 6, 9, 9, 30, tzinfo=MARKET_TZ)
+        expected = min((monday_open - friday_evening).total_seconds(),
+                       settings.QUOTE_TTL_CLOSED_MAX_SECONDS)
+        assert quote_ttl(friday_evening) == expected
+
+
+@pytest.mark.asyncio
+async def test_fresh_quote_served_from_memory():
+    fetch = AsyncMock(return_value=QUOTE)
+    cache = _cache(fetch)
+    assert await cache.get("AAPL") == QUOTE
+    assert await cache.get("AAPL") == QUOTE
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    async def slow_fetch(ticker):
+        await asyncio.sleep(0.01)
+        return QUOTE
+
+    fetch = AsyncMock(side_effect=slow_fetch)
+    cache = _cache(fetch)
+    results = await asyncio.gather(*(cache.get("AAPL") for _ in range(10)))
+    assert results == [QUOTE] * 10
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_expired_quote_served_stale_while_refreshing():
+    fetch = AsyncMock(return_value={**QUOTE, "price": 101.0})
+    cache = _cache(fetch)
+    now = time.time()
+    cache._entries["AAPL"] = {"quote": QUOTE, "fetched_at": now - 70, "expires_at": now - 10}
+
+    assert await cache.get("AAPL") == QUOTE  # stale value, refresh in background
+    await asyncio.gather(*cache._inflight.values())
+    assert (await cache.get("AAPL"))["price"] == 101.0
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_many_fetches_misses_in_one_batch():
+    fetch = AsyncMock(return_value=QUOTE)
+    fetch_many = AsyncMock(return_value={"MSFT": QUOTE, "NVDA": QUOTE})
+    cache = _cache(fetch, fetch_many)
+    now = time.time()
+    cache._entries["AAPL"] = {"quote": QUOTE, "fetched_at": now, "expires_at": now + 60}
+
+    quotes = await cache.get_many(["AAPL", "MSFT", "NVDA", "XYZ"])
+
+    assert quotes == {"AAPL": QUOTE, "MSFT": QUOTE, "NVDA": QUOTE, "XYZ": QUOTE}
+    fetch_many.assert_awaited_once_with(["MSFT", "NVDA", "XYZ"])
+    # Only the ticker the bulk endpoint could not price falls back to a single fetch
+    fetch.assert_awaited_once_with("XYZ")
+
+
+@pytest.mark.asyncio
+async def test_get_many_caps_single_quote_fallback(monkeypatch):
+    monkeypatch.setattr(settings, "QUOTE_BULK_FALLBACK_MAX_TICKERS", 2)
+    fetch = AsyncMock(return_value=QUOTE)
+    fetch_many = AsyncMock(return_value={})  # e.g. bulk endpoint not on this plan
+    cache = _cache(fetch, fetch_many)
+    now = time.time()
+    stale = {**QUOTE, "price": 90.0}
+    cache._entries["D"] = {"quote": stale, "fetched_at": now - 400, "expires_at": now - 100}
+
+    quotes = await cache.get_many(["A", "B", "C", "D"])
+
+    assert quotes == {"A": QUOTE, "B": QUOTE, "D": stale}
+    assert fetch.await_count == 2
@@ -0,0 +1,117 @@
+"""Tests for TokenBucket, PrioritySemaphore and QuotaManager — budgets and priority ordering."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.rate_limiter import (
+    Priority,
+    PrioritySemaphore,
+    QuotaExhaustedError,
+    QuotaManager,
+    TokenBucket,
+)
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_capacity_is_immediate():
+    bucket = TokenBucket(rate=5)
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_waits_when_bucket_is_empty():
+    bucket = TokenBucket(rate=20, capacity=1)
+    await bucket.acquire()
+    start = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_overtake_background():
+    bucket = TokenBucket(rate=50, capacity=1)
+    await bucket.acquire()  # drain the bucket so later callers queue
+    order: list[str] = []
+
+    async def call(name: str, priority: Priority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(call(f"bg{i}", Priority.BACKGROUND)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("ui", Priority.INTERACTIVE)))
+    await asyncio.gather(*tasks)
+
+    assert order[0] == "ui"
+    assert order[1:] == ["bg0", "bg1", "bg2"]
+
+
+@pytest.mark.asyncio
+async def test_multi_token_acquire_waits_for_its_full_cost():
+    bucket = TokenBucket(rate=100, capacity=10)
+    await bucket.acquire(tokens=10)
+    start = time.monotonic()
+    await bucket.acquire(tokens=5)
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_consume_refunds_unused_tokens():
+    bucket = TokenBucket(rate=1, capacity=10)
+    await bucket.acquire(tokens=10)
+    await bucket.consume(-4)
+    assert await bucket.available() == pytest.approx(4, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_semaphore_hands_slots_to_interactive_first():
+    semaphore = PrioritySemaphore(1)
+    await semaphore.acquire(Priority.INTERACTIVE)
+    order: list[str] = []
+
+    async def call(name: str, priority: Priority):
+        await semaphore.acquire(priority)
+        order.append(name)
+        semaphore.release()
+
+    tasks = [asyncio.create_task(call(f"bg{i}", Priority.BACKGROUND)) for i in range(2)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("ui", Priority.INTERACTIVE)))
+    await asyncio.sleep(0)
+    semaphore.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["ui", "bg0", "bg1"]
+
+
+@pytest.mark.asyncio
+async def test_quota_fails_once_daily_budget_is_spent():
+    quota = QuotaManager("test", per_minute=60, per_day=2, shared=False)
+    await quota.acquire()
+    await quota.acquire()
+    with pytest.raises(QuotaExhaustedError):
+        await quota.acquire()
+    assert (await quota.remaining())["per_day"] == 0
+
+
+@pytest.mark.asyncio
+async def test_daily_throttle_report_exhausts_quota():
+    quota = QuotaManager("test", per_minute=60, per_day=100, shared=False)
+    await quota.report_throttle(daily=True)
+    with pytest.raises(QuotaExhaustedError):
+        await quota.acquire()
+
+
+@pytest.mark.asyncio
+async def test_minute_throttle_report_empties_minute_budget():
+    quota = QuotaManager("test", per_minute=5, per_day=100, shared=False)
+    assert (await quota.remaining())["per_minute"] == 5
+    await quota.report_throttle()
+    remaining = await quota.remaining()
+    assert remaining["per_minute"] == 0
+    assert remaining["per_day"] == 100
@@ -0,0 +1,107 @@
+"""Tests for SingleFlight — one producer per key, waiters reuse its result."""
+
+import asyncio
+
+import pytest
+
+from app.services import single_flight
+from app.services.single_flight import SingleFlight
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio for leases: SET NX and compare-and-delete."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(single_flight, "get_redis", lambda: fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_produce(redis):
+    flight = SingleFlight("test", lease_seconds=60, poll_seconds=0.01)
+    store = {}
+    calls = 0
+
+    async def existing():
+        return store.get("thesis")
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        store["thesis"] = "v1"
+        return "v1"
+
+    results = await asyncio.gather(*(flight.run("c1", existing, produce) for _ in range(5)))
+
+    assert results == ["v1"] * 5
+    assert calls == 1
+    assert redis.data == {}  # lease released
+
+
+@pytest.mark.asyncio
+async def test_waits_for_lease_held_by_another_replica(redis):
+    flight = SingleFlight("test", lease_seconds=60, poll_seconds=0.01)
+    redis.data[flight._lease_key("c1")] = "other-replica"
+    store = {}
+
+    async def existing():
+        return store.get("thesis")
+
+    async def produce():
+        raise AssertionError("must not produce while another replica holds the lease")
+
+    async def other_replica_finishes():
+        await asyncio.sleep(0.03)
+        store["thesis"] = "v1"
+
+    result, _ = await asyncio.gather(
+        flight.run("c1", existing, produce), other_replica_finishes()
+    )
+    assert result == "v1"
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_after_leader_fails(redis):
+    flight = SingleFlight("test", lease_seconds=60, poll_seconds=0.01)
+    store = {}
+    attempts = 0
+
+    async def existing():
+        return store.get("thesis")
+
+    async def produce():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise RuntimeError("LLM unavailable")
+        store["thesis"] = "v1"
+        return "v1"
+
+    first, second = await asyncio.gather(
+        flight.run("c1", existing, produce),
+        flight.run("c1", existing, produce),
+        return_exceptions=True,
+    )
+    assert isinstance(first, RuntimeError)
+    assert second == "v1"
+    assert attempts == 2
@@ -0,0 +1,39 @@
+"""Tests for StorageService against the filesystem backend."""
+
+import pytest
+
+from app.services.storage_service import FilesystemBackend, StorageService
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageService(backend=FilesystemBackend(str(tmp_path)))
+
+
+@pytest.mark.asyncio
+async def test_upload_and_download_roundtrip(storage):
+    key = await storage.upload_file(key="filings/a.html", content=b"<html>10-K</html>")
+    assert key == "filings/a.html"
+    assert await storage.file_exists("filings/a.html")
+    assert await storage.download_file("filings/a.html") == b"<html>10-K</html>"
+
+
+@pytest.mark.asyncio
+async def test_iter_file_streams_chunks(storage, monkeypatch):
+    monkeypatch.setattr("app.services.storage_service.DOWNLOAD_CHUNK_BYTES", 4)
+    await storage.upload_file(key="big.html", content=b"0123456789")
+    chunks = [chunk async for chunk in storage.iter_file("big.html")]
+    assert b"".join(chunks) == b"0123456789"
+    assert len(chunks) == 3
+
+
+@pytest.mark.asyncio
+async def test_missing_file(storage):
+    assert await storage.download_file("missing.html") is None
+    assert not await storage.file_exists("missing.html")
+    assert not await storage.delete_file("missing.html")
+
+
+@pytest.mark.asyncio
+async def test_empty_content_not_uploaded(storage):
+    assert await storage.upload_file(key="empty.html", content=b"") is None
@@ -0,0 +1,133 @@
+"""Tests for XBRL companyfacts → financial statement mapping."""
+
+from datetime import date
+
+from app.services.xbrl_financials_service import (
+    derive_fourth_quarter,
+    latest_complete_quarter,
+    map_company_facts,
+    map_frame_rows,
+)
+
+
+def _fact(val, end, start=None, filed="2025-05-01"):
+    fact = {"val": val, "end": end, "filed": filed}
+    if start:
+        fact["start"] = start
+    return fact
+
+
+FACTS = {
+    "facts": {
+        "us-gaap": {
+            "RevenueFromContractWithCustomerExcludingAssessedTax": {"units": {"USD": [
+                _fact(100, "2024-12-28", "2024-09-29"),
+                _fact(90, "2025-03-29", "2024-12-29"),
+                _fact(190, "2025-03-29", "2024-09-29"),  # six-month YTD
+            ]}},
+            "SalesRevenueNet": {"units": {"USD": [
+                _fact(80, "2024-09-28", "2024-06-30", filed="2024-11-01"),
+            ]}},
+            "NetIncomeLoss": {"units": {"USD": [
+                _fact(20, "2025-03-29", "2024-12-29"),
+                _fact(25, "2024-12-28", "2024-09-29", filed="2025-01-30"),
+                _fact(24, "2024-12-28", "2024-09-29", filed="2025-05-01"),  # restated
+            ]}},
+            "EarningsPerShareDiluted": {"units": {"USD/shares": [
+                _fact(1.5, "2025-03-29", "2024-12-29"),
+            ]}},
+            "Assets": {"units": {"USD": [
+                _fact(1000, "2025-03-29"),
+                _fact(950, "2024-09-28"),
+            ]}},
+            "NetCashProvidedByUsedInOperatingActivities": {"units": {"USD": [
+                _fact(30, "2024-12-28", "2024-09-29"),
+                _fact(70, "2025-03-29", "2024-09-29"),  # cash flow is reported YTD
+            ]}},
+            "PaymentsToAcquirePropertyPlantAndEquipment": {"units": {"USD": [
+                _fact(5, "2024-12-28", "2024-09-29"),
+                _fact(12, "2025-03-29", "2024-09-29"),
+            ]}},
+        }
+    }
+}
+
+
+class TestMapCompanyFacts:
+    def test_income_uses_fallback_concepts_newest_first(self):
+        income = map_company_facts(FACTS)["income"]
+        assert [row["date"] for row in income] == ["2025-03-29", "2024-12-28", "2024-09-28"]
+        assert income[0]["revenue"] == 90
+        assert income[0]["eps_diluted"] == 1.5
+        assert income[2]["revenue"] == 80  # older filings tagged SalesRevenueNet
+        assert set(income[0]) >= {"date", "period", "calendar_year", "net_income", "ebitda"}
+
+    def test_latest_filing_wins_for_restated_values(self):
+        income = map_company_facts(FACTS)["income"]
+        assert income[1]["net_income"] == 24
+
+    def test_quarters_derived_from_year_to_date_cash_flow(self):
+        cashflow = map_company_facts(FACTS)["cashflow"]
+        assert cashflow[0]["operating_cash_flow"] == 40
+        assert cashflow[0]["capital_expenditures"] == 7
+        assert cashflow[0]["free_cash_flow"] == 33
+
+    def test_balance_sheet_from_instant_facts(self):
+        balance = map_company_facts(FACTS)["balance"]
+        assert balance[0]["date"] == "2025-03-29"
+        assert balance[0]["total_assets"] == 1000
+        assert balance[0]["total_liabilities"] is None
+
+    def test_empty_facts(self):
+        assert map_company_facts({}) == {"income": [], "balance": [], "cashflow": []}
+
+
+class TestMapFrameRows:
+    def test_first_concept_wins_and_derives_fields(self):
+        frames = [
+            ("revenue", [{"cik": 320193, "val": 100}]),
+            ("revenue", [{"cik": 320193, "val": 999}, {"cik": 789019, "val": 50}]),
+            ("operating_income", [{"cik": 320193, "val": 30}]),
+            ("depreciation_amortization", [{"cik": 320193, "val": 5}]),
+            ("operating_cash_flow", [{"cik": 320193, "val": 40}]),
+            ("capital_expenditures", [{"cik": 320193, "val": 10}]),
+            ("total_assets", [{"cik": 1234, "val": 10}]),  # no income data
+        ]
+        records = map_frame_rows(frames)
+        assert set(records) == {"320193", "789019"}
+        assert records["320193"]["revenue"] == 100
+        assert records["320193"]["ebitda"] == 35
+        assert records["320193"]["free_cash_flow"] == 30
+        assert records["789019"]["net_income"] is None
+
+
+def _row(cik, start, end, val):
+    return {"cik": cik, "start": start, "end": end, "val": val}
+
+
+class TestDeriveFourthQuarter:
+    QUARTERS = [
+        [_row(1, "2024-01-01", "2024-03-31", 10), _row(2, "2024-01-01", "2024-03-31", 1)],
+        [_row(1, "2024-04-01", "2024-06-30", 20), _row(2, "2024-04-01", "2024-06-30", 2)],
+        [_row(1, "2024-07-01", "2024-09-30", 30)],
+    ]
+
+    def test_year_minus_three_quarters(self):
+        annual = [_row(1, "2024-01-01", "2024-12-31", 100)]
+        assert derive_fourth_quarter(annual, self.QUARTERS) == [
+            _row(1, "2024-09-30", "2024-12-31", 40)
+        ]
+
+    def test_skips_incomplete_or_misaligned_years(self):
+        annual = [
+            _row(2, "2024-01-01", "2024-12-31", 100),  # no Q3 fact
+            _row(1, "2023-10-01", "2024-09-30", 100),  # fiscal year ends in September
+        ]
+        assert derive_fourth_quarter(annual, self.QUARTERS) == []
+
+
+class TestLatestCompleteQuarter:
+    def test_waits_for_filing_deadline(self):
+        assert latest_complete_quarter(date(2025, 5, 1)) == (2024, 4)
+        assert latest_complete_quarter(date(2025, 5, 20)) == (2025, 1)
+        assert latest_complete_quarter(date(2025, 2, 1)) == (2024, 3)